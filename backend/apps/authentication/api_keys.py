@@ -0,0 +1,228 @@
+import hashlib
+import pickle
+import re
+import secrets
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from apps.core.cache import LocalLRUCache, get_version, peek_version, bump_version
+from apps.core.db_router import use_primary
+from apps.core.touch import touch, increment
+from .models import APIKey
+
+KEY_PREFIX = 'isk'
+
+# Key prefixes are secrets.token_hex(6)
+_PREFIX_PATTERN = re.compile(r'[0-9a-f]{12}')
+
+# Cached marker for "no key with this prefix" (in-process only)
+_NOT_FOUND = b''
+
+_local_keys = LocalLRUCache(
+    maxsize=settings.API_KEYS['LOCAL_MAXSIZE'],
+    timeout=settings.API_KEYS['LOCAL_TIMEOUT']
+)
+
+
+class APIKeyUser:
+    """
+    request.user for API key requests.
+    Authenticated but not a User: views that act on the caller's own
+    account reject it with IsUserAccount.
+    """
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+    is_staff = False
+    is_superuser = False
+    is_api_key = True
+    pk = None
+    id = None
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.email = f"api-key:{api_key.prefix}"
+
+    def __str__(self):
+        return self.email
+
+
+class APIKeyPrincipal:
+    """
+    Request principal for an API key: the organization comes from the key
+    and permissions from its scopes instead of a membership role.
+    """
+    __slots__ = ('user', 'membership', 'organization', 'role', 'scopes')
+
+    def __init__(self, api_key):
+        self.user = APIKeyUser(api_key)
+        self.membership = None
+        self.organization = api_key.organization
+        self.role = None
+        self.scopes = frozenset(api_key.scopes)
+
+    def __repr__(self):
+        return f"<APIKeyPrincipal key={self.user.api_key.prefix} org={self.organization.pk}>"
+
+    @property
+    def role_name(self):
+        return None
+
+    def has_permission(self, permission_code):
+        """Scopes only count while the permission is active in the catalogue"""
+        from apps.organizations.matrix import get_permission_matrix
+
+        return permission_code in self.scopes and permission_code in get_permission_matrix().index
+
+
+def hash_secret(secret):
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def parse_key(raw_key):
+    """
+    Split a raw key into (prefix, secret).
+
+    Returns:
+        tuple: (prefix, secret), or None if the key is malformed
+    """
+    parts = raw_key.split('_', 2)
+    if len(parts) != 3 or parts[0] != KEY_PREFIX or not parts[2]:
+        return None
+    if not _PREFIX_PATTERN.fullmatch(parts[1]):
+        return None
+    return parts[1], parts[2]
+
+
+def create_api_key(organization, name, scopes, created_by=None, expires_at=None):
+    """
+    Create an API key for an organization.
+
+    Args:
+        organization: Organization the key acts for
+        name: Label shown to administrators
+        scopes: Permission codes the key is granted
+        created_by: User creating the key
+        expires_at: Optional expiry
+
+    Returns:
+        tuple: (APIKey, raw key) - the raw key is only available here
+
+    Raises:
+        ValueError: If a scope is not an active permission code
+    """
+    from apps.organizations.matrix import get_permission_matrix
+
+    unknown = set(scopes) - set(get_permission_matrix().codes)
+    if unknown:
+        raise ValueError(f"Unknown permission codes: {', '.join(sorted(unknown))}")
+
+    prefix = secrets.token_hex(6)
+    secret = secrets.token_urlsafe(32)
+
+    api_key = APIKey.objects.create(
+        organization=organization,
+        name=name,
+        prefix=prefix,
+        secret_hash=hash_secret(secret),
+        scopes=sorted(set(scopes)),
+        created_by=created_by,
+        expires_at=expires_at
+    )
+    return api_key, f"{KEY_PREFIX}_{prefix}_{secret}"
+
+
+def _version_key(prefix):
+    return f"api_key_ver:{prefix}"
+
+
+def _load(prefix):
+    """
+    Key row (with organization) by prefix through the in-process and shared
+    caches. Lookups run before authentication, so unknown prefixes are only
+    remembered in this process: only keys that exist get a version key and
+    shared cache entries. Rows are read from the primary, so a lagging
+    replica can't cache a revoked key under the bumped version (or report
+    a new key missing).
+    """
+    version_key = _version_key(prefix)
+    version = peek_version(version_key)
+
+    if version is None:
+        missing_key = f"api_key:{prefix}:missing"
+        if _local_keys.get(missing_key) is not None:
+            return None
+        with use_primary():
+            exists = APIKey.objects.filter(prefix=prefix).exists()
+        if not exists:
+            _local_keys.set(missing_key, _NOT_FOUND)
+            return None
+        version = get_version(version_key)
+
+    key = f"api_key:{prefix}:{version}"
+    payload = _local_keys.get(key)
+    if payload is None:
+        payload = cache.get(key)
+
+        if payload is None:
+            with use_primary():
+                api_key = APIKey.objects.select_related('organization').filter(prefix=prefix).first()
+            payload = pickle.dumps(api_key) if api_key else _NOT_FOUND
+            if api_key:
+                cache.set(key, payload, settings.API_KEYS['TIMEOUT'])
+
+        _local_keys.set(key, payload)
+
+    if payload == _NOT_FOUND:
+        return None
+    return pickle.loads(payload)
+
+
+def get_api_key(raw_key):
+    """
+    Verify a raw API key.
+    The row is found by its prefix in the cache (usually without a
+    round trip to the database) and the secret checked against its hash.
+
+    Returns:
+        APIKey: Valid key with its organization, or None
+    """
+    parsed = parse_key(raw_key)
+    if parsed is None:
+        return None
+
+    prefix, secret = parsed
+    api_key = _load(prefix)
+    if api_key is None:
+        return None
+
+    if not constant_time_compare(hash_secret(secret), api_key.secret_hash):
+        return None
+    if not api_key.is_valid():
+        return None
+    return api_key
+
+
+def record_usage(api_key):
+    """Count a request made with a key (buffered, no query per request)"""
+    increment(APIKey, api_key.pk, 'usage_count')
+    touch(APIKey, api_key.pk, 'last_used_at', timezone.now())
+
+
+def invalidate_api_key(prefix):
+    """Drop cached copies of a key once the current transaction commits"""
+    transaction.on_commit(lambda: bump_version(_version_key(prefix)))
+
+
+def invalidate_organization_api_keys(organization_id):
+    """Drop cached keys of an organization (e.g. after it is deactivated)"""
+    prefixes = list(APIKey.objects.filter(organization_id=organization_id).values_list('prefix', flat=True))
+    for prefix in prefixes:
+        invalidate_api_key(prefix)
+
+
+def clear_local_api_key_cache():
+    """Drop this process's in-memory key entries (used by tests)"""
+    _local_keys.clear()
@@ -1,8 +1,18 @@
 import jwt
+import time
 from datetime import datetime, timedelta
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import authentication, exceptions
-from .models import User, RefreshToken
+from .models import User
+from .token_store import get_refresh_token_store, hash_token
+from .user_cache import get_cached_user, invalidate_user_cache
+
+# Longest a refresh may hold the single-flight lock
+REFRESH_LOCK_TIMEOUT = 5
+REFRESH_POLL_INTERVAL = 0.05
 
 
 class JWTAuthentication(authentication.BaseAuthentication):
@@ -20,6 +30,10 @@ class JWTAuthentication(authentication.BaseAuthentication):
         # Extract token from "Bearer <token>"
         parts = auth_header.split()
         
+        # Other schemes (Api-Key) belong to other authentication classes
+        if parts and parts[0].lower() == APIKeyAuthentication.keyword.lower():
+            return None
+        
         if len(parts) != 2 or parts[0].lower() != 'bearer':
             raise exceptions.AuthenticationFailed('Invalid authorization header format')
         
@@ -33,12 +47,14 @@ class JWTAuthentication(authentication.BaseAuthentication):
             if not user_id:
                 raise exceptions.AuthenticationFailed('Invalid token payload')
             
-            # Get user from database
-            try:
-                user = User.objects.get(id=user_id, is_active=True)
-            except User.DoesNotExist:
+            # Get user from cache (falls back to database)
+            user = get_cached_user(user_id)
+            if user is None:
                 raise exceptions.AuthenticationFailed('User not found or inactive')
             
+            if user.is_token_revoked(payload.get('iat')):
+                raise exceptions.AuthenticationFailed('Token has been revoked')
+            
             return (user, token)
             
         except jwt.ExpiredSignatureError:
@@ -47,6 +63,44 @@ class JWTAuthentication(authentication.BaseAuthentication):
             raise exceptions.AuthenticationFailed('Invalid token')
         except Exception as e:
             raise exceptions.AuthenticationFailed(f'Token validation failed: {str(e)}')
+    
+    def authenticate_header(self, request):
+        return 'Bearer'
+
+
+class APIKeyAuthentication(authentication.BaseAuthentication):
+    """
+    Organization API key authentication ("Authorization: Api-Key <key>").
+    The key implies the tenant, so no X-Organization-Id header is needed:
+    the request gets the key's organization and a principal whose
+    permissions are the key's scopes.
+    """
+    keyword = 'Api-Key'
+    
+    def authenticate(self, request):
+        from apps.core.principal import attach_principal
+        from .api_keys import get_api_key, record_usage, APIKeyPrincipal
+        
+        parts = request.headers.get('Authorization', '').split()
+        
+        if not parts or parts[0].lower() != self.keyword.lower():
+            return None
+        
+        if len(parts) != 2:
+            raise exceptions.AuthenticationFailed('Invalid authorization header format')
+        
+        api_key = get_api_key(parts[1])
+        if api_key is None:
+            raise exceptions.AuthenticationFailed('Invalid or revoked API key')
+        
+        principal = APIKeyPrincipal(api_key)
+        attach_principal(request, principal)
+        record_usage(api_key)
+        
+        return (principal.user, api_key)
+    
+    def authenticate_header(self, request):
+        return self.keyword
 
 
 def generate_access_token(user):
@@ -62,7 +116,8 @@ def generate_access_token(user):
     payload = {
         'user_id': str(user.id),
         'email': user.email,
-        'iat': datetime.utcnow(),
+        # Sub-second precision so tokens issued right after a revocation stay valid
+        'iat': time.time(),
         'exp': datetime.utcnow() + settings.JWT_SETTINGS['ACCESS_TOKEN_LIFETIME'],
     }
     
@@ -98,34 +153,16 @@ def decode_access_token(token):
 
 def generate_refresh_token(user, request=None):
     """
-    Generate a long-lived refresh token and store it in database.
+    Generate a long-lived refresh token in the configured token store.
     
     Args:
         user: User instance
         request: HTTP request object (optional, for tracking device info)
     
     Returns:
-        RefreshToken: RefreshToken instance
+        IssuedRefreshToken: Plaintext token and its expiry
     """
-    import secrets
-    
-    # Generate random token
-    token_string = secrets.token_urlsafe(32)
-    
-    # Get device info from request
-    user_agent = request.META.get('HTTP_USER_AGENT', '') if request else ''
-    ip_address = get_client_ip(request) if request else None
-    
-    # Create refresh token in database
-    refresh_token = RefreshToken.objects.create(
-        user=user,
-        token=token_string,
-        expires_at=datetime.utcnow() + settings.JWT_SETTINGS['REFRESH_TOKEN_LIFETIME'],
-        user_agent=user_agent[:500],  # Truncate if too long
-        ip_address=ip_address
-    )
-    
-    return refresh_token
+    return get_refresh_token_store().issue(user, request)
 
 
 def rotate_refresh_token(old_token_string, request=None):
@@ -133,6 +170,13 @@ def rotate_refresh_token(old_token_string, request=None):
     Rotate refresh token - invalidate old one and create new one.
     This provides better security by limiting token lifetime.
     
+    Rotation is single-flight across workers: while one request rotates a
+    token, concurrent refreshes with the same token wait for its result,
+    and repeats within REFRESH_GRACE_SECONDS get the same new pair instead
+    of tripping reuse detection. A refresh that waits longer than
+    REFRESH_LOCK_TIMEOUT gets a 503 to retry: the lock holder may have
+    rotated the token already, so rotating it again would revoke the family.
+    
     Args:
         old_token_string: The refresh token to rotate
         request: HTTP request object (optional)
@@ -142,25 +186,53 @@ def rotate_refresh_token(old_token_string, request=None):
     
     Raises:
         exceptions.AuthenticationFailed: If token is invalid
+        ServiceUnavailableError: If another rotation of the token is still
+            in progress after REFRESH_LOCK_TIMEOUT (503, Retry-After)
     """
-    try:
-        # Get and validate old token
-        old_token = RefreshToken.objects.get(token=old_token_string)
-        
-        if not old_token.is_valid():
-            raise exceptions.AuthenticationFailed('Refresh token is invalid or expired')
-        
-        # Revoke old token
-        old_token.revoke()
+    grace_seconds = settings.JWT_SETTINGS['REFRESH_GRACE_SECONDS']
+    if not grace_seconds:
+        return _rotate(old_token_string, request)
+    
+    token_hash = hash_token(old_token_string)
+    result_key = f"refresh_result:{token_hash}"
+    lock_key = f"refresh_lock:{token_hash}"
+    
+    deadline = time.monotonic() + REFRESH_LOCK_TIMEOUT
+    while True:
+        result = cache.get(result_key)
+        if result is not None:
+            return result
         
-        # Generate new tokens
-        access_token = generate_access_token(old_token.user)
-        new_refresh_token = generate_refresh_token(old_token.user, request)
+        if cache.add(lock_key, 1, timeout=REFRESH_LOCK_TIMEOUT):
+            try:
+                # Another rotation may have published its result and released
+                # the lock since the read above; only rotate if it didn't
+                result = cache.get(result_key)
+                if result is None:
+                    result = _rotate(old_token_string, request)
+                    cache.set(result_key, result, grace_seconds)
+                return result
+            finally:
+                # Result is published before the lock is released
+                cache.delete(lock_key)
         
-        return access_token, new_refresh_token
+        if time.monotonic() >= deadline:
+            # The lock holder is stuck; by the time the client retries, it
+            # has published its result or its lock has expired. (Imported here:
+            # apps.core.exceptions imports DRF's views, which load this module.)
+            from apps.core.exceptions import ServiceUnavailableError
+            raise ServiceUnavailableError(wait=REFRESH_LOCK_TIMEOUT)
         
-    except RefreshToken.DoesNotExist:
-        raise exceptions.AuthenticationFailed('Refresh token not found')
+        # Another request is rotating this token: wait for its result (or
+        # for the lock, if that rotation failed)
+        time.sleep(REFRESH_POLL_INTERVAL)
+
+
+def _rotate(old_token_string, request):
+    user, new_refresh_token = get_refresh_token_store().rotate(old_token_string, request)
+    access_token = generate_access_token(user)
+    
+    return access_token, new_refresh_token
 
 
 def revoke_refresh_token(token_string):
@@ -170,24 +242,26 @@ def revoke_refresh_token(token_string):
     Args:
         token_string: The refresh token to revoke
     """
-    try:
-        token = RefreshToken.objects.get(token=token_string)
-        token.revoke()
-    except RefreshToken.DoesNotExist:
-        pass  # Token doesn't exist, nothing to revoke
+    get_refresh_token_store().revoke(token_string)
 
 
 def revoke_all_user_tokens(user):
     """
-    Revoke all refresh tokens for a user (e.g., on password change).
+    Revoke all tokens for a user (e.g., on password change).
+    Moves the user's revocation epoch forward instead of updating every
+    token row, so it costs the same however many sessions exist and also
+    cuts off access tokens that haven't expired yet.
     
     Args:
         user: User instance
     """
-    RefreshToken.objects.filter(
-        user=user,
-        revoked_at__isnull=True
-    ).update(revoked_at=datetime.utcnow())
+    now = timezone.now()
+    User.objects.filter(pk=user.pk).update(tokens_valid_after=now)
+    user.tokens_valid_after = now
+    
+    get_refresh_token_store().revoke_user(user, now)
+    
+    transaction.on_commit(lambda: invalidate_user_cache(user.pk))
 
 
 def get_client_ip(request):
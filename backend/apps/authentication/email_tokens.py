@@ -0,0 +1,128 @@
+import secrets
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+from .models import User, EmailVerificationToken, PasswordResetToken
+
+EMAIL_VERIFICATION = 'email_verification'
+PASSWORD_RESET = 'password_reset'
+
+
+def _verification_state(user):
+    return f"{user.email}|{user.is_verified}"
+
+
+def _password_reset_state(user):
+    return f"{user.email}|{user.password}|{user.tokens_valid_after}"
+
+
+PURPOSES = {
+    EMAIL_VERIFICATION: {
+        'model': EmailVerificationToken,
+        'max_age_setting': 'VERIFICATION_MAX_AGE',
+        'state': _verification_state,
+    },
+    PASSWORD_RESET: {
+        'model': PasswordResetToken,
+        'max_age_setting': 'PASSWORD_RESET_MAX_AGE',
+        'state': _password_reset_state,
+    },
+}
+
+
+def _salt(purpose):
+    return f"apps.authentication.email_tokens.{purpose}"
+
+
+def _state_digest(purpose, user):
+    """Short HMAC of the user state a token is bound to"""
+    state = PURPOSES[purpose]['state'](user)
+    return salted_hmac(_salt(purpose), state, algorithm='sha256').hexdigest()[:32]
+
+
+def _max_age(purpose):
+    return settings.EMAIL_TOKENS[PURPOSES[purpose]['max_age_setting']]
+
+
+def make_token(purpose, user):
+    """
+    Issue an email verification or password reset token.
+    In 'signed' mode (EMAIL_TOKENS['MODE']) the token is an expiring
+    signature over the user id and the state it acts on (is_verified for
+    verification, the password hash for resets), so no row is written and
+    the token stops working once it has been used. 'database' mode stores
+    a random token row, which keeps an audit trail.
+
+    Args:
+        purpose: EMAIL_VERIFICATION or PASSWORD_RESET
+        user: User instance
+
+    Returns:
+        str: Token to send to the user
+    """
+    if settings.EMAIL_TOKENS['MODE'] == 'signed':
+        return signing.dumps(
+            {'u': str(user.pk), 's': _state_digest(purpose, user)},
+            salt=_salt(purpose)
+        )
+
+    token = secrets.token_urlsafe(32)
+    PURPOSES[purpose]['model'].objects.create(
+        user=user,
+        token=token,
+        expires_at=timezone.now() + timezone.timedelta(seconds=_max_age(purpose))
+    )
+    return token
+
+
+def check_token(purpose, token):
+    """
+    Validate a token without using it up.
+    Both formats are accepted whatever the current mode, so switching
+    modes doesn't break links that were already sent.
+
+    Args:
+        purpose: EMAIL_VERIFICATION or PASSWORD_RESET
+        token: Token string from the user
+
+    Returns:
+        User: Token's user, or None if the token is invalid, expired or used
+    """
+    if ':' in token:
+        return _check_signed_token(purpose, token)
+
+    row = PURPOSES[purpose]['model'].objects.select_related('user').filter(token=token).first()
+    if row is None or not row.is_valid():
+        return None
+    return row.user
+
+
+def use_token(purpose, token):
+    """
+    Mark a token as used.
+    Signed tokens need no bookkeeping: acting on them changes the state
+    they are bound to, which invalidates them.
+    """
+    if ':' in token:
+        return
+
+    PURPOSES[purpose]['model'].objects.filter(
+        token=token,
+        used_at__isnull=True
+    ).update(used_at=timezone.now())
+
+
+def _check_signed_token(purpose, token):
+    try:
+        payload = signing.loads(token, salt=_salt(purpose), max_age=_max_age(purpose))
+    except signing.BadSignature:
+        return None
+
+    user = User.objects.filter(pk=payload.get('u'), is_active=True).first()
+    if user is None:
+        return None
+
+    if not constant_time_compare(payload.get('s', ''), _state_digest(purpose, user)):
+        return None
+    return user
@@ -0,0 +1,102 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, get_hasher, identify_hasher
+from apps.core.exceptions import ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+class CalibratedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 hasher whose costs come from settings.PASSWORD_HASHING.
+    Uses the stock 'argon2' algorithm name, so existing argon2 hashes keep
+    verifying, and must_update() reports hashes made with other costs, so
+    they are upgraded on the user's next login.
+    Run `manage.py calibrate_password_hasher` to pick costs for a host.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_HASHING['ARGON2_TIME_COST']
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_HASHING['ARGON2_MEMORY_COST']
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_HASHING['ARGON2_PARALLELISM']
+
+
+def _get_pool():
+    global _pool, _slots
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                concurrency = settings.PASSWORD_HASHING['CONCURRENCY']
+                queue_depth = settings.PASSWORD_HASHING['QUEUE_DEPTH']
+                _slots = threading.BoundedSemaphore(concurrency + queue_depth)
+                _pool = ThreadPoolExecutor(
+                    max_workers=concurrency,
+                    thread_name_prefix='password-hashing'
+                )
+    return _pool, _slots
+
+
+def run_hasher(func, *args):
+    """
+    Run a password hashing call on the bounded hashing pool.
+    At most CONCURRENCY hashes run at once per process and at most
+    QUEUE_DEPTH more may wait; beyond that the call is rejected instead of
+    tying up a request thread. argon2 releases the GIL while hashing, so
+    the pool threads run in parallel with request handling.
+
+    Args:
+        func: Hashing function (e.g., make_password, check_password)
+        *args: Arguments for func
+
+    Returns:
+        Result of func
+
+    Raises:
+        ServiceUnavailableError: If the pool and its queue are full (503)
+    """
+    pool, slots = _get_pool()
+
+    if not slots.acquire(blocking=False):
+        logger.warning("Password hashing pool saturated, rejecting request")
+        raise ServiceUnavailableError(wait=settings.PASSWORD_HASHING['RETRY_AFTER'])
+
+    try:
+        return pool.submit(func, *args).result()
+    finally:
+        slots.release()
+
+
+def needs_rehash(encoded):
+    """Check whether a stored hash uses an outdated algorithm or outdated costs"""
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+
+    preferred = get_hasher('default')
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+def reset_hashing_pool():
+    """Drop the pool so it is rebuilt from current settings (used by tests)"""
+    global _pool, _slots
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = None
+        _slots = None
@@ -0,0 +1,123 @@
+import logging
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from .models import User
+from .user_cache import invalidate_user_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _lock_key(email):
+    return f"login_lock:{email}"
+
+
+def _window_keys(scope, identifier, now):
+    """Keys of the current and previous fixed window for a counter"""
+    window = int(now // settings.LOGIN_LOCKOUT['WINDOW'])
+    return (
+        f"login_fail:{scope}:{identifier}:{window}",
+        f"login_fail:{scope}:{identifier}:{window - 1}",
+    )
+
+
+def _estimate(current, previous, now):
+    """
+    Sliding-window count from two fixed windows: the previous window's
+    count is weighted by how much of it still overlaps the sliding window.
+    """
+    window = settings.LOGIN_LOCKOUT['WINDOW']
+    overlap = 1 - (now % window) / window
+    return current + previous * overlap
+
+
+def _increment(key):
+    timeout = settings.LOGIN_LOCKOUT['WINDOW'] * 2
+    cache.add(key, 0, timeout=timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, timeout=timeout)
+        return 1
+
+
+def get_login_block(email, ip_address):
+    """
+    Check lockout state before the user is loaded or a password is hashed.
+    Reads the lock and both counters in one cache round trip.
+
+    Args:
+        email: Normalized email address being logged into
+        ip_address: Client IP address (may be None)
+
+    Returns:
+        tuple: ('account', locked_until datetime), ('ip', None) or (None, None)
+    """
+    now = time.time()
+    lock_key = _lock_key(email)
+    ip_keys = _window_keys('ip', ip_address, now) if ip_address else ()
+
+    values = cache.get_many([lock_key, *ip_keys])
+
+    if lock_key in values:
+        return 'account', datetime.fromtimestamp(values[lock_key], tz=dt_timezone.utc)
+
+    if ip_keys:
+        count = _estimate(values.get(ip_keys[0], 0), values.get(ip_keys[1], 0), now)
+        if count >= settings.LOGIN_LOCKOUT['IP_LIMIT']:
+            return 'ip', None
+
+    return None, None
+
+
+def record_failed_login(email, ip_address, user=None):
+    """
+    Count a failed login against the account and the client IP.
+    Only the transition into the locked state touches the database.
+
+    Args:
+        email: Normalized email address
+        ip_address: Client IP address (may be None)
+        user: User instance if the email belongs to an account
+
+    Returns:
+        datetime: Lock expiry if this failure locked the account, else None
+    """
+    now = time.time()
+
+    if ip_address:
+        _increment(_window_keys('ip', ip_address, now)[0])
+
+    current_key, previous_key = _window_keys('account', email, now)
+    current = _increment(current_key)
+    count = _estimate(current, cache.get(previous_key, 0), now)
+
+    if count < settings.LOGIN_LOCKOUT['ACCOUNT_LIMIT']:
+        return None
+
+    locked_until = timezone.now() + timezone.timedelta(seconds=settings.LOGIN_LOCKOUT['LOCK_DURATION'])
+
+    # Only the request that wins the lock key persists it
+    if not cache.add(_lock_key(email), locked_until.timestamp(), timeout=settings.LOGIN_LOCKOUT['LOCK_DURATION']):
+        return None
+
+    cache.delete_many([current_key, previous_key])
+
+    if user is not None:
+        User.objects.filter(pk=user.pk).update(
+            failed_login_attempts=int(count),
+            locked_until=locked_until
+        )
+        transaction.on_commit(lambda: invalidate_user_cache(user.pk))
+        logger.warning(f"Locked account {user.pk} after {int(count)} failed logins")
+
+    return locked_until
+
+
+def clear_failed_logins(email):
+    """Forget an account's failed attempts after a successful login"""
+    cache.delete_many(_window_keys('account', email, time.time()))
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.test.utils import override_settings
+
+from apps.core.benchmarks import BenchmarkCommand, time_calls
+from apps.authentication.models import User
+from apps.authentication.email_tokens import EMAIL_VERIFICATION, PASSWORD_RESET, make_token, check_token
+
+PURPOSES = {
+    'verification': EMAIL_VERIFICATION,
+    'reset': PASSWORD_RESET,
+}
+
+
+class Command(BenchmarkCommand):
+    help = 'Compare issuing and checking signed and database-backed email tokens'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--purpose',
+            choices=sorted(PURPOSES),
+            default='reset',
+            help='Token purpose to benchmark (default: reset, as sent by forgot-password)'
+        )
+
+    def run_benchmark(self, iterations, warmup, purpose, **options):
+        user = User.objects.create_user(
+            email='bench-email-tokens@example.com',
+            password='BenchPass123!'
+        )
+        purpose = PURPOSES[purpose]
+
+        for mode in ('database', 'signed'):
+            email_tokens = {**settings.EMAIL_TOKENS, 'MODE': mode}
+
+            with override_settings(EMAIL_TOKENS=email_tokens):
+                token = make_token(purpose, user)
+
+                def check():
+                    assert check_token(purpose, token) == user
+
+                self.report(f'make_token ({mode})', time_calls(lambda: make_token(purpose, user), iterations, warmup))
+                self.report(f'check_token ({mode})', time_calls(check, iterations, warmup))
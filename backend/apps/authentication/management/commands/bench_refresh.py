@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.benchmarks import BenchmarkCommand, time_calls
+from apps.authentication.models import User
+from apps.authentication.backends import generate_refresh_token
+
+STORES = {
+    'database': 'apps.authentication.token_store.DatabaseRefreshTokenStore',
+    'redis': 'apps.authentication.token_store.RedisRefreshTokenStore',
+}
+
+
+class Command(BenchmarkCommand):
+    help = 'Measure POST /api/auth/refresh/ latency for each refresh token store'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--store',
+            action='append',
+            choices=sorted(STORES),
+            help='Store to benchmark (repeatable, default: all)'
+        )
+
+    def run_benchmark(self, iterations, warmup, store=None, **options):
+        user = User.objects.create_user(
+            email='bench-refresh@example.com',
+            password='BenchPass123!'
+        )
+        client = APIClient()
+        url = reverse('refresh-token')
+
+        for name in store or sorted(STORES):
+            jwt_settings = {**settings.JWT_SETTINGS, 'REFRESH_TOKEN_STORE': STORES[name]}
+
+            with override_settings(JWT_SETTINGS=jwt_settings):
+                try:
+                    current = [generate_refresh_token(user).token]
+                except Exception as e:
+                    self.stdout.write(self.style.WARNING(f'Skipping {name} store: {e}'))
+                    continue
+
+                def refresh():
+                    response = client.post(url, {'refresh_token': current[0]}, format='json')
+                    assert response.status_code == 200, response.data
+                    current[0] = response.data['refresh_token']
+
+                self.report(f'POST /api/auth/refresh/ ({name})', time_calls(refresh, iterations, warmup))
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.benchmarks import BenchmarkCommand, time_calls
+from apps.authentication.models import User
+from apps.authentication.backends import generate_access_token
+from apps.authentication.user_cache import clear_local_user_cache
+
+
+class Command(BenchmarkCommand):
+    help = 'Compare authenticated requests/sec with and without the user cache'
+
+    def run_benchmark(self, iterations, warmup, **options):
+        user = User.objects.create_user(
+            email='bench-user-cache@example.com',
+            password='BenchPass123!'
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(user)}')
+        url = reverse('user-profile')
+
+        def request():
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+
+        for enabled in (False, True):
+            clear_local_user_cache()
+            user_cache = {**settings.USER_CACHE, 'ENABLED': enabled}
+
+            with override_settings(USER_CACHE=user_cache):
+                label = f"GET /api/auth/profile/ (cache {'on' if enabled else 'off'})"
+                self.report(label, time_calls(request, iterations, warmup))
@@ -0,0 +1,98 @@
+import os
+import statistics
+import time
+from argon2 import PasswordHasher
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# OWASP minimum for argon2id is 19 MiB
+MIN_MEMORY_COST = 19 * 1024
+
+
+class Command(BaseCommand):
+    help = 'Pick argon2 time/memory costs that hash in about --target-ms on this host'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target-ms',
+            type=float,
+            default=250,
+            help='Target time for one password hash in milliseconds'
+        )
+        parser.add_argument(
+            '--max-memory',
+            type=int,
+            default=262144,
+            help='Largest memory cost to try, in KiB'
+        )
+        parser.add_argument(
+            '--parallelism',
+            type=int,
+            default=settings.PASSWORD_HASHING['ARGON2_PARALLELISM'],
+            help='Argon2 lanes (parallelism)'
+        )
+        parser.add_argument(
+            '--samples',
+            type=int,
+            default=5,
+            help='Hashes timed per candidate'
+        )
+
+    def handle(self, *args, **options):
+        target = options['target_ms'] / 1000
+        parallelism = options['parallelism']
+        samples = options['samples']
+
+        current = self.measure(
+            settings.PASSWORD_HASHING['ARGON2_TIME_COST'],
+            settings.PASSWORD_HASHING['ARGON2_MEMORY_COST'],
+            parallelism,
+            samples
+        )
+        self.stdout.write(f'Current settings: {current * 1000:.1f}ms per hash')
+
+        # Prefer memory over iterations: it is what makes GPU attacks expensive
+        best = None
+        memory_cost = options['max_memory']
+        while memory_cost >= MIN_MEMORY_COST and best is None:
+            for time_cost in range(1, 11):
+                elapsed = self.measure(time_cost, memory_cost, parallelism, samples)
+                self.stdout.write(
+                    f'  time_cost={time_cost} memory_cost={memory_cost}KiB: {elapsed * 1000:.1f}ms'
+                )
+                if elapsed > target:
+                    break
+                best = (time_cost, memory_cost, elapsed)
+            memory_cost //= 2
+
+        if best is None:
+            self.stdout.write(self.style.ERROR(
+                f'No parameters reach {options["target_ms"]}ms with at least {MIN_MEMORY_COST}KiB'
+            ))
+            return
+
+        time_cost, memory_cost, elapsed = best
+        concurrency = max(1, (os.cpu_count() or 1) // 2)
+
+        self.stdout.write(self.style.SUCCESS(f'Selected parameters ({elapsed * 1000:.1f}ms per hash):'))
+        self.stdout.write(f'ARGON2_TIME_COST={time_cost}')
+        self.stdout.write(f'ARGON2_MEMORY_COST={memory_cost}')
+        self.stdout.write(f'ARGON2_PARALLELISM={parallelism}')
+        self.stdout.write(f'PASSWORD_HASHING_CONCURRENCY={concurrency}')
+        self.stdout.write('Existing hashes are upgraded to the new costs on each user\'s next login.')
+
+    def measure(self, time_cost, memory_cost, parallelism, samples):
+        """Median wall time of one hash with the given costs"""
+        hasher = PasswordHasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism
+        )
+        hasher.hash('warm-up password')
+
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            hasher.hash('calibration password')
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings)
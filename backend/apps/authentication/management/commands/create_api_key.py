@@ -0,0 +1,55 @@
+import uuid
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from apps.authentication.api_keys import create_api_key
+from apps.organizations.models import Organization
+
+
+class Command(BaseCommand):
+    help = 'Create an organization API key and print it (it cannot be shown again)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('organization', help='Organization id or slug')
+        parser.add_argument('--name', required=True, help='Label for the key')
+        parser.add_argument(
+            '--scope',
+            action='append',
+            default=[],
+            help='Permission code granted to the key (repeatable, e.g. invoices.create)'
+        )
+        parser.add_argument(
+            '--expires-days',
+            type=int,
+            default=None,
+            help='Days until the key expires (default: never)'
+        )
+
+    def handle(self, *args, **options):
+        lookup = Q(slug=options['organization'])
+        try:
+            lookup |= Q(pk=uuid.UUID(options['organization']))
+        except ValueError:
+            pass
+
+        organization = Organization.objects.filter(lookup).first()
+        if organization is None:
+            raise CommandError(f"Organization '{options['organization']}' not found")
+
+        expires_at = None
+        if options['expires_days']:
+            expires_at = timezone.now() + timedelta(days=options['expires_days'])
+
+        try:
+            api_key, raw_key = create_api_key(
+                organization,
+                options['name'],
+                options['scope'],
+                expires_at=expires_at
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f'Created API key {api_key.prefix} for {organization.name}'))
+        self.stdout.write(raw_key)
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from apps.authentication import partitions
+from apps.authentication.purge import is_partitioned
+
+
+class Command(BaseCommand):
+    help = 'Partition refresh_tokens by month of expires_at and maintain its partitions (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Rebuild refresh_tokens as a partitioned table (locks the table while copying)'
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=settings.TOKEN_PURGE['PARTITION_MONTHS_AHEAD'],
+            help='Months of future partitions to keep created'
+        )
+        parser.add_argument(
+            '--drop-expired',
+            action='store_true',
+            help='Drop partitions past REFRESH_TOKEN_RETENTION'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('Partitioning is only supported on PostgreSQL')
+
+        table = partitions.TABLE
+
+        if not is_partitioned(table):
+            if not options['convert']:
+                raise CommandError(f'{table} is not partitioned; run with --convert first')
+            copied = partitions.convert_to_partitioned(options['months_ahead'])
+            self.stdout.write(self.style.SUCCESS(f'Converted {table} ({copied} rows copied)'))
+
+        created = partitions.ensure_future_partitions(options['months_ahead'])
+        for name in created:
+            self.stdout.write(f'Created {name}')
+
+        if options['drop_expired']:
+            cutoff = timezone.now() - settings.TOKEN_PURGE['REFRESH_TOKEN_RETENTION']
+            for name in partitions.drop_expired_partitions(cutoff):
+                self.stdout.write(f'Dropped {name}')
+
+        self.stdout.write(f'{table} has {len(partitions.list_partitions())} partition(s)')
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.authentication.purge import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete expired refresh, verification and password reset tokens in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.TOKEN_PURGE['BATCH_SIZE'],
+            help='Rows deleted per statement'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=settings.TOKEN_PURGE['SLEEP'],
+            help='Seconds to pause between batches'
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=None,
+            help='Stop after this many batches per table'
+        )
+
+    def handle(self, *args, **options):
+        def progress(table, deleted, batch_seconds):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  {table}: {deleted} deleted ({batch_seconds * 1000:.1f}ms last batch)')
+
+        metrics = purge_expired_tokens(
+            batch_size=options['batch_size'],
+            sleep=options['sleep'],
+            max_batches=options['max_batches'],
+            progress=progress
+        )
+
+        for table, result in metrics.items():
+            if result['deleted'] is None:
+                self.stdout.write(
+                    f"{table}: dropped {result['partitions_dropped']} partition(s) "
+                    f"in {result['seconds']:.2f}s"
+                )
+            else:
+                self.stdout.write(
+                    f"{table}: deleted {result['deleted']} row(s) in {result['batches']} batch(es), "
+                    f"{result['seconds']:.2f}s"
+                )
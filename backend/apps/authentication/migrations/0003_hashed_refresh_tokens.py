@@ -0,0 +1,45 @@
+import hashlib
+
+import apps.core.ids
+from django.db import migrations, models
+
+
+def hash_existing_tokens(apps, schema_editor):
+    RefreshToken = apps.get_model("authentication", "RefreshToken")
+    for token in RefreshToken.objects.only("id", "token_hash").iterator():
+        token.token_hash = hashlib.sha256(token.token_hash.encode()).hexdigest()
+        token.family = token.id
+        token.save(update_fields=["token_hash", "family"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0002_uuid7_primary_keys"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="refreshtoken",
+            old_name="token",
+            new_name="token_hash",
+        ),
+        migrations.AddField(
+            model_name="refreshtoken",
+            name="family",
+            field=models.UUIDField(null=True, editable=False),
+        ),
+        migrations.RunPython(hash_existing_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="refreshtoken",
+            name="token_hash",
+            field=models.CharField(max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="refreshtoken",
+            name="family",
+            field=models.UUIDField(
+                db_index=True, default=apps.core.ids.uuid7, editable=False
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0004_user_tokens_valid_after"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="emailverificationtoken",
+            name="expires_at",
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="passwordresettoken",
+            name="expires_at",
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
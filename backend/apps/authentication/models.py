@@ -1,8 +1,8 @@
-import uuid
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from django.core.validators import EmailValidator
+from apps.core.ids import uuid7
 
 
 class UserManager(BaseUserManager):
@@ -34,7 +34,7 @@ class UserManager(BaseUserManager):
 class User(AbstractBaseUser, PermissionsMixin):
     """Custom user model with email as username"""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     email = models.EmailField(
         max_length=255,
         unique=True,
@@ -54,6 +54,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     last_login_at = models.DateTimeField(null=True, blank=True)
+    # Tokens issued before this moment are rejected (password change, reset)
+    tokens_valid_after = models.DateTimeField(null=True, blank=True)
     
     objects = UserManager()
     
@@ -69,6 +71,38 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        
+        # Drop cached copies once the change is visible to other requests
+        from .user_cache import invalidate_user_cache
+        transaction.on_commit(lambda: invalidate_user_cache(self.pk))
+    
+    def set_password(self, raw_password):
+        from django.contrib.auth.hashers import make_password
+        from .hashing import run_hasher
+        
+        self.password = run_hasher(make_password, raw_password)
+        self._password = raw_password
+    
+    def check_password(self, raw_password):
+        """
+        Verify a password on the hashing pool.
+        Hashes made with an old algorithm or old argon2 costs are replaced
+        with one using the current settings.
+        """
+        from django.contrib.auth.hashers import check_password
+        from .hashing import run_hasher, needs_rehash
+        
+        is_correct = run_hasher(check_password, raw_password, self.password)
+        
+        if is_correct and needs_rehash(self.password):
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+        
+        return is_correct
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip() or self.email
@@ -79,30 +113,53 @@ class User(AbstractBaseUser, PermissionsMixin):
             return True
         return False
     
-    def increment_failed_login(self):
-        """Increment failed login attempts and lock if threshold reached"""
-        self.failed_login_attempts += 1
+    def is_token_revoked(self, issued_at):
+        """
+        Check a token's issue time against the revocation epoch.
         
-        # Lock account after 10 failed attempts for 30 minutes
-        if self.failed_login_attempts >= 10:
-            self.locked_until = timezone.now() + timezone.timedelta(minutes=30)
+        Args:
+            issued_at: Unix timestamp (or aware datetime) the token was issued at
         
-        self.save(update_fields=['failed_login_attempts', 'locked_until'])
+        Returns:
+            bool: True if the token was issued before tokens_valid_after
+        """
+        if self.tokens_valid_after is None:
+            return False
+        if issued_at is None:
+            return True
+        if hasattr(issued_at, 'timestamp'):
+            issued_at = issued_at.timestamp()
+        return issued_at < self.tokens_valid_after.timestamp()
     
     def reset_failed_login(self):
-        """Reset failed login attempts after successful login"""
-        self.failed_login_attempts = 0
-        self.locked_until = None
+        """
+        Clear lockout state and record the login.
+        Failed attempts are counted in the cache (see lockout.py), so the row
+        only changes after a lock; last_login_at goes through the touch buffer.
+        """
+        from apps.core.touch import touch
+        
+        if self.failed_login_attempts or self.locked_until:
+            self.failed_login_attempts = 0
+            self.locked_until = None
+            self.save(update_fields=['failed_login_attempts', 'locked_until'])
+        
         self.last_login_at = timezone.now()
-        self.save(update_fields=['failed_login_attempts', 'locked_until', 'last_login_at'])
+        touch(User, self.pk, 'last_login_at', self.last_login_at)
 
 
 class RefreshToken(models.Model):
-    """Store refresh tokens for JWT authentication"""
+    """
+    Store refresh tokens for JWT authentication.
+    Durable record and audit log for every token store backend.
+    """
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='refresh_tokens')
-    token = models.CharField(max_length=500, unique=True, db_index=True)
+    # SHA-256 of the token; the plaintext is only ever returned to the client
+    token_hash = models.CharField(max_length=64, unique=True)
+    # Tokens created by rotating another token share its family
+    family = models.UUIDField(default=uuid7, db_index=True, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField(db_index=True)
@@ -140,12 +197,12 @@ class RefreshToken(models.Model):
 class EmailVerificationToken(models.Model):
     """Tokens for email verification"""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='verification_tokens')
     token = models.CharField(max_length=100, unique=True, db_index=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
     used_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
@@ -169,12 +226,12 @@ class EmailVerificationToken(models.Model):
 class PasswordResetToken(models.Model):
     """Tokens for password reset"""
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='password_reset_tokens')
     token = models.CharField(max_length=100, unique=True, db_index=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
     used_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
@@ -192,4 +249,65 @@ class PasswordResetToken(models.Model):
     def mark_used(self):
         """Mark token as used"""
         self.used_at = timezone.now()
-        self.save(update_fields=['used_at'])
\ No newline at end of file
+        self.save(update_fields=['used_at'])
+
+
+class APIKey(models.Model):
+    """
+    Organization-scoped key for machine clients (ERP integrations, ...).
+    Keys look like `isk_<prefix>_<secret>`: the prefix is stored in clear
+    for lookup and only a SHA-256 of the secret is kept.
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    organization = models.ForeignKey(
+        'organizations.Organization',
+        on_delete=models.CASCADE,
+        related_name='api_keys'
+    )
+    name = models.CharField(max_length=100)
+    prefix = models.CharField(max_length=16, unique=True)
+    secret_hash = models.CharField(max_length=64)
+    # Permission codes from the role/permission catalogue
+    scopes = models.JSONField(default=list)
+    
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='created_api_keys'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+    
+    # Usage, written through the touch buffer
+    last_used_at = models.DateTimeField(null=True, blank=True)
+    usage_count = models.BigIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'api_keys'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.name} ({self.prefix})"
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        
+        from .api_keys import invalidate_api_key
+        invalidate_api_key(self.prefix)
+    
+    def is_valid(self):
+        """Check if key can still be used"""
+        if self.revoked_at:
+            return False
+        if self.expires_at and self.expires_at < timezone.now():
+            return False
+        return self.organization.is_active
+    
+    def revoke(self):
+        """Revoke the key"""
+        self.revoked_at = timezone.now()
+        self.save(update_fields=['revoked_at'])
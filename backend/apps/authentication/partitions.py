@@ -0,0 +1,181 @@
+"""
+Optional native PostgreSQL range partitioning of refresh_tokens by expires_at.
+
+With monthly partitions, purging expired tokens is a DROP of whole
+partitions instead of row DELETEs. PostgreSQL requires unique constraints
+on a partitioned table to include the partition key, so after conversion
+the primary key is (id, expires_at) and token_hash has a plain index;
+token hashes are 256-bit random values, so this doesn't change behaviour.
+
+Conversion is an operational step (`manage.py partition_refresh_tokens
+--convert`), not a migration: Django's model state stays the same.
+"""
+import logging
+from datetime import datetime, timezone as dt_timezone
+from django.db import connection, transaction
+from .models import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+TABLE = RefreshToken._meta.db_table
+PARTITION_PREFIX = f'{TABLE}_p'
+
+
+def _month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def _next_month(value):
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def partition_name(month_start):
+    return f'{PARTITION_PREFIX}{month_start:%Y%m}'
+
+
+def list_partitions():
+    """
+    Returns:
+        list: (partition name, month start) pairs, oldest first
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = to_regclass(%s)',
+            [TABLE]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        suffix = name[len(PARTITION_PREFIX):]
+        if name.startswith(PARTITION_PREFIX) and len(suffix) == 6 and suffix.isdigit():
+            month = datetime(int(suffix[:4]), int(suffix[4:]), 1, tzinfo=dt_timezone.utc)
+            partitions.append((name, month))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def ensure_partitions(until, since=None):
+    """
+    Create the monthly partitions covering [since, until).
+
+    Args:
+        until: Datetime the partitions must reach
+        since: First month to cover (default: current month)
+
+    Returns:
+        list: Names of the partitions created
+    """
+    now = datetime.now(dt_timezone.utc)
+    month = _month_start(min(since, now) if since else now)
+    quote = connection.ops.quote_name
+    created = []
+
+    with connection.cursor() as cursor:
+        while month < until:
+            upper = _next_month(month)
+            name = partition_name(month)
+            cursor.execute('SELECT to_regclass(%s)', [name])
+            if cursor.fetchone()[0] is None:
+                cursor.execute(
+                    f'CREATE TABLE {quote(name)} PARTITION OF {quote(TABLE)} '
+                    f'FOR VALUES FROM (%s) TO (%s)',
+                    [month, upper]
+                )
+                created.append(name)
+            month = upper
+
+    if created:
+        logger.info(f"Created refresh token partitions: {', '.join(created)}")
+    return created
+
+
+def ensure_future_partitions(months_ahead, since=None):
+    """
+    Create partitions from `since` (default: current month) through
+    `months_ahead` months after the current one. Run regularly (the purge
+    job does) so inserts never hit a month without a partition.
+    """
+    until = _month_start(datetime.now(dt_timezone.utc))
+    for _ in range(months_ahead + 1):
+        until = _next_month(until)
+    return ensure_partitions(until, since=since)
+
+
+def drop_expired_partitions(cutoff):
+    """
+    Drop partitions whose every row expired before `cutoff`.
+    Each partition is detached first, so readers of the parent table are
+    never blocked on the DROP.
+
+    Returns:
+        list: Names of the partitions dropped
+    """
+    quote = connection.ops.quote_name
+    dropped = []
+
+    for name, month in list_partitions():
+        if _next_month(month) > cutoff:
+            break
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(name)}')
+                cursor.execute(f'DROP TABLE {quote(name)}')
+        dropped.append(name)
+
+    if dropped:
+        logger.info(f"Dropped expired refresh token partitions: {', '.join(dropped)}")
+    return dropped
+
+
+def convert_to_partitioned(months_ahead):
+    """
+    Rebuild refresh_tokens as a table partitioned by month of expires_at,
+    copying the existing rows. Runs in one transaction and holds an
+    exclusive lock on refresh_tokens while it copies, so run it in a
+    maintenance window (or after purging expired rows).
+
+    Args:
+        months_ahead: Months of future partitions to create
+    """
+    quote = connection.ops.quote_name
+    old_table = f'{TABLE}_unpartitioned'
+    user_table = RefreshToken._meta.get_field('user').related_model._meta.db_table
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {quote(TABLE)} IN ACCESS EXCLUSIVE MODE')
+            cursor.execute(f'SELECT min(expires_at) FROM {quote(TABLE)}')
+            oldest = cursor.fetchone()[0]
+
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} RENAME TO {quote(old_table)}')
+            cursor.execute(
+                f'CREATE TABLE {quote(TABLE)} '
+                f'(LIKE {quote(old_table)} INCLUDING DEFAULTS) '
+                f'PARTITION BY RANGE (expires_at)'
+            )
+            cursor.execute(f'ALTER TABLE {quote(TABLE)} ADD PRIMARY KEY (id, expires_at)')
+            cursor.execute(
+                f'ALTER TABLE {quote(TABLE)} ADD FOREIGN KEY (user_id) '
+                f'REFERENCES {quote(user_table)} (id) DEFERRABLE INITIALLY DEFERRED'
+            )
+            for columns in (['token_hash'], ['family'], ['user_id', 'revoked_at'], ['expires_at', 'revoked_at']):
+                index_name = f"{TABLE}_{'_'.join(columns)}_part_idx"
+                cursor.execute(
+                    f'CREATE INDEX {quote(index_name)} ON {quote(TABLE)} '
+                    f"({', '.join(quote(column) for column in columns)})"
+                )
+
+        ensure_future_partitions(months_ahead, since=oldest)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'INSERT INTO {quote(TABLE)} SELECT * FROM {quote(old_table)}')
+            copied = cursor.rowcount
+            cursor.execute(f'DROP TABLE {quote(old_table)}')
+
+    logger.info(f"Converted {TABLE} to a partitioned table ({copied} rows copied)")
+    return copied
@@ -0,0 +1,117 @@
+import logging
+import time
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from .models import RefreshToken, EmailVerificationToken, PasswordResetToken
+
+logger = logging.getLogger(__name__)
+
+PURGED_MODELS = (RefreshToken, EmailVerificationToken, PasswordResetToken)
+
+
+def purge_expired_tokens(batch_size=None, sleep=None, max_batches=None, progress=None):
+    """
+    Delete expired tokens in small batches.
+    Each batch selects at most `batch_size` primary keys in expires_at order
+    (served by the expires_at indexes) and deletes them in its own short
+    transaction, so locks are held briefly and WAL is written in small
+    pieces that replicas can keep up with. `sleep` seconds between batches
+    throttle the job further.
+
+    Refresh tokens are kept for REFRESH_TOKEN_RETENTION after expiry as an
+    audit trail. If refresh_tokens has been partitioned (see the
+    partition_refresh_tokens command), whole partitions are dropped instead
+    and the next PARTITION_MONTHS_AHEAD months of partitions are created.
+
+    Args:
+        batch_size: Rows per DELETE (default TOKEN_PURGE['BATCH_SIZE'])
+        sleep: Seconds to pause between batches (default TOKEN_PURGE['SLEEP'])
+        max_batches: Stop after this many batches per table (None = no limit)
+        progress: Optional callable(table, deleted_so_far, batch_seconds)
+
+    Returns:
+        dict: Per table {'deleted', 'batches', 'seconds'}
+    """
+    batch_size = batch_size or settings.TOKEN_PURGE['BATCH_SIZE']
+    sleep = settings.TOKEN_PURGE['SLEEP'] if sleep is None else sleep
+    now = timezone.now()
+
+    metrics = {}
+    for model in PURGED_MODELS:
+        table = model._meta.db_table
+        cutoff = now
+
+        if model is RefreshToken:
+            cutoff = now - settings.TOKEN_PURGE['REFRESH_TOKEN_RETENTION']
+            if is_partitioned(table):
+                from .partitions import drop_expired_partitions, ensure_future_partitions
+                started = time.monotonic()
+                dropped = drop_expired_partitions(cutoff)
+                ensure_future_partitions(settings.TOKEN_PURGE['PARTITION_MONTHS_AHEAD'])
+                metrics[table] = {
+                    'deleted': None,
+                    'partitions_dropped': len(dropped),
+                    'batches': 0,
+                    'seconds': time.monotonic() - started,
+                }
+                continue
+
+        metrics[table] = _purge_table(model, cutoff, batch_size, sleep, max_batches, progress)
+
+    logger.info(
+        "Purged expired tokens - " + ", ".join(
+            f"{table}: {result['deleted'] if result['deleted'] is not None else 'partitions'}"
+            for table, result in metrics.items()
+        )
+    )
+    return metrics
+
+
+def _purge_table(model, cutoff, batch_size, sleep, max_batches, progress):
+    table = model._meta.db_table
+    deleted = 0
+    batches = 0
+    started = time.monotonic()
+
+    while max_batches is None or batches < max_batches:
+        batch_started = time.monotonic()
+
+        ids = list(
+            model.objects.filter(expires_at__lt=cutoff)
+            .order_by('expires_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+
+        count, _ = model.objects.filter(pk__in=ids).delete()
+        deleted += count
+        batches += 1
+
+        if progress:
+            progress(table, deleted, time.monotonic() - batch_started)
+
+        if len(ids) < batch_size:
+            break
+        if sleep:
+            time.sleep(sleep)
+
+    return {
+        'deleted': deleted,
+        'batches': batches,
+        'seconds': time.monotonic() - started,
+    }
+
+
+def is_partitioned(table):
+    """Check whether a table is a native PostgreSQL partitioned table"""
+    if connection.vendor != 'postgresql':
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)',
+            [table]
+        )
+        return cursor.fetchone() is not None
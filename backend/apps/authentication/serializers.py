@@ -1,11 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from .models import User, EmailVerificationToken, PasswordResetToken
-from .backends import generate_access_token, generate_refresh_token
-import secrets
-from django.utils import timezone
-from datetime import timedelta
+from .models import User
+from apps.core.exceptions import RateLimitExceededError
+from .backends import generate_access_token, generate_refresh_token, get_client_ip
+from .lockout import get_login_block, record_failed_login, clear_failed_logins
+from .email_tokens import EMAIL_VERIFICATION, PASSWORD_RESET, make_token, check_token, use_token
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -56,21 +56,23 @@ class RegisterSerializer(serializers.Serializer):
             last_name=validated_data.get('last_name', '')
         )
         
-        # Create verification token
-        token = secrets.token_urlsafe(32)
-        EmailVerificationToken.objects.create(
-            user=user,
-            token=token,
-            expires_at=timezone.now() + timedelta(hours=24)
-        )
-        
-        # # Send verification email (via Celery task)
+        # # Send verification email (via Celery task); the token is only
+        # # made where it is sent
         # from .tasks import send_verification_email
-        # send_verification_email.delay(user.id, token)
+        # send_verification_email.delay(user.id, make_token(EMAIL_VERIFICATION, user))
         
         return user
 
 
+def raise_account_locked(locked_until):
+    raise serializers.ValidationError({
+        "detail": (
+            "Account is locked due to too many failed login attempts. "
+            f"Try again after {locked_until.strftime('%Y-%m-%d %H:%M:%S')}."
+        )
+    })
+
+
 class LoginSerializer(serializers.Serializer):
     """Serializer for user login"""
     
@@ -81,22 +83,33 @@ class LoginSerializer(serializers.Serializer):
         """Validate credentials and return tokens"""
         email = data.get('email', '').lower()
         password = data.get('password')
+        request = self.context.get('request')
+        ip_address = get_client_ip(request) if request else None
+        
+        # Check lockouts before loading the user or hashing anything
+        blocked, locked_until = get_login_block(email, ip_address)
+        if blocked == 'account':
+            raise_account_locked(locked_until)
+        if blocked == 'ip':
+            raise RateLimitExceededError(
+                'Too many failed login attempts from this address. Try again later.'
+            )
         
         try:
             user = User.objects.get(email=email)
         except User.DoesNotExist:
+            record_failed_login(email, ip_address)
             raise serializers.ValidationError({"detail": "Invalid credentials."})
         
-        # Check if account is locked
+        # Locks persisted to the database outlive the cache
         if user.is_locked():
-            locked_until = user.locked_until.strftime('%Y-%m-%d %H:%M:%S')
-            raise serializers.ValidationError({
-                "detail": f"Account is locked due to too many failed login attempts. Try again after {locked_until}."
-            })
+            raise_account_locked(user.locked_until)
         
         # Check password
         if not user.check_password(password):
-            user.increment_failed_login()
+            locked_until = record_failed_login(email, ip_address, user)
+            if locked_until:
+                raise_account_locked(locked_until)
             raise serializers.ValidationError({"detail": "Invalid credentials."})
         
         # Check if user is active
@@ -104,10 +117,10 @@ class LoginSerializer(serializers.Serializer):
             raise serializers.ValidationError({"detail": "Account is disabled."})
         
         # Reset failed login attempts
+        clear_failed_logins(email)
         user.reset_failed_login()
         
         # Generate tokens
-        request = self.context.get('request')
         access_token = generate_access_token(user)
         refresh_token = generate_refresh_token(user, request)
         
@@ -164,24 +177,18 @@ class VerifyEmailSerializer(serializers.Serializer):
     
     def validate_token(self, value):
         """Validate and use verification token"""
-        try:
-            verification_token = EmailVerificationToken.objects.get(token=value)
-            
-            if not verification_token.is_valid():
-                raise serializers.ValidationError("Verification token is invalid or expired.")
-            
-            # Mark user as verified
-            user = verification_token.user
-            user.is_verified = True
-            user.save(update_fields=['is_verified'])
-            
-            # Mark token as used
-            verification_token.mark_used()
-            
-            return value
-            
-        except EmailVerificationToken.DoesNotExist:
-            raise serializers.ValidationError("Invalid verification token.")
+        user = check_token(EMAIL_VERIFICATION, value)
+        if user is None:
+            raise serializers.ValidationError("Verification token is invalid or expired.")
+        
+        # Mark user as verified
+        user.is_verified = True
+        user.save(update_fields=['is_verified'])
+        
+        # Mark token as used
+        use_token(EMAIL_VERIFICATION, value)
+        
+        return value
 
 
 class ForgotPasswordSerializer(serializers.Serializer):
@@ -195,12 +202,7 @@ class ForgotPasswordSerializer(serializers.Serializer):
             user = User.objects.get(email=value.lower(), is_active=True)
             
             # Create password reset token
-            token = secrets.token_urlsafe(32)
-            PasswordResetToken.objects.create(
-                user=user,
-                token=token,
-                expires_at=timezone.now() + timedelta(hours=1)
-            )
+            token = make_token(PASSWORD_RESET, user)
             
             # Send reset email (via Celery task)
             from .tasks import send_password_reset_email
@@ -235,31 +237,24 @@ class ResetPasswordSerializer(serializers.Serializer):
     
     def validate_token(self, value):
         """Validate reset token"""
-        try:
-            reset_token = PasswordResetToken.objects.get(token=value)
-            
-            if not reset_token.is_valid():
-                raise serializers.ValidationError("Reset token is invalid or expired.")
-            
-            return value
-            
-        except PasswordResetToken.DoesNotExist:
-            raise serializers.ValidationError("Invalid reset token.")
+        self.reset_user = check_token(PASSWORD_RESET, value)
+        if self.reset_user is None:
+            raise serializers.ValidationError("Reset token is invalid or expired.")
+        
+        return value
     
     def save(self):
         """Reset user password"""
         token = self.validated_data['token']
         password = self.validated_data['password']
-        
-        reset_token = PasswordResetToken.objects.get(token=token)
-        user = reset_token.user
+        user = self.reset_user
         
         # Set new password
         user.set_password(password)
         user.save()
         
         # Mark token as used
-        reset_token.mark_used()
+        use_token(PASSWORD_RESET, token)
         
         # Revoke all existing refresh tokens for security
         from .backends import revoke_all_user_tokens
@@ -93,34 +93,12 @@
 
 # @shared_task
 # def cleanup_expired_tokens():
-#     """Periodic task to clean up expired tokens"""
-#     from .models import EmailVerificationToken, PasswordResetToken, RefreshToken
-#     from django.utils import timezone
+#     """Periodic task to purge expired tokens in small batches"""
+#     from .purge import purge_expired_tokens
     
 #     try:
-#         # Delete expired verification tokens
-#         expired_verification = EmailVerificationToken.objects.filter(
-#             expires_at__lt=timezone.now(),
-#             used_at__isnull=True
-#         ).delete()
-        
-#         # Delete expired password reset tokens
-#         expired_reset = PasswordResetToken.objects.filter(
-#             expires_at__lt=timezone.now(),
-#             used_at__isnull=True
-#         ).delete()
-        
-#         # Delete expired refresh tokens
-#         expired_refresh = RefreshToken.objects.filter(
-#             expires_at__lt=timezone.now()
-#         ).delete()
-        
-#         logger.info(
-#             f"Cleaned up tokens - "
-#             f"Verification: {expired_verification[0]}, "
-#             f"Reset: {expired_reset[0]}, "
-#             f"Refresh: {expired_refresh[0]}"
-#         )
+#         metrics = purge_expired_tokens()
+#         logger.info(f"Cleaned up tokens - {metrics}")
         
 #     except Exception as e:
 #         logger.error(f"Error cleaning up expired tokens: {str(e)}")
@@ -0,0 +1,113 @@
+import pytest
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.authentication.api_keys import KEY_PREFIX, create_api_key, get_api_key, APIKeyPrincipal
+from apps.authentication.models import APIKey
+from apps.core.touch import flush_touches
+
+
+@pytest.fixture
+def api_key(make_member):
+    member = make_member()
+    return create_api_key(member.organization, 'ERP sync', ['products.view', 'invoices.create'])
+
+
+def key_client(raw_key):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Api-Key {raw_key}')
+    return client
+
+
+@pytest.mark.django_db
+class TestAPIKeys:
+    
+    def test_key_implies_organization(self, api_key, make_member):
+        key, raw_key = api_key
+        make_member()
+        
+        client = key_client(raw_key)
+        response = client.get(reverse('organization-detail', args=[key.organization_id]))
+        assert response.status_code == status.HTTP_200_OK
+        
+        response = client.get(reverse('organization-list'))
+        assert [row['id'] for row in response.data['results']] == [str(key.organization_id)]
+    
+    def test_scopes_are_the_permissions(self, api_key):
+        key, raw_key = api_key
+        principal = APIKeyPrincipal(get_api_key(raw_key))
+        
+        assert principal.has_permission('invoices.create')
+        assert not principal.has_permission('invoices.delete')
+        assert principal.role_name is None
+    
+    def test_rejects_bad_and_revoked_keys(self, api_key, django_capture_on_commit_callbacks):
+        key, raw_key = api_key
+        url = reverse('organization-detail', args=[key.organization_id])
+        
+        assert key_client(raw_key[:-2] + 'xx').get(url).status_code == status.HTTP_401_UNAUTHORIZED
+        assert key_client('not-a-key').get(url).status_code == status.HTTP_401_UNAUTHORIZED
+        
+        assert get_api_key(raw_key) is not None
+        with django_capture_on_commit_callbacks(execute=True):
+            key.revoke()
+        
+        assert key_client(raw_key).get(url).status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_unknown_prefixes_stay_out_of_the_shared_cache(self, api_key, django_assert_num_queries):
+        fake = f"{KEY_PREFIX}_{'0' * 12}_secret"
+        
+        with django_assert_num_queries(1):
+            assert get_api_key(fake) is None
+        with django_assert_num_queries(0):
+            assert get_api_key(fake) is None
+            # Malformed prefixes aren't looked up at all
+            assert get_api_key(f'{KEY_PREFIX}_not-hex_secret') is None
+            assert get_api_key(f"{KEY_PREFIX}_{'a' * 40}_secret") is None
+        
+        assert cache.get(f"api_key_ver:{'0' * 12}") is None
+    
+    def test_warm_lookup_needs_no_queries(self, api_key, django_assert_num_queries):
+        _, raw_key = api_key
+        get_api_key(raw_key)
+        
+        with django_assert_num_queries(0):
+            assert get_api_key(raw_key) is not None
+    
+    def test_usage_is_counted(self, api_key):
+        key, raw_key = api_key
+        client = key_client(raw_key)
+        
+        for _ in range(3):
+            client.get(reverse('organization-detail', args=[key.organization_id]))
+        flush_touches()
+        
+        key.refresh_from_db()
+        assert key.usage_count == 3
+        assert key.last_used_at is not None
+    
+    def test_not_accepted_for_user_account_endpoints(self, api_key):
+        _, raw_key = api_key
+        
+        response = key_client(raw_key).get(reverse('user-profile'))
+        
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+    
+    def test_unknown_scope(self, make_member):
+        member = make_member()
+        
+        with pytest.raises(ValueError):
+            create_api_key(member.organization, 'Bad', ['invoices.launch'])
+    
+    def test_command(self, make_member):
+        member = make_member()
+        out = StringIO()
+        
+        call_command('create_api_key', member.organization.slug, '--name=CLI', '--scope=reports.view', stdout=out)
+        
+        raw_key = out.getvalue().strip().splitlines()[-1]
+        assert get_api_key(raw_key).scopes == ['reports.view']
+        assert APIKey.objects.count() == 1
@@ -0,0 +1,88 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.authentication.models import User, EmailVerificationToken, PasswordResetToken
+from apps.authentication.email_tokens import (
+    EMAIL_VERIFICATION,
+    PASSWORD_RESET,
+    make_token,
+    check_token,
+)
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(email='tokens@example.com', password='TestPass123!')
+
+
+@pytest.fixture
+def database_mode(settings):
+    settings.EMAIL_TOKENS = {**settings.EMAIL_TOKENS, 'MODE': 'database'}
+
+
+def verify(token):
+    return APIClient().post(reverse('verify-email'), {'token': token}, format='json')
+
+
+def reset(token, password='NewPass456!'):
+    return APIClient().post(reverse('reset-password'), {
+        'token': token,
+        'password': password,
+        'password_confirm': password
+    }, format='json')
+
+
+@pytest.mark.django_db
+class TestSignedEmailTokens:
+    
+    def test_verification_is_single_use(self, user):
+        token = make_token(EMAIL_VERIFICATION, user)
+        assert not EmailVerificationToken.objects.exists()
+        
+        assert verify(token).status_code == status.HTTP_200_OK
+        user.refresh_from_db()
+        assert user.is_verified
+        
+        assert verify(token).status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_reset_is_single_use(self, user):
+        token = make_token(PASSWORD_RESET, user)
+        
+        assert reset(token).status_code == status.HTTP_200_OK
+        user.refresh_from_db()
+        assert user.check_password('NewPass456!')
+        
+        # The password hash it was bound to has changed
+        assert reset(token, 'OtherPass789!').status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_purposes_and_tampering(self, user):
+        token = make_token(EMAIL_VERIFICATION, user)
+        
+        assert check_token(PASSWORD_RESET, token) is None
+        assert check_token(EMAIL_VERIFICATION, token[:-1] + 'x') is None
+    
+    def test_expired(self, user, settings):
+        token = make_token(PASSWORD_RESET, user)
+        settings.EMAIL_TOKENS = {**settings.EMAIL_TOKENS, 'PASSWORD_RESET_MAX_AGE': -1}
+        
+        assert check_token(PASSWORD_RESET, token) is None
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('database_mode')
+class TestDatabaseEmailTokens:
+    
+    def test_reset_marks_row_used(self, user):
+        token = make_token(PASSWORD_RESET, user)
+        
+        assert reset(token).status_code == status.HTTP_200_OK
+        assert PasswordResetToken.objects.get(token=token).used_at is not None
+        assert reset(token, 'OtherPass789!').status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_accepted_after_switching_to_signed(self, user, settings):
+        token = make_token(EMAIL_VERIFICATION, user)
+        settings.EMAIL_TOKENS = {**settings.EMAIL_TOKENS, 'MODE': 'signed'}
+        
+        assert verify(token).status_code == status.HTTP_200_OK
+        assert EmailVerificationToken.objects.get(token=token).used_at is not None
@@ -0,0 +1,75 @@
+import threading
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.authentication.models import User
+from apps.authentication.hashing import run_hasher, reset_hashing_pool
+
+FAST_ARGON2 = {
+    'ARGON2_TIME_COST': 1,
+    'ARGON2_MEMORY_COST': 8,
+    'ARGON2_PARALLELISM': 1,
+}
+
+
+@pytest.fixture
+def hashing_settings(settings):
+    def configure(**overrides):
+        settings.PASSWORD_HASHING = {**settings.PASSWORD_HASHING, **overrides}
+        reset_hashing_pool()
+    
+    yield configure
+    reset_hashing_pool()
+
+
+@pytest.mark.django_db
+class TestHashingPool:
+    
+    def test_saturated_pool_returns_503(self, hashing_settings):
+        User.objects.create_user(email='busy@example.com', password='TestPass123!')
+        hashing_settings(CONCURRENCY=1, QUEUE_DEPTH=0)
+        
+        started, release = threading.Event(), threading.Event()
+        
+        def slow_hash():
+            started.set()
+            release.wait(5)
+        
+        worker = threading.Thread(target=run_hasher, args=(slow_hash,))
+        worker.start()
+        started.wait(5)
+        
+        try:
+            response = APIClient().post(reverse('login'), {
+                'email': 'busy@example.com',
+                'password': 'TestPass123!'
+            }, format='json')
+        finally:
+            release.set()
+            worker.join()
+        
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response['Retry-After'] == '1'
+    
+    def test_rehash_on_login_when_costs_change(self, settings, hashing_settings):
+        user = User.objects.create_user(email='rehash@example.com', password='TestPass123!')
+        assert user.password.startswith('md5$')
+        
+        settings.PASSWORD_HASHERS = [
+            'apps.authentication.hashing.CalibratedArgon2PasswordHasher',
+            'django.contrib.auth.hashers.MD5PasswordHasher',
+        ]
+        hashing_settings(**FAST_ARGON2)
+        
+        assert user.check_password('TestPass123!')
+        user.refresh_from_db()
+        assert user.password.startswith('argon2$') and ',t=1,' in user.password
+        
+        hashing_settings(ARGON2_TIME_COST=2)
+        assert user.check_password('TestPass123!')
+        user.refresh_from_db()
+        assert ',t=2,' in user.password
+        
+        # Wrong passwords never trigger a rehash
+        assert not user.check_password('wrong')
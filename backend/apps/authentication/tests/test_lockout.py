@@ -0,0 +1,82 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.authentication.models import User
+
+
+@pytest.fixture
+def lockout_settings(settings):
+    settings.RATE_LIMIT = {**settings.RATE_LIMIT, 'ENABLED': False}
+    settings.LOGIN_LOCKOUT = {
+        'WINDOW': 900,
+        'ACCOUNT_LIMIT': 3,
+        'IP_LIMIT': 5,
+        'LOCK_DURATION': 1800,
+    }
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(email='lockout@example.com', password='TestPass123!')
+
+
+def login(password, email='lockout@example.com', ip='10.0.0.1'):
+    return APIClient().post(
+        reverse('login'),
+        {'email': email, 'password': password},
+        format='json',
+        REMOTE_ADDR=ip
+    )
+
+
+def users_updates(queries):
+    return [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "users"')]
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('lockout_settings')
+class TestLoginLockout:
+    
+    def test_failures_write_only_on_lock(self, user):
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(2):
+                assert login('wrong').status_code == status.HTTP_400_BAD_REQUEST
+        assert users_updates(queries) == []
+        
+        response = login('wrong')
+        assert 'locked' in response.data['error']['message']
+        
+        user.refresh_from_db()
+        assert user.locked_until is not None
+        assert user.failed_login_attempts == 3
+    
+    def test_locked_account_rejected_before_lookup(self, user, django_assert_num_queries):
+        for _ in range(3):
+            login('wrong')
+        
+        with django_assert_num_queries(0):
+            response = login('TestPass123!')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_ip_limit(self, user):
+        for i in range(5):
+            login('wrong', email=f'nobody{i}@example.com')
+        
+        assert login('TestPass123!').status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert login('TestPass123!', ip='10.0.0.2').status_code == status.HTTP_200_OK
+    
+    def test_success_clears_counters_without_writes(self, user):
+        # last_login_at goes through the touch buffer, so logins leave the row alone
+        for _ in range(2):
+            login('wrong')
+        with CaptureQueriesContext(connection) as queries:
+            assert login('TestPass123!').status_code == status.HTTP_200_OK
+        assert users_updates(queries) == []
+        
+        # The failed attempts were forgotten
+        for _ in range(2):
+            login('wrong')
+        assert login('TestPass123!').status_code == status.HTTP_200_OK
@@ -0,0 +1,71 @@
+import pytest
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from apps.authentication.models import User, RefreshToken, EmailVerificationToken
+from apps.authentication.purge import purge_expired_tokens
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(email='purge@example.com', password='TestPass123!')
+
+
+def make_refresh_tokens(user, count, expires_at):
+    RefreshToken.objects.bulk_create([
+        RefreshToken(user=user, token_hash=f'{expires_at.timestamp()}-{i}', expires_at=expires_at)
+        for i in range(count)
+    ])
+
+
+@pytest.mark.django_db
+class TestPurgeExpiredTokens:
+    """Batched purge of expired tokens"""
+
+    def test_deletes_in_batches(self, user):
+        now = timezone.now()
+        make_refresh_tokens(user, 7, now - timedelta(days=60))
+        make_refresh_tokens(user, 2, now + timedelta(days=1))
+
+        progress = []
+        metrics = purge_expired_tokens(
+            batch_size=3,
+            sleep=0,
+            progress=lambda table, deleted, seconds: progress.append((table, deleted))
+        )
+
+        assert metrics['refresh_tokens']['deleted'] == 7
+        assert metrics['refresh_tokens']['batches'] == 3
+        assert progress == [('refresh_tokens', 3), ('refresh_tokens', 6), ('refresh_tokens', 7)]
+        assert RefreshToken.objects.count() == 2
+
+    def test_refresh_tokens_kept_for_retention(self, user):
+        now = timezone.now()
+        make_refresh_tokens(user, 2, now - timedelta(days=1))
+        make_refresh_tokens(user, 1, now - timedelta(days=60))
+        EmailVerificationToken.objects.create(user=user, token='expired', expires_at=now - timedelta(days=1))
+        EmailVerificationToken.objects.create(user=user, token='valid', expires_at=now + timedelta(days=1))
+
+        metrics = purge_expired_tokens(sleep=0)
+
+        assert metrics['refresh_tokens']['deleted'] == 1
+        assert metrics['email_verification_tokens']['deleted'] == 1
+        assert RefreshToken.objects.count() == 2
+        assert list(EmailVerificationToken.objects.values_list('token', flat=True)) == ['valid']
+
+    def test_max_batches(self, user):
+        make_refresh_tokens(user, 5, timezone.now() - timedelta(days=60))
+
+        metrics = purge_expired_tokens(batch_size=2, sleep=0, max_batches=1)
+
+        assert metrics['refresh_tokens']['deleted'] == 2
+        assert RefreshToken.objects.count() == 3
+
+    def test_command(self, user):
+        make_refresh_tokens(user, 4, timezone.now() - timedelta(days=60))
+        out = StringIO()
+
+        call_command('purge_expired_tokens', '--batch-size=2', '--sleep=0', stdout=out)
+
+        assert 'refresh_tokens: deleted 4 row(s) in 2 batch(es)' in out.getvalue()
@@ -0,0 +1,336 @@
+import threading
+import pytest
+from datetime import timedelta
+from types import SimpleNamespace
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+from apps.authentication.models import User, RefreshToken
+from apps.authentication.backends import (
+    generate_access_token,
+    generate_refresh_token,
+    revoke_all_user_tokens,
+    rotate_refresh_token,
+)
+from apps.authentication.token_store import RedisRefreshTokenStore, hash_token
+from apps.authentication.user_cache import get_cached_user
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email='tokens@example.com',
+        password='TestPass123!'
+    )
+
+
+@pytest.mark.django_db
+class TestDatabaseRefreshTokenStore:
+    
+    def test_tokens_are_stored_hashed(self, user):
+        issued = generate_refresh_token(user)
+        
+        row = RefreshToken.objects.get(user=user)
+        assert row.token_hash == hash_token(issued.token)
+        assert not RefreshToken.objects.filter(token_hash=issued.token).exists()
+    
+    def test_rotation_keeps_family(self, user, django_assert_num_queries):
+        issued = generate_refresh_token(user)
+        get_cached_user(user.id)
+        
+        # SELECT, conditional UPDATE, INSERT (plus the savepoint pair)
+        with django_assert_num_queries(5):
+            access_token, rotated = rotate_refresh_token(issued.token)
+        
+        assert access_token
+        assert rotated.family == issued.family
+        assert RefreshToken.objects.get(token_hash=hash_token(issued.token)).revoked_at is not None
+        assert RefreshToken.objects.get(token_hash=hash_token(rotated.token)).revoked_at is None
+    
+    def test_reuse_revokes_family(self, user):
+        issued = generate_refresh_token(user)
+        _, rotated = rotate_refresh_token(issued.token)
+        other_session = generate_refresh_token(user)
+        
+        # Let the grace window lapse
+        cache.delete(f'refresh_result:{hash_token(issued.token)}')
+        
+        with pytest.raises(AuthenticationFailed):
+            rotate_refresh_token(issued.token)
+        
+        # The attacker's and the victim's copy of the family are both dead
+        with pytest.raises(AuthenticationFailed):
+            rotate_refresh_token(rotated.token)
+        
+        # Other sessions of the same user are untouched
+        rotate_refresh_token(other_session.token)
+    
+    def test_expired_token_rejected(self, user):
+        issued = generate_refresh_token(user)
+        RefreshToken.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        
+        with pytest.raises(AuthenticationFailed):
+            rotate_refresh_token(issued.token)
+    
+    def test_logout_revokes_token(self, user):
+        client = APIClient()
+        login = client.post(reverse('login'), {
+            'email': 'tokens@example.com',
+            'password': 'TestPass123!'
+        }, format='json')
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['access_token']}")
+        
+        client.post(reverse('logout'), {'refresh_token': login.data['refresh_token']}, format='json')
+        
+        response = client.post(reverse('refresh-token'), {
+            'refresh_token': login.data['refresh_token']
+        }, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.fixture
+def redis_store(monkeypatch):
+    """RedisRefreshTokenStore on an in-memory Redis that runs the Lua scripts"""
+    fakeredis = pytest.importorskip('fakeredis')
+    server = fakeredis.FakeRedis()
+    monkeypatch.setattr('django_redis.get_redis_connection', lambda alias: server)
+    return RedisRefreshTokenStore()
+
+
+@pytest.mark.django_db
+class TestRedisRefreshTokenStore:
+    
+    def test_rotation_moves_family_head(self, user, redis_store):
+        issued = redis_store.issue(user)
+        
+        rotated_user, rotated = redis_store.rotate(issued.token)
+        
+        assert rotated_user == user
+        assert rotated.family == issued.family
+        old_key = redis_store.token_key(hash_token(issued.token))
+        assert redis_store.redis.hget(old_key, 'revoked') is not None
+        assert redis_store.redis.get(redis_store.family_key(issued.family)).decode() == hash_token(rotated.token)
+        assert RefreshToken.objects.get(token_hash=hash_token(issued.token)).revoked_at is not None
+        assert RefreshToken.objects.get(token_hash=hash_token(rotated.token)).revoked_at is None
+    
+    def test_reuse_revokes_family(self, user, redis_store):
+        issued = redis_store.issue(user)
+        _, rotated = redis_store.rotate(issued.token)
+        
+        with pytest.raises(AuthenticationFailed):
+            redis_store.rotate(issued.token)
+        
+        assert not redis_store.redis.exists(redis_store.family_key(issued.family))
+        assert not RefreshToken.objects.filter(family=issued.family, revoked_at__isnull=True).exists()
+        with pytest.raises(AuthenticationFailed):
+            redis_store.rotate(rotated.token)
+    
+    def test_epoch_rejects_older_tokens(self, user, redis_store):
+        issued = redis_store.issue(user)
+        
+        redis_store.revoke_user(user, timezone.now() + timedelta(seconds=1))
+        
+        with pytest.raises(AuthenticationFailed, match='revoked'):
+            redis_store.rotate(issued.token)
+        assert RefreshToken.objects.get(token_hash=hash_token(issued.token)).revoked_at is None
+    
+    def test_failed_audit_write_undoes_rotation(self, user, redis_store, monkeypatch):
+        issued = redis_store.issue(user)
+        
+        def fail(**kwargs):
+            raise DatabaseError('connection lost')
+        
+        with monkeypatch.context() as patch:
+            patch.setattr(RefreshToken.objects, 'create', fail)
+            with pytest.raises(DatabaseError):
+                redis_store.rotate(issued.token)
+        
+        # Both stores still treat the old token as current, so a retry works
+        assert redis_store.redis.get(redis_store.family_key(issued.family)).decode() == hash_token(issued.token)
+        _, rotated = redis_store.rotate(issued.token)
+        assert RefreshToken.objects.filter(family=issued.family).count() == 2
+        assert RefreshToken.objects.get(token_hash=hash_token(rotated.token)).revoked_at is None
+    
+    def test_tokens_missing_from_redis_rotate_from_database(self, user, redis_store):
+        issued = generate_refresh_token(user)
+        
+        _, rotated = redis_store.rotate(issued.token)
+        
+        assert rotated.family == issued.family
+        assert redis_store.redis.exists(redis_store.token_key(hash_token(rotated.token)))
+
+
+@pytest.mark.django_db
+class TestRefreshGraceWindow:
+    
+    def test_repeat_within_grace_returns_same_pair(self, user):
+        issued = generate_refresh_token(user)
+        
+        first = rotate_refresh_token(issued.token)
+        assert rotate_refresh_token(issued.token) == first
+        assert RefreshToken.objects.filter(family=issued.family).count() == 2
+    
+    def test_grace_disabled(self, user, settings):
+        settings.JWT_SETTINGS = {**settings.JWT_SETTINGS, 'REFRESH_GRACE_SECONDS': 0}
+        issued = generate_refresh_token(user)
+        rotate_refresh_token(issued.token)
+        
+        with pytest.raises(AuthenticationFailed):
+            rotate_refresh_token(issued.token)
+
+
+class InterleavedCache:
+    """Cache proxy that runs `action` just before the `call`-th call of `method`"""
+    
+    def __init__(self, method, call, action):
+        self.method = method
+        self.call = call
+        self.action = action
+        self.calls = 0
+    
+    def __getattr__(self, name):
+        attr = getattr(cache, name)
+        if name != self.method:
+            return attr
+        
+        def interleaved(*args, **kwargs):
+            self.calls += 1
+            if self.calls == self.call:
+                self.action()
+            return attr(*args, **kwargs)
+        return interleaved
+
+
+@pytest.mark.django_db
+class TestSingleFlightInterleavings:
+    
+    def test_rotation_finishing_before_lock_is_taken(self, user, monkeypatch):
+        issued = generate_refresh_token(user)
+        first = []
+        
+        # A rotates and releases the lock after B saw no result but
+        # before B takes the lock
+        def other_refresh():
+            first.append(rotate_refresh_token(issued.token))
+        
+        monkeypatch.setattr('apps.authentication.backends.cache', InterleavedCache('add', 1, other_refresh))
+        
+        assert rotate_refresh_token(issued.token) == first[0]
+        assert RefreshToken.objects.filter(family=issued.family).count() == 2
+        assert RefreshToken.objects.filter(family=issued.family, revoked_at__isnull=True).count() == 1
+    
+    def test_rotation_finishing_while_polling(self, user, monkeypatch):
+        from apps.authentication.backends import _rotate
+        
+        issued = generate_refresh_token(user)
+        token_hash = hash_token(issued.token)
+        first = []
+        
+        # A holds the lock; it publishes and releases between one of B's
+        # polls finding no result and B's next attempt at the lock
+        def other_refresh_finishes():
+            first.append(_rotate(issued.token, None))
+            cache.set(f'refresh_result:{token_hash}', first[0], 30)
+            cache.delete(f'refresh_lock:{token_hash}')
+        
+        cache.add(f'refresh_lock:{token_hash}', 1)
+        monkeypatch.setattr('apps.authentication.backends.time.sleep', lambda seconds: None)
+        monkeypatch.setattr('apps.authentication.backends.cache', InterleavedCache('add', 2, other_refresh_finishes))
+        
+        assert rotate_refresh_token(issued.token) == first[0]
+        assert RefreshToken.objects.filter(family=issued.family, revoked_at__isnull=True).count() == 1
+    
+    def test_lock_holder_outliving_the_timeout(self, user, monkeypatch):
+        from apps.authentication.backends import REFRESH_LOCK_TIMEOUT, _rotate
+        
+        issued = generate_refresh_token(user)
+        token_hash = hash_token(issued.token)
+        clock = SimpleNamespace(now=0.0)
+        
+        def sleep(seconds):
+            clock.now += seconds
+        
+        # A has rotated the token but is still holding the lock (e.g. a
+        # slow response) when B gives up waiting
+        first = _rotate(issued.token, None)
+        cache.add(f'refresh_lock:{token_hash}', 1)
+        monkeypatch.setattr(
+            'apps.authentication.backends.time',
+            SimpleNamespace(monotonic=lambda: clock.now, sleep=sleep)
+        )
+        
+        response = APIClient().post(reverse('refresh-token'), {'refresh_token': issued.token}, format='json')
+        
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response['Retry-After'] == str(REFRESH_LOCK_TIMEOUT)
+        assert clock.now >= REFRESH_LOCK_TIMEOUT
+        assert RefreshToken.objects.filter(family=issued.family, revoked_at__isnull=True).count() == 1
+        
+        # A finishes; B's retry gets its result
+        cache.set(f'refresh_result:{token_hash}', first, 30)
+        cache.delete(f'refresh_lock:{token_hash}')
+        assert rotate_refresh_token(issued.token) == first
+        assert RefreshToken.objects.filter(family=issued.family, revoked_at__isnull=True).count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_refreshes_share_one_rotation(user):
+    """A burst of parallel refreshes (e.g. after a 401 storm) rotates once"""
+    issued = generate_refresh_token(user)
+    url = reverse('refresh-token')
+    barrier = threading.Barrier(8)
+    responses = []
+    
+    def refresh():
+        try:
+            barrier.wait()
+            response = APIClient().post(url, {'refresh_token': issued.token}, format='json')
+            responses.append(response)
+        finally:
+            connection.close()
+    
+    threads = [threading.Thread(target=refresh) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert [response.status_code for response in responses] == [status.HTTP_200_OK] * 8
+    assert len({response.data['refresh_token'] for response in responses}) == 1
+    assert len({response.data['access_token'] for response in responses}) == 1
+    assert RefreshToken.objects.filter(family=issued.family).count() == 2
+
+
+@pytest.mark.django_db
+class TestRevocationEpoch:
+    
+    def test_revoke_all_rejects_existing_tokens(self, user, django_capture_on_commit_callbacks):
+        access_token = generate_access_token(user)
+        issued = generate_refresh_token(user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token}')
+        assert client.get(reverse('user-profile')).status_code == status.HTTP_200_OK
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            revoke_all_user_tokens(user)
+        
+        # Access tokens stop working immediately, not when they expire
+        assert client.get(reverse('user-profile')).status_code == status.HTTP_401_UNAUTHORIZED
+        with pytest.raises(AuthenticationFailed):
+            rotate_refresh_token(issued.token)
+        
+        # Tokens issued afterwards are fine
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(user)}')
+        assert client.get(reverse('user-profile')).status_code == status.HTTP_200_OK
+        rotate_refresh_token(generate_refresh_token(user).token)
+    
+    def test_revoke_all_cost_is_constant(self, user, django_assert_num_queries):
+        for _ in range(20):
+            generate_refresh_token(user)
+        
+        with django_assert_num_queries(1):
+            revoke_all_user_tokens(user)
@@ -0,0 +1,67 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.authentication.models import User
+from apps.authentication.backends import generate_access_token, revoke_all_user_tokens
+from apps.authentication.user_cache import get_cached_user, clear_local_user_cache
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email='cache@example.com',
+        password='TestPass123!'
+    )
+
+
+@pytest.mark.django_db
+class TestUserCache:
+    
+    def test_warm_cache_skips_database(self, user, django_assert_num_queries):
+        get_cached_user(user.id)
+        
+        with django_assert_num_queries(0):
+            cached = get_cached_user(user.id)
+        
+        assert cached == user
+        assert cached.email == user.email
+    
+    def test_redis_level_used_after_local_miss(self, user, django_assert_num_queries):
+        get_cached_user(user.id)
+        clear_local_user_cache()
+        
+        with django_assert_num_queries(0):
+            assert get_cached_user(user.id) == user
+    
+    def test_save_invalidates_cache(self, user, django_capture_on_commit_callbacks):
+        get_cached_user(user.id)
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            user.first_name = 'Changed'
+            user.save()
+        
+        assert get_cached_user(user.id).first_name == 'Changed'
+    
+    def test_deactivated_user_rejected(self, user, django_capture_on_commit_callbacks):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(user)}')
+        url = reverse('user-profile')
+        assert client.get(url).status_code == status.HTTP_200_OK
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            user.is_active = False
+            user.save()
+        
+        assert client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_revoke_all_tokens_invalidates_cache(self, user, django_capture_on_commit_callbacks):
+        get_cached_user(user.id)
+        User.objects.filter(id=user.id).update(first_name='Updated')
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            revoke_all_user_tokens(user)
+        
+        cached = get_cached_user(user.id)
+        assert cached.first_name == 'Updated'
+        assert cached.tokens_valid_after is not None
@@ -0,0 +1,346 @@
+import hashlib
+import logging
+import secrets
+from collections import namedtuple
+from uuid import UUID
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework import exceptions
+from apps.core.ids import uuid7
+from .models import RefreshToken
+from .user_cache import get_cached_user
+
+logger = logging.getLogger(__name__)
+
+# What callers get back when a refresh token is issued; `token` is the
+# only place the plaintext value ever exists
+IssuedRefreshToken = namedtuple('IssuedRefreshToken', ['token', 'expires_at', 'family'])
+
+_stores = {}
+
+
+def hash_token(token_string):
+    """
+    Hash a refresh token for storage.
+    Tokens are 256-bit random values, so a plain SHA-256 is enough; a
+    leaked table or Redis dump cannot be replayed as refresh tokens.
+    """
+    return hashlib.sha256(token_string.encode()).hexdigest()
+
+
+def get_refresh_token_store():
+    """
+    Get the refresh token store configured in
+    JWT_SETTINGS['REFRESH_TOKEN_STORE'] (one instance per process).
+    """
+    path = settings.JWT_SETTINGS['REFRESH_TOKEN_STORE']
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = import_string(path)()
+    return store
+
+
+class DatabaseRefreshTokenStore:
+    """
+    Refresh tokens stored in PostgreSQL.
+    Tokens are stored hashed and grouped into families: every token issued
+    by rotation inherits the family of the token it replaced. Presenting a
+    token that was already rotated means it was stolen (or replayed), so
+    the whole family is revoked.
+    """
+
+    def issue(self, user, request=None, family=None):
+        """
+        Issue a new refresh token.
+
+        Args:
+            user: User instance
+            request: HTTP request object (optional, for tracking device info)
+            family: Family to continue (None starts a new one, e.g. on login)
+
+        Returns:
+            IssuedRefreshToken: Plaintext token, expiry and family
+        """
+        from .backends import get_client_ip
+
+        token_string = secrets.token_urlsafe(32)
+        expires_at = timezone.now() + settings.JWT_SETTINGS['REFRESH_TOKEN_LIFETIME']
+        family = family or uuid7()
+
+        user_agent = request.META.get('HTTP_USER_AGENT', '') if request else ''
+        ip_address = get_client_ip(request) if request else None
+
+        RefreshToken.objects.create(
+            user_id=user.pk,
+            token_hash=hash_token(token_string),
+            family=family,
+            expires_at=expires_at,
+            user_agent=user_agent[:500],  # Truncate if too long
+            ip_address=ip_address
+        )
+
+        return IssuedRefreshToken(token_string, expires_at, family)
+
+    def rotate(self, token_string, request=None):
+        """
+        Revoke a refresh token and issue its successor.
+
+        Args:
+            token_string: The refresh token to rotate
+            request: HTTP request object (optional)
+
+        Returns:
+            tuple: (User, IssuedRefreshToken)
+
+        Raises:
+            exceptions.AuthenticationFailed: If token is invalid, expired or reused
+        """
+        token_hash = hash_token(token_string)
+        row = RefreshToken.objects.filter(token_hash=token_hash).values(
+            'user_id', 'family', 'created_at', 'expires_at', 'revoked_at'
+        ).first()
+
+        if row is None:
+            raise exceptions.AuthenticationFailed('Refresh token not found')
+
+        if row['revoked_at'] is not None:
+            self.handle_reuse(row['user_id'], row['family'])
+            raise exceptions.AuthenticationFailed('Refresh token is invalid or expired')
+
+        if row['expires_at'] < timezone.now():
+            raise exceptions.AuthenticationFailed('Refresh token is invalid or expired')
+
+        user = self.get_user(row['user_id'])
+        if user.is_token_revoked(row['created_at']):
+            raise exceptions.AuthenticationFailed('Refresh token has been revoked')
+
+        with transaction.atomic():
+            # Only one of several concurrent rotations can win this update
+            revoked = RefreshToken.objects.filter(
+                token_hash=token_hash,
+                revoked_at__isnull=True
+            ).update(revoked_at=timezone.now())
+
+            if not revoked:
+                raise exceptions.AuthenticationFailed('Refresh token is invalid or expired')
+
+            issued = self.issue(user, request, family=row['family'])
+
+        return user, issued
+
+    def revoke(self, token_string):
+        """Revoke a single refresh token (e.g., on logout)"""
+        RefreshToken.objects.filter(
+            token_hash=hash_token(token_string),
+            revoked_at__isnull=True
+        ).update(revoked_at=timezone.now())
+
+    def revoke_user(self, user, valid_after):
+        """
+        Called after a user's revocation epoch moved to `valid_after`.
+        Rotation already checks the epoch on the user, so rows are left
+        as they are; stores with their own copy of the epoch update it here.
+        """
+
+    def handle_reuse(self, user_id, family):
+        """Revoke a token family after one of its rotated tokens was presented again"""
+        logger.warning(f"Refresh token reuse detected for user {user_id}, revoking family {family}")
+        RefreshToken.objects.filter(
+            family=family,
+            revoked_at__isnull=True
+        ).update(revoked_at=timezone.now())
+
+    def get_user(self, user_id):
+        user = get_cached_user(user_id)
+        if user is None:
+            raise exceptions.AuthenticationFailed('User not found or inactive')
+        return user
+
+
+# Rotate a token in one round trip.
+# KEYS[1] old token key, KEYS[2] new token key
+# ARGV: now, new expires_at, new ttl, new token hash, key prefix
+ROTATE_SCRIPT = """
+local old = redis.call('HMGET', KEYS[1], 'user', 'family', 'expires', 'revoked', 'issued')
+if not old[1] then
+    return {'missing'}
+end
+
+local user, family = old[1], old[2]
+local issued = old[5] or '0'
+local family_key = ARGV[5] .. 'family:' .. family
+
+if old[4] then
+    local head = redis.call('GET', family_key)
+    if head then
+        redis.call('HSET', ARGV[5] .. 'token:' .. head, 'revoked', ARGV[1])
+    end
+    redis.call('DEL', family_key)
+    return {'reused', user, family}
+end
+
+if tonumber(old[3]) < tonumber(ARGV[1]) then
+    return {'expired', user, family}
+end
+
+local epoch = redis.call('GET', ARGV[5] .. 'epoch:' .. user)
+if epoch and tonumber(issued) < tonumber(epoch) then
+    return {'revoked', user, family}
+end
+
+redis.call('HSET', KEYS[1], 'revoked', ARGV[1])
+redis.call('HSET', KEYS[2], 'user', user, 'family', family, 'expires', ARGV[2], 'issued', ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+redis.call('SET', family_key, ARGV[4], 'EX', ARGV[3])
+return {'ok', user, family, issued}
+"""
+
+# Undo a rotation whose audit rows could not be written, so the old token
+# (which its client still holds) is not later taken for a replay.
+# KEYS[1] old token key, KEYS[2] new token key, KEYS[3] family key
+# ARGV: old token hash, new token hash
+UNDO_ROTATE_SCRIPT = """
+if redis.call('GET', KEYS[3]) == ARGV[2] then
+    redis.call('HDEL', KEYS[1], 'revoked')
+    redis.call('SET', KEYS[3], ARGV[1], 'KEEPTTL')
+end
+redis.call('DEL', KEYS[2])
+return 1
+"""
+
+
+class RedisRefreshTokenStore(DatabaseRefreshTokenStore):
+    """
+    Refresh tokens validated and rotated in Redis, with PostgreSQL as the
+    durable audit log.
+    Rotation is a single Lua script call that checks the old token, marks
+    it rotated and writes its successor atomically, so there is no SELECT
+    and no row lock in the database; the audit rows are written with one
+    UPDATE and one INSERT.
+
+    Redis is updated first; if the audit write then fails the rotation
+    is undone in Redis, so both stores keep the old token as current.
+
+    Tokens Redis doesn't know about (issued before this store was enabled,
+    or lost in a Redis flush) are rotated from the database and then live
+    in Redis from their successor on.
+    """
+
+    def __init__(self, alias='default'):
+        from django_redis import get_redis_connection
+
+        self.redis = get_redis_connection(alias)
+        self.prefix = f"{settings.CACHES[alias].get('KEY_PREFIX', '')}:refresh:"
+        self.rotate_script = self.redis.register_script(ROTATE_SCRIPT)
+        self.undo_rotate_script = self.redis.register_script(UNDO_ROTATE_SCRIPT)
+
+    def token_key(self, token_hash):
+        return f"{self.prefix}token:{token_hash}"
+
+    def family_key(self, family):
+        return f"{self.prefix}family:{family}"
+
+    def epoch_key(self, user_id):
+        return f"{self.prefix}epoch:{user_id}"
+
+    def issue(self, user, request=None, family=None):
+        issued = super().issue(user, request, family)
+        token_hash = hash_token(issued.token)
+        ttl = int(settings.JWT_SETTINGS['REFRESH_TOKEN_LIFETIME'].total_seconds())
+
+        pipe = self.redis.pipeline()
+        pipe.hset(self.token_key(token_hash), mapping={
+            'user': str(user.pk),
+            'family': str(issued.family),
+            'expires': issued.expires_at.timestamp(),
+            'issued': timezone.now().timestamp(),
+        })
+        pipe.expire(self.token_key(token_hash), ttl)
+        pipe.set(self.family_key(issued.family), token_hash, ex=ttl)
+        pipe.execute()
+
+        return issued
+
+    def rotate(self, token_string, request=None):
+        old_hash = hash_token(token_string)
+        new_token = secrets.token_urlsafe(32)
+        new_hash = hash_token(new_token)
+
+        now = timezone.now()
+        expires_at = now + settings.JWT_SETTINGS['REFRESH_TOKEN_LIFETIME']
+        ttl = int(settings.JWT_SETTINGS['REFRESH_TOKEN_LIFETIME'].total_seconds())
+
+        result = self.rotate_script(
+            keys=[self.token_key(old_hash), self.token_key(new_hash)],
+            args=[now.timestamp(), expires_at.timestamp(), ttl, new_hash, self.prefix]
+        )
+        status = result[0].decode()
+
+        if status == 'missing':
+            return super().rotate(token_string, request)
+
+        user_id, family = result[1].decode(), UUID(result[2].decode())
+
+        if status == 'reused':
+            super().handle_reuse(user_id, family)
+            raise exceptions.AuthenticationFailed('Refresh token is invalid or expired')
+        if status == 'expired':
+            raise exceptions.AuthenticationFailed('Refresh token is invalid or expired')
+        if status == 'revoked':
+            raise exceptions.AuthenticationFailed('Refresh token has been revoked')
+
+        user = self.get_user(user_id)
+        if user.is_token_revoked(float(result[3].decode())):
+            # Epoch key was lost from Redis; the user row is authoritative
+            raise exceptions.AuthenticationFailed('Refresh token has been revoked')
+
+        from .backends import get_client_ip
+
+        user_agent = request.META.get('HTTP_USER_AGENT', '') if request else ''
+        try:
+            with transaction.atomic():
+                RefreshToken.objects.filter(
+                    token_hash=old_hash,
+                    revoked_at__isnull=True
+                ).update(revoked_at=now)
+                RefreshToken.objects.create(
+                    user_id=user.pk,
+                    token_hash=new_hash,
+                    family=family,
+                    expires_at=expires_at,
+                    user_agent=user_agent[:500],
+                    ip_address=get_client_ip(request) if request else None
+                )
+        except Exception:
+            # The client never sees the new token: put Redis back so that
+            # retrying with the old one works instead of looking like reuse
+            logger.error(f"Refresh token audit write failed for user {user_id}, undoing rotation")
+            self.undo_rotate_script(
+                keys=[self.token_key(old_hash), self.token_key(new_hash), self.family_key(family)],
+                args=[old_hash, new_hash]
+            )
+            raise
+
+        return user, IssuedRefreshToken(new_token, expires_at, family)
+
+    def revoke(self, token_string):
+        super().revoke(token_string)
+
+        key = self.token_key(hash_token(token_string))
+        if self.redis.exists(key):
+            self.redis.hset(key, 'revoked', timezone.now().timestamp())
+
+    def revoke_user(self, user, valid_after):
+        # Older tokens have all expired once a refresh lifetime has passed
+        ttl = int(settings.JWT_SETTINGS['REFRESH_TOKEN_LIFETIME'].total_seconds())
+        self.redis.set(self.epoch_key(user.pk), valid_after.timestamp(), ex=ttl)
+
+    def handle_reuse(self, user_id, family):
+        super().handle_reuse(user_id, family)
+
+        head = self.redis.get(self.family_key(family))
+        if head:
+            self.redis.hset(self.token_key(head.decode()), 'revoked', timezone.now().timestamp())
+        self.redis.delete(self.family_key(family))
@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.core.cache import cache
+from apps.core.cache import LocalLRUCache, get_version, bump_version
+from apps.core.db_router import use_primary
+from .models import User
+
+# Password hashes are never cached; check_password() loads them on demand
+CACHED_FIELDS = [
+    field.attname for field in User._meta.concrete_fields
+    if field.attname != 'password'
+]
+
+_local_users = LocalLRUCache(
+    maxsize=settings.USER_CACHE['LOCAL_MAXSIZE'],
+    timeout=settings.USER_CACHE['LOCAL_TIMEOUT']
+)
+
+
+def _version_key(user_id):
+    return f"user_ver:{user_id}"
+
+
+def _user_key(user_id, version):
+    return f"user:{user_id}:{version}"
+
+
+def _build_user(values):
+    """Build a fresh User instance from cached field values"""
+    return User.from_db(User.objects.db, CACHED_FIELDS, values)
+
+
+def get_cached_user(user_id):
+    """
+    Get an active user by id using a two-level cache.
+    Checks the in-process LRU first, then Redis, and only then the database.
+    Entries are keyed by a per-user version, so bumping the version
+    invalidates every worker's copy at once.
+
+    Args:
+        user_id: User id (str or UUID)
+
+    Returns:
+        User: Fresh User instance, or None if not found or inactive
+    """
+    # Users are loaded from the primary: a lagging replica could serve (and
+    # cache under the bumped version) a since-deactivated user
+    if not settings.USER_CACHE['ENABLED']:
+        with use_primary():
+            return User.objects.filter(id=user_id, is_active=True).first()
+
+    version = get_version(_version_key(user_id))
+    key = _user_key(user_id, version)
+
+    values = _local_users.get(key)
+    if values is None:
+        values = cache.get(key)
+
+        if values is None:
+            with use_primary():
+                user = User.objects.filter(id=user_id, is_active=True).first()
+            if user is None:
+                return None
+
+            values = tuple(getattr(user, attname) for attname in CACHED_FIELDS)
+            cache.set(key, values, settings.USER_CACHE['TIMEOUT'])
+
+        _local_users.set(key, values)
+
+    return _build_user(values)
+
+
+def invalidate_user_cache(user_id):
+    """
+    Invalidate cached copies of a user in Redis and in every worker.
+    Call this whenever the users row changes outside of User.save().
+    """
+    bump_version(_version_key(user_id))
+
+
+def clear_local_user_cache():
+    """Drop this process's in-memory user entries (used by tests)"""
+    _local_users.clear()
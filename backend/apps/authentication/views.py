@@ -1,11 +1,15 @@
 from rest_framework import status, generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
-from django_ratelimit.decorators import ratelimit
+from rest_framework.permissions import AllowAny
+from django.db import transaction
 from django.utils.decorators import method_decorator
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 
+from apps.core.permissions import IsUserAccount
+from apps.core.transactions import TransactionPolicyMixin
+from apps.core.views import AsyncDispatchMixin
+
 from .serializers import (
     RegisterSerializer,
     LoginSerializer,
@@ -19,7 +23,6 @@ from .serializers import (
 )
 
 
-@method_decorator(ratelimit(key='ip', rate='5/15m', method='POST'), name='post')
 class RegisterView(APIView):
     """User registration endpoint"""
     permission_classes = [AllowAny]
@@ -46,9 +49,13 @@ class RegisterView(APIView):
         )
 
 
-@method_decorator(ratelimit(key='ip', rate='5/15m', method='POST'), name='post')
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
 class LoginView(APIView):
-    """User login endpoint"""
+    """
+    User login endpoint.
+    Runs outside ATOMIC_REQUESTS so an account lock written on a failed
+    attempt isn't rolled back with the failed request.
+    """
     permission_classes = [AllowAny]
     
     @extend_schema(
@@ -84,8 +91,14 @@ class LoginView(APIView):
         })
 
 
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
 class RefreshTokenView(APIView):
-    """Refresh access token using refresh token"""
+    """
+    Refresh access token using refresh token.
+    Runs outside ATOMIC_REQUESTS: the token store uses its own short
+    transaction, and revoking a family on token reuse must persist even
+    though the request itself fails.
+    """
     permission_classes = [AllowAny]
     
     @extend_schema(
@@ -120,7 +133,7 @@ class RefreshTokenView(APIView):
 
 class LogoutView(APIView):
     """User logout endpoint"""
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsUserAccount]
     
     @extend_schema(
         request=LogoutSerializer,
@@ -160,7 +173,6 @@ class VerifyEmailView(APIView):
         })
 
 
-@method_decorator(ratelimit(key='ip', rate='3/1h', method='POST'), name='post')
 class ForgotPasswordView(APIView):
     """Request password reset endpoint"""
     permission_classes = [AllowAny]
@@ -206,7 +218,7 @@ class ResetPasswordView(APIView):
 
 class ChangePasswordView(APIView):
     """Change password (authenticated user)"""
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsUserAccount]
     
     @extend_schema(
         request=ChangePasswordSerializer,
@@ -226,9 +238,9 @@ class ChangePasswordView(APIView):
         })
 
 
-class UserProfileView(generics.RetrieveUpdateAPIView):
+class UserProfileView(AsyncDispatchMixin, TransactionPolicyMixin, generics.RetrieveUpdateAPIView):
     """Get and update user profile"""
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsUserAccount]
     serializer_class = UserSerializer
     
     def get_object(self):
@@ -238,8 +250,9 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         responses={200: UserSerializer},
         description='Get current user profile'
     )
-    def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+    async def get(self, request, *args, **kwargs):
+        # Authentication already loaded the user (from the user cache): no I/O left
+        return Response(self.get_serializer(request.user).data)
     
     @extend_schema(
         request=UserSerializer,
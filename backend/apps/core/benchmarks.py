@@ -0,0 +1,96 @@
+import statistics
+import time
+from contextlib import contextmanager
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from .stats import percentile
+
+
+@contextmanager
+def rolled_back():
+    """Run a block in a transaction that is always rolled back"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def time_calls(func, iterations, warmup=0):
+    """
+    Call `func` repeatedly and record the duration of each call.
+
+    Args:
+        func: Zero-argument callable to measure
+        iterations: Number of measured calls
+        warmup: Number of unmeasured calls made first
+
+    Returns:
+        list: Durations in seconds
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings):
+    """Summarize durations as throughput and latency percentiles"""
+    total = sum(timings)
+    return {
+        'iterations': len(timings),
+        'per_second': len(timings) / total if total else 0.0,
+        'mean_ms': statistics.mean(timings) * 1000,
+        'p50_ms': percentile(timings, 50) * 1000,
+        'p99_ms': percentile(timings, 99) * 1000,
+    }
+
+
+class BenchmarkCommand(BaseCommand):
+    """
+    Base class for benchmark management commands.
+    Runs `run_benchmark` inside a rolled-back transaction with DEBUG off,
+    so benchmarks leave no rows behind and don't pay for query logging.
+    """
+    default_iterations = 1000
+    rollback = True
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=self.default_iterations,
+            help='Number of measured iterations per scenario'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=50,
+            help='Number of unmeasured warm-up iterations per scenario'
+        )
+
+    def handle(self, *args, **options):
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['*']):
+            if self.rollback:
+                with rolled_back():
+                    self.run_benchmark(**options)
+            else:
+                self.run_benchmark(**options)
+
+    def run_benchmark(self, **options):
+        raise NotImplementedError
+
+    def report(self, label, timings):
+        stats = summarize(timings)
+        self.stdout.write(
+            f"{label:<40} "
+            f"{stats['per_second']:>10.1f}/s  "
+            f"mean {stats['mean_ms']:.3f}ms  "
+            f"p50 {stats['p50_ms']:.3f}ms  "
+            f"p99 {stats['p99_ms']:.3f}ms"
+        )
+        return stats
@@ -0,0 +1,122 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.core.cache import cache
+
+
+class LocalLRUCache:
+    """
+    Bounded, thread-safe in-process LRU cache.
+    Used as the first cache level in front of Redis for hot lookups.
+
+    Args:
+        maxsize: Maximum number of entries kept in memory
+        timeout: Seconds an entry stays valid (None = no expiry)
+    """
+
+    def __init__(self, maxsize=1024, timeout=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return default
+
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        expires_at = time.monotonic() + timeout if timeout is not None else None
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Part of every version token. CircuitBreakerRedisCache bumps it when
+# writes (version bumps among them) could not reach Redis, so nothing
+# cached under a version from before the outage is used again.
+VERSION_EPOCH_KEY = 'cache_epoch'
+
+
+def _initial_version(name):
+    cache.add(name, uuid.uuid4().hex, timeout=None)
+    return cache.get(name)
+
+
+def get_version(name):
+    """
+    Get the current version token stored under a cache key.
+    Versions are random tokens rather than counters, so a flushed or
+    restarted Redis never brings back a version that was already used.
+
+    Args:
+        name: Version key (e.g., 'user_ver:<uuid>')
+
+    Returns:
+        str: Current version token (prefixed with the cache epoch)
+    """
+    return get_versions(name)[0]
+
+
+def get_versions(*names):
+    """
+    Get several version tokens (and the cache epoch) in a single cache
+    round trip.
+
+    Returns:
+        list: Version tokens in the same order as `names`
+    """
+    versions = cache.get_many([VERSION_EPOCH_KEY, *names])
+    epoch = versions.get(VERSION_EPOCH_KEY) or _initial_version(VERSION_EPOCH_KEY)
+    return [
+        f"{epoch}.{versions[name] if name in versions else _initial_version(name)}"
+        for name in names
+    ]
+
+
+def peek_version(name):
+    """
+    Like get_version(), but without creating a token.
+
+    Returns:
+        str: Current version token, or None if none was stored yet
+    """
+    versions = cache.get_many([VERSION_EPOCH_KEY, name])
+    if name not in versions:
+        return None
+    epoch = versions.get(VERSION_EPOCH_KEY) or _initial_version(VERSION_EPOCH_KEY)
+    return f"{epoch}.{versions[name]}"
+
+
+def bump_version(name):
+    """
+    Invalidate everything keyed with the version stored under `name`.
+    Costs a single cache write regardless of how many entries exist.
+    """
+    cache.set(name, uuid.uuid4().hex, timeout=None)
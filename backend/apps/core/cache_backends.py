@@ -0,0 +1,334 @@
+import logging
+import pickle
+import threading
+import time
+import uuid
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.cache import RedisCache
+from django_redis.exceptions import ConnectionInterrupted
+from redis.exceptions import RedisError
+from .cache import VERSION_EPOCH_KEY, LocalLRUCache
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+REDIS_ERRORS = (ConnectionInterrupted, RedisError)
+
+# Returned by fallbacks so callers can tell "Redis unavailable" from any real value
+_UNAVAILABLE = object()
+
+
+class CircuitBreaker:
+    """
+    Tracks the health of one Redis server.
+    After FAILURE_THRESHOLD consecutive failures the circuit opens and calls
+    fail fast for RESET_TIMEOUT seconds. Then one caller at a time is let
+    through as a probe (half-open): success closes the circuit, failure
+    opens it for another RESET_TIMEOUT.
+
+    Args:
+        name: Label used in logs and metrics
+        failure_threshold: Consecutive failures that open the circuit
+        reset_timeout: Seconds to fail fast before probing
+        clock: Monotonic time source (overridable in tests)
+    """
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=10, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.listeners = []
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+        self._counters = {
+            'successes': 0,
+            'failures': 0,
+            'short_circuited': 0,
+            'opened': 0,
+        }
+
+    def allow_request(self):
+        """Whether a call may go to Redis now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+
+            self._counters['short_circuited'] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._counters['successes'] += 1
+            self._failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def release_probe(self):
+        """End a probe that told nothing about Redis's health (a non-Redis error)"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self._counters['failures'] += 1
+            self._failures += 1
+            self._probing = False
+
+            if self.state == HALF_OPEN or (self.state == CLOSED and self._failures >= self.failure_threshold):
+                self._opened_at = self.clock()
+                self._counters['opened'] += 1
+                self._set_state(OPEN)
+                logger.error(f"Circuit for {self.name} opened after {self._failures} failure(s): {error}")
+
+    def metrics(self):
+        """State and counters for health checks and monitoring"""
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.reset_timeout - (self.clock() - self._opened_at))
+            return {
+                'state': self.state,
+                'consecutive_failures': self._failures,
+                'retry_in': retry_in,
+                **self._counters,
+            }
+
+    def _set_state(self, state):
+        previous, self.state = self.state, state
+        if state == CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        for listener in self.listeners:
+            listener(previous, state)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name, **options):
+    """Process-wide breaker for a server (Django creates cache backends per thread)"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **options)
+        return _breakers[name]
+
+
+class CircuitBreakerRedisCache(RedisCache):
+    """
+    django-redis cache that fails fast while Redis is down.
+    While Redis is unreachable (and the circuit open), get/set/add/delete/
+    incr and their *_many variants are served from a bounded in-process LRU
+    instead, so a stalled Redis costs each worker a few socket timeouts
+    rather than one per call. Only writes made while Redis is failing go
+    into the LRU: nothing read from Redis is mirrored, so reads cost no
+    extra pickling and the LRU never serves values (user cache entries,
+    principals, revocation epochs) from before the outage; those are
+    misses and are rebuilt from the database. Counters are per process
+    until Redis recovers; the LRU is dropped when the circuit closes.
+
+    Writes and deletes that only reached the LRU are lost with it, version
+    bumps (apps.core.cache.bump_version) among them, which would let Redis
+    serve entries they invalidated once it is back. So after any such
+    write, the first call that reaches Redis again first bumps the cache
+    epoch (VERSION_EPOCH_KEY) that is part of every version token: all
+    versioned entries are rebuilt from the database after an outage.
+
+    Configured with OPTIONS['CIRCUIT_BREAKER']: FAILURE_THRESHOLD,
+    RESET_TIMEOUT, LOCAL_MAXSIZE and LOCAL_TIMEOUT (cap on how long a
+    mirrored value is kept).
+    """
+
+    def __init__(self, server, params):
+        options = dict(params.get('OPTIONS', {}))
+        breaker_options = options.pop('CIRCUIT_BREAKER', {})
+        super().__init__(server, {**params, 'OPTIONS': options})
+
+        name = server if isinstance(server, str) else ','.join(server)
+        self.breaker = get_circuit_breaker(
+            name.rsplit('@', 1)[-1],
+            failure_threshold=breaker_options.get('FAILURE_THRESHOLD', 3),
+            reset_timeout=breaker_options.get('RESET_TIMEOUT', 10),
+        )
+        self.local_timeout = breaker_options.get('LOCAL_TIMEOUT', 60)
+
+        with _breakers_lock:
+            if not hasattr(self.breaker, 'local'):
+                self.breaker.local = LocalLRUCache(maxsize=breaker_options.get('LOCAL_MAXSIZE', 10000))
+                self.breaker.local_lock = threading.Lock()
+                self.breaker.writes_lost = False
+                self.breaker.listeners.append(self._on_state_change)
+        self.local = self.breaker.local
+
+    def _on_state_change(self, previous, state):
+        if state == CLOSED:
+            self.local.clear()
+
+    def _call(self, operation, fallback, *args, **kwargs):
+        """Run a django-redis operation through the breaker"""
+        if self.breaker.allow_request():
+            try:
+                if self.breaker.writes_lost:
+                    self._bump_epoch()
+                result = getattr(super(), operation)(*args, **kwargs)
+            except REDIS_ERRORS as e:
+                self.breaker.record_failure(e)
+            except BaseException:
+                # e.g. incr() on a missing key or an unpicklable value: let
+                # the next call probe rather than staying half-open forever
+                self.breaker.release_probe()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+        return fallback()
+
+    def _bump_epoch(self):
+        """Invalidate every versioned entry once writes have been lost (see class docstring)"""
+        super().set(VERSION_EPOCH_KEY, uuid.uuid4().hex, timeout=None)
+        self.breaker.writes_lost = False
+        logger.warning("Cache writes were lost while Redis was unavailable; bumped the cache epoch")
+
+    def _lose_write(self, result=None):
+        """Note a write that only reached the LRU; returns `result` for use in fallbacks"""
+        self.breaker.writes_lost = True
+        return result
+
+    # In-process mirror
+
+    def _local_timeout(self, timeout):
+        expires_at = self.get_backend_timeout(timeout)
+        if expires_at is None:
+            return self.local_timeout
+        return max(0, min(self.local_timeout, expires_at - time.time()))
+
+    def _remember(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.local.set(
+            self.make_and_validate_key(key, version),
+            pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+            timeout=self._local_timeout(timeout)
+        )
+
+    def _recall(self, key, default=None, version=None):
+        payload = self.local.get(self.make_and_validate_key(key, version))
+        return default if payload is None else pickle.loads(payload)
+
+    def _forget(self, key, version=None):
+        self.local.delete(self.make_and_validate_key(key, version))
+
+    def _local_incr(self, key, delta, version):
+        with self.breaker.local_lock:
+            value = self._recall(key, version=version)
+            if value is None:
+                raise ValueError(f"Key '{key}' not found")
+            self._remember(key, value + delta, self.local_timeout, version)
+            return value + delta
+
+    def _local_add(self, key, value, timeout, version):
+        with self.breaker.local_lock:
+            if self._recall(key, version=version) is not None:
+                return False
+            self._remember(key, value, timeout, version)
+            return True
+
+    # Cache API
+
+    def get(self, key, default=None, version=None, client=None):
+        missing = object()
+        value = self._call('get', lambda: _UNAVAILABLE, key, missing, version, client)
+
+        if value is _UNAVAILABLE:
+            return self._recall(key, default, version)
+        if value is missing:
+            return default
+        return value
+
+    def get_many(self, keys, version=None, client=None):
+        values = self._call('get_many', lambda: _UNAVAILABLE, keys, version=version, client=client)
+
+        if values is _UNAVAILABLE:
+            values = {}
+            for key in keys:
+                value = self._recall(key, version=version)
+                if value is not None:
+                    values[key] = value
+        return values
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None, nx=False, xx=False):
+        result = self._call(
+            'set', lambda: _UNAVAILABLE,
+            key, value, timeout=timeout, version=version, client=client, nx=nx, xx=xx
+        )
+
+        if result is _UNAVAILABLE:
+            self._lose_write()
+            if nx:
+                return self._local_add(key, value, timeout, version)
+            self._remember(key, value, timeout, version)
+            return True
+        return result
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        def remember_all():
+            self._lose_write()
+            for key, value in data.items():
+                self._remember(key, value, timeout, version)
+            return []
+
+        return self._call('set_many', remember_all, data, timeout=timeout, version=version, client=client)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        added = self._call(
+            'add', lambda: _UNAVAILABLE,
+            key, value, timeout=timeout, version=version, client=client
+        )
+
+        if added is _UNAVAILABLE:
+            return self._local_add(key, value, timeout, version)
+        return added
+
+    def delete(self, key, version=None, prefix=None, client=None):
+        self._forget(key, version)
+        return self._call('delete', lambda: self._lose_write(True), key, version=version, prefix=prefix, client=client)
+
+    def delete_many(self, keys, version=None, client=None):
+        for key in keys:
+            self._forget(key, version)
+        return self._call('delete_many', lambda: self._lose_write(len(keys)), keys, version=version, client=client)
+
+    def incr(self, key, delta=1, version=None, client=None, ignore_key_check=False):
+        value = self._call(
+            'incr', lambda: _UNAVAILABLE,
+            key, delta, version=version, client=client, ignore_key_check=ignore_key_check
+        )
+
+        if value is _UNAVAILABLE:
+            return self._local_incr(key, delta, version)
+        return value
+
+    def decr(self, key, delta=1, version=None, client=None):
+        return self.incr(key, -delta, version=version, client=client)
+
+    def has_key(self, key, version=None, client=None):
+        return self._call(
+            'has_key', lambda: self._recall(key, version=version) is not None,
+            key, version=version, client=client
+        )
+
+    def clear(self):
+        self.local.clear()
+        return self._call('clear', lambda: None)
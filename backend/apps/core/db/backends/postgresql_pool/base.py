@@ -0,0 +1,120 @@
+import logging
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.db.backends.base.base import NO_DB_ALIAS
+from ...pool import ConnectionPool, PoolTimeout, get_pool
+
+if is_psycopg3:
+    from psycopg.pq import TransactionStatus
+
+    TRANSACTION_STATUS_IDLE = TransactionStatus.IDLE
+else:
+    from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+logger = logging.getLogger(__name__)
+
+POOL_DEFAULTS = {
+    'MIN_SIZE': 1,
+    'MAX_SIZE': 4,
+    'TIMEOUT': 10,
+    'MAX_LIFETIME': 1800,
+    'MAX_IDLE': 300,
+    'CHECK_INTERVAL': 30,
+}
+
+
+def check_connection(connection):
+    """Pool health check: a round trip, leaving no transaction open"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend that checks connections out of a per-process pool
+    (apps.core.db.pool) and returns them when Django closes the connection,
+    instead of each thread keeping its own for CONN_MAX_AGE.
+
+    Use with CONN_MAX_AGE = 0 so connections go back to the pool at the end
+    of every request. Pool options go in the database's POOL setting:
+        MIN_SIZE, MAX_SIZE: connections kept open / allowed per process
+        TIMEOUT: seconds a request waits for a connection before failing
+        MAX_LIFETIME: seconds before a connection is replaced
+        MAX_IDLE: seconds an idle connection above MIN_SIZE is kept
+        CHECK_INTERVAL: idle seconds after which a connection is checked
+            with SELECT 1 before being handed out
+    """
+
+    def get_new_connection(self, conn_params):
+        if self.alias == NO_DB_ALIAS:
+            # Maintenance connections (test database setup) aren't pooled
+            self._pool = None
+            return super().get_new_connection(conn_params)
+
+        self._pool = self.get_pool(conn_params)
+        try:
+            return self._pool.getconn()
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e)) from e
+
+    def get_pool(self, conn_params=None):
+        """
+        This process's pool for the database, created on first use.
+
+        Args:
+            conn_params: Connection parameters (default get_connection_params())
+
+        Returns:
+            ConnectionPool
+        """
+        if conn_params is None:
+            conn_params = self.get_connection_params()
+        options = {**POOL_DEFAULTS, **self.settings_dict.get('POOL', {})}
+
+        def create_pool():
+            # Connections are opened by a plain wrapper, which applies OPTIONS
+            # (isolation level, JSON decoding) the same way as unpooled ones
+            opener = base.DatabaseWrapper(self.settings_dict, self.alias)
+            logger.info(
+                f"Opening connection pool for {self.alias} "
+                f"({options['MIN_SIZE']}-{options['MAX_SIZE']} connections)"
+            )
+            return ConnectionPool(
+                connect=lambda: opener.get_new_connection(conn_params),
+                name=self.alias,
+                min_size=options['MIN_SIZE'],
+                max_size=options['MAX_SIZE'],
+                timeout=options['TIMEOUT'],
+                max_lifetime=options['MAX_LIFETIME'],
+                max_idle=options['MAX_IDLE'],
+                check=check_connection,
+                check_interval=options['CHECK_INTERVAL']
+            )
+
+        return get_pool(self.alias, create_pool, signature=sorted(conn_params.items()))
+
+    def fill_pool(self):
+        """Open the pool's MIN_SIZE connections (when a worker starts)"""
+        self.get_pool().fill()
+
+    def _close(self):
+        pool = getattr(self, '_pool', None)
+        if self.connection is None or pool is None:
+            return super()._close()
+
+        connection = self.connection
+        # Closed mid-transaction or after an error that left the connection
+        # unusable (close_if_unusable_or_obsolete clears errors_occurred
+        # when the connection still works): don't hand it to another request
+        discard = self.in_atomic_block or self.errors_occurred or bool(connection.closed)
+
+        if not discard and connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except self.Database.Error:
+                discard = True
+
+        pool.putconn(connection, discard=discard)
@@ -0,0 +1,304 @@
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from ..stats import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the pool timeout"""
+
+
+class _Entry:
+    __slots__ = ('connection', 'created_at', 'expires_at', 'returned_at')
+
+    def __init__(self, connection, created_at, expires_at):
+        self.connection = connection
+        self.created_at = created_at
+        self.expires_at = expires_at
+        self.returned_at = created_at
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections for one database in one process.
+
+    Connections are handed out most-recently-returned first, so under light
+    load a few warm connections serve everything and the rest age out.
+    When all `max_size` connections are in use, callers wait up to
+    `timeout` seconds and then get PoolTimeout, which puts an upper bound
+    on connections per process (and workers x max_size per fleet).
+
+    Args:
+        connect: Callable returning a new connection
+        name: Label used in logs and stats
+        min_size: Connections kept open even when idle
+        max_size: Upper bound on open connections
+        timeout: Seconds a checkout may wait for a free connection
+        max_lifetime: Seconds after which a connection is replaced (with
+            10% jitter so connections opened together don't expire together)
+        max_idle: Seconds an idle connection above min_size is kept
+        check: Callable(connection) -> bool health check, run on checkout
+            for connections idle longer than `check_interval`
+        check_interval: Seconds of idleness after which a connection is checked
+        close: Callable(connection) that closes a connection
+        clock: Monotonic time source (overridable in tests)
+    """
+
+    def __init__(self, connect, name='default', min_size=1, max_size=4, timeout=10.0,
+                 max_lifetime=1800.0, max_idle=300.0, check=None, check_interval=30.0,
+                 close=None, clock=time.monotonic):
+        if min_size > max_size:
+            raise ValueError(f"Pool {name}: min_size {min_size} exceeds max_size {max_size}")
+
+        self.connect = connect
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check = check
+        self.check_interval = check_interval
+        self.close_connection = close or (lambda connection: connection.close())
+        self.clock = clock
+        self.pid = os.getpid()
+
+        self._idle = []
+        self._in_use = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._waits = deque(maxlen=1000)
+        self._counters = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'connections_created': 0,
+            'connections_closed': 0,
+            'failed_checks': 0,
+            'wait_seconds_total': 0.0,
+        }
+
+    def fill(self):
+        """Open connections up to min_size (e.g. when a worker starts)"""
+        while True:
+            with self._condition:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                entry = self._new_entry()
+            except Exception:
+                self._release_slot()
+                raise
+            with self._condition:
+                self._idle.append(entry)
+                self._condition.notify()
+
+    def getconn(self):
+        """
+        Check out a connection.
+
+        Returns:
+            Connection from the pool (or newly opened)
+
+        Raises:
+            PoolTimeout: If none became available within `timeout`
+        """
+        started = self.clock()
+        deadline = started + self.timeout
+
+        while True:
+            entry, create = self._acquire(deadline)
+
+            if create:
+                try:
+                    entry = self._new_entry()
+                except Exception:
+                    self._release_slot()
+                    raise
+            elif not self._healthy(entry):
+                self._discard(entry)
+                continue
+
+            waited = self.clock() - started
+            with self._condition:
+                self._in_use[id(entry.connection)] = entry
+                self._counters['checkouts'] += 1
+                self._counters['wait_seconds_total'] += waited
+                self._waits.append(waited)
+            return entry.connection
+
+    def putconn(self, connection, discard=False):
+        """
+        Return a checked-out connection.
+
+        Args:
+            connection: Connection from getconn()
+            discard: Close it instead (broken, or left in an unknown state)
+        """
+        with self._condition:
+            entry = self._in_use.pop(id(connection), None)
+        if entry is None:
+            raise ValueError(f"Connection was not checked out from pool {self.name}")
+
+        now = self.clock()
+        if discard or self._closed or now >= entry.expires_at:
+            self._discard(entry)
+            return
+
+        entry.returned_at = now
+        with self._condition:
+            self._idle.append(entry)
+            self._condition.notify()
+
+    def close(self):
+        """Close idle connections and refuse further checkouts"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for entry in idle:
+            self._discard(entry)
+
+    def stats(self):
+        """Sizes, waiting clients, utilization and checkout latency of this process's pool"""
+        with self._condition:
+            waits = list(self._waits)
+            in_use = len(self._in_use)
+            return {
+                'pid': self.pid,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': in_use,
+                'waiting': self._waiting,
+                'utilization': in_use / self.max_size,
+                'checkout_ms': {
+                    'p50': percentile(waits, 50) * 1000 if waits else 0.0,
+                    'p99': percentile(waits, 99) * 1000 if waits else 0.0,
+                    'max': max(waits) * 1000 if waits else 0.0,
+                },
+                **self._counters,
+            }
+
+    def _acquire(self, deadline):
+        """Take an idle entry, or reserve a slot to open one: (entry, create)"""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolTimeout(f"Pool {self.name} is closed")
+
+                self._trim_idle()
+                if self._idle:
+                    return self._idle.pop(), False
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, True
+
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f"No connection available in pool {self.name} after {self.timeout}s "
+                        f"({self._size} open, {self._waiting} waiting)"
+                    )
+
+                self._waiting += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def _trim_idle(self):
+        """Close expired connections and idle ones above min_size (lock held)"""
+        now = self.clock()
+        kept = []
+        # Oldest returned first, so the warmest connections are the ones kept
+        for entry in self._idle:
+            surplus = self._size > self.min_size
+            if now >= entry.expires_at or (surplus and now - entry.returned_at >= self.max_idle):
+                self._size -= 1
+                self._counters['connections_closed'] += 1
+                self._close_quietly(entry.connection)
+            else:
+                kept.append(entry)
+        self._idle = kept
+
+    def _healthy(self, entry):
+        if getattr(entry.connection, 'closed', False):
+            return False
+        if self.check is None or self.clock() - entry.returned_at < self.check_interval:
+            return True
+        try:
+            healthy = self.check(entry.connection)
+        except Exception:
+            healthy = False
+        if not healthy:
+            with self._condition:
+                self._counters['failed_checks'] += 1
+            logger.warning(f"Discarding broken connection from pool {self.name}")
+        return healthy
+
+    def _new_entry(self):
+        connection = self.connect()
+        now = self.clock()
+        lifetime = self.max_lifetime * random.uniform(0.9, 1.0)
+        with self._condition:
+            self._counters['connections_created'] += 1
+        return _Entry(connection, now, now + lifetime)
+
+    def _discard(self, entry):
+        self._close_quietly(entry.connection)
+        with self._condition:
+            self._counters['connections_closed'] += 1
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def _close_quietly(self, connection):
+        try:
+            self.close_connection(connection)
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection: {str(e)}")
+
+
+# alias -> (pool, signature)
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, factory, signature=None):
+    """
+    Process-wide pool for a database alias, created with `factory()` on
+    first use. The pool is replaced when `signature` changes (e.g. the test
+    runner switching to the test database), closing the old one, and when
+    it was inherited from a parent process, whose connections are left alone.
+    """
+    with _pools_lock:
+        pool, current = _pools.get(alias, (None, None))
+        if pool is not None and pool.pid == os.getpid():
+            if current == signature:
+                return pool
+            pool.close()
+        pool = factory()
+        _pools[alias] = (pool, signature)
+        return pool
+
+
+def pool_stats():
+    """Stats of every pool in this process, by alias"""
+    with _pools_lock:
+        pools = {alias: pool for alias, (pool, _) in _pools.items() if pool.pid == os.getpid()}
+    return {alias: pool.stats() for alias, pool in pools.items()}
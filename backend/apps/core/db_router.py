@@ -0,0 +1,199 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = DEFAULT_DB_ALIAS
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Replica the current request reads from; None reads from the primary.
+# Unset outside requests, so commands and tasks always use the primary.
+_read_alias = ContextVar('read_alias', default=None)
+
+# Replication lag per replica alias: {alias: (lag seconds, checked at)}
+_lag = {}
+_lag_lock = threading.Lock()
+
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def replica_aliases():
+    return settings.DATABASE_REPLICAS['ALIASES']
+
+
+def get_read_database():
+    """Alias reads of the current request go to"""
+    return _read_alias.get() or PRIMARY
+
+
+def set_read_database(alias):
+    """Route the current context's reads to `alias`; returns a token for reset_read_database"""
+    return _read_alias.set(None if alias == PRIMARY else alias)
+
+
+def reset_read_database(token):
+    _read_alias.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Send reads inside the block to the primary (e.g. right after a write)"""
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def measure_lag(alias):
+    """
+    Replication lag of a replica in seconds.
+    An idle primary produces no WAL, so a replica that has replayed
+    everything it received counts as current however old its last replayed
+    transaction is. Other databases (e.g. the test mirror) report 0.
+
+    Returns:
+        float: Lag in seconds, or None if the replica is unreachable
+    """
+    connection = connections[alias]
+    try:
+        if connection.vendor != 'postgresql':
+            return 0.0
+        with connection.cursor() as cursor:
+            cursor.execute(LAG_QUERY)
+            return float(cursor.fetchone()[0])
+    except Exception as e:
+        logger.error(f"Could not measure replication lag of {alias}: {str(e)}")
+        return None
+
+
+def replica_lag(alias):
+    """Lag of a replica, measured at most every LAG_CHECK_INTERVAL seconds per process"""
+    now = time.monotonic()
+    interval = settings.DATABASE_REPLICAS['LAG_CHECK_INTERVAL']
+
+    with _lag_lock:
+        cached = _lag.get(alias)
+    if cached is not None and now - cached[1] < interval:
+        return cached[0]
+
+    lag = measure_lag(alias)
+    with _lag_lock:
+        _lag[alias] = (lag, now)
+    return lag
+
+
+def healthy_replicas():
+    """Replicas reachable and within MAX_LAG_SECONDS of the primary"""
+    max_lag = settings.DATABASE_REPLICAS['MAX_LAG_SECONDS']
+    healthy = []
+    for alias in replica_aliases():
+        lag = replica_lag(alias)
+        if lag is not None and lag <= max_lag:
+            healthy.append(alias)
+        elif lag is not None:
+            logger.warning(f"Replica {alias} is {lag:.1f}s behind, reading from the primary")
+    return healthy
+
+
+def reset_replica_lag():
+    """Forget measured lag (used by tests)"""
+    with _lag_lock:
+        _lag.clear()
+
+
+# Read-your-writes: a caller that wrote is pinned to the primary for
+# PIN_SECONDS so its next reads see the write whatever the replica lag.
+
+def pin_identity(request):
+    """
+    Who a pin belongs to: the API key or the user of the request.
+    Middleware runs before DRF authentication, so this verifies the
+    credentials the same way the rate limiter does (see ratelimit).
+    """
+    from .ratelimit import request_api_key_prefix, request_user_id
+
+    prefix = request_api_key_prefix(request)
+    if prefix:
+        return f"key:{prefix}"
+    user_id = request_user_id(request)
+    return f"user:{user_id}" if user_id else None
+
+
+def _pin_key(identity):
+    return f"db_pin:{identity}"
+
+
+def pin_to_primary(identity):
+    cache.set(_pin_key(identity), 1, settings.DATABASE_REPLICAS['PIN_SECONDS'])
+
+
+def is_pinned(identity):
+    return cache.get(_pin_key(identity)) is not None
+
+
+def choose_read_database(request):
+    """
+    Alias the reads of a request should use.
+    Writes, callers pinned after a recent write and times when every
+    replica lags or is down read from the primary.
+    """
+    if not replica_aliases() or request.method not in SAFE_METHODS:
+        return PRIMARY
+
+    identity = pin_identity(request)
+    if identity is not None and is_pinned(identity):
+        return PRIMARY
+
+    replicas = healthy_replicas()
+    return random.choice(replicas) if replicas else PRIMARY
+
+
+def after_response(request, response):
+    """Pin the caller after a successful write"""
+    if not replica_aliases() or request.method in SAFE_METHODS or response.status_code >= 400:
+        return
+
+    identity = pin_identity(request)
+    if identity is not None:
+        pin_to_primary(identity)
+
+
+class ReplicaRouter:
+    """
+    Sends reads of safe-method requests to a replica chosen by
+    ReplicaRoutingMiddleware and everything else to the primary.
+    Replicas are never migrated; in tests they mirror the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return get_read_database()
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {PRIMARY, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
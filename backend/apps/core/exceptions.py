@@ -27,6 +27,17 @@ class RateLimitExceededError(APIException):
     default_code = 'rate_limit_exceeded'
 
 
+class ServiceUnavailableError(APIException):
+    """Raised when the server is temporarily overloaded (sets Retry-After)"""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Server is busy. Please try again shortly.'
+    default_code = 'service_unavailable'
+    
+    def __init__(self, detail=None, code=None, wait=None):
+        super().__init__(detail, code)
+        self.wait = wait
+
+
 class InvalidTokenError(APIException):
     """Raised when JWT token is invalid"""
     status_code = status.HTTP_401_UNAUTHORIZED
@@ -57,8 +68,8 @@ def custom_exception_handler(exc, context):
         
         response.data = error_data
         
-        # Log errors
-        if response.status_code >= 500:
+        # Log errors (load shedding is expected and logged where it happens)
+        if response.status_code >= 500 and not isinstance(exc, ServiceUnavailableError):
             logger.error(
                 f"Server error: {exc}",
                 exc_info=True,
@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.postgresql import base
+
+from apps.core.benchmarks import BenchmarkCommand
+from apps.core.db.pool import ConnectionPool
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Measure per-request connection overhead under bursty traffic: a new '
+        'connection per request (CONN_MAX_AGE 0) against the connection pool'
+    )
+    default_iterations = 400
+    rollback = False
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to connect to')
+        parser.add_argument('--burst-size', type=int, default=16, help='Concurrent requests per burst')
+        parser.add_argument('--gap', type=float, default=0.2, help='Idle seconds between bursts')
+        parser.add_argument('--pool-size', type=int, default=4, help='Pool MAX_SIZE (per worker)')
+
+    def run_benchmark(self, iterations, warmup, database, burst_size, gap, pool_size, **options):
+        if connections[database].vendor != 'postgresql':
+            raise CommandError('Connection setup is only measured on PostgreSQL')
+
+        # Open connections the way the unpooled backend does
+        opener = base.DatabaseWrapper(connections[database].settings_dict, database)
+        conn_params = opener.get_connection_params()
+
+        def connect():
+            return opener.get_new_connection(conn_params)
+
+        def query(connection):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            connection.commit()
+
+        def unpooled():
+            connection = connect()
+            try:
+                query(connection)
+            finally:
+                connection.close()
+
+        pool = ConnectionPool(connect, name=database, min_size=1, max_size=pool_size)
+
+        def pooled():
+            connection = pool.getconn()
+            try:
+                query(connection)
+            finally:
+                pool.putconn(connection)
+
+        self.stdout.write(
+            f"{iterations} requests in bursts of {burst_size}, {gap}s apart, pool of {pool_size}"
+        )
+        scenarios = [('connection per request', unpooled), (f'pool (max {pool_size})', pooled)]
+
+        with ThreadPoolExecutor(max_workers=burst_size) as executor:
+            for label, request in scenarios:
+                self._bursts(executor, request, warmup, burst_size, 0)
+                timings = self._bursts(executor, request, iterations, burst_size, gap)
+                self.report(label, timings)
+
+        stats = pool.stats()
+        self.stdout.write(
+            f"pool: {stats['connections_created']} connection(s) opened for {stats['checkouts']} checkouts, "
+            f"checkout wait p50 {stats['checkout_ms']['p50']:.3f}ms "
+            f"p99 {stats['checkout_ms']['p99']:.3f}ms max {stats['checkout_ms']['max']:.3f}ms"
+        )
+        pool.close()
+
+    def _bursts(self, executor, request, total, burst_size, gap):
+        """Run `total` requests in concurrent bursts, returning per-request latencies"""
+
+        def timed():
+            start = time.perf_counter()
+            request()
+            return time.perf_counter() - start
+
+        timings = []
+        while len(timings) < total:
+            size = min(burst_size, total - len(timings))
+            timings.extend(future.result() for future in [executor.submit(timed) for _ in range(size)])
+            time.sleep(gap)
+        return timings
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.benchmarks import BenchmarkCommand, time_calls
+from apps.core.ratelimit import reset_rate_limiter
+from apps.authentication.models import User
+from apps.authentication.backends import generate_access_token
+
+# High enough that no benchmark request is ever limited
+UNLIMITED_RATE = '100000000/s'
+
+
+class Command(BenchmarkCommand):
+    help = 'Measure per-request overhead of the rate limit middleware for each bucket backend'
+
+    def run_benchmark(self, iterations, warmup, **options):
+        user = User.objects.create_user(
+            email='bench-rate-limit@example.com',
+            password='BenchPass123!'
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(user)}')
+        url = reverse('user-profile')
+
+        def request():
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+
+        rules = [{**rule, 'rate': UNLIMITED_RATE} for rule in settings.RATE_LIMIT['RULES']]
+        scenarios = [('off', {'ENABLED': False}), ('local', {'BACKEND': 'local'}), ('redis', {'BACKEND': 'redis'})]
+
+        for label, overrides in scenarios:
+            rate_limit = {**settings.RATE_LIMIT, 'ENABLED': True, 'RULES': rules, **overrides}
+            reset_rate_limiter()
+
+            with override_settings(RATE_LIMIT=rate_limit):
+                try:
+                    request()
+                except Exception as e:
+                    self.stdout.write(self.style.WARNING(f'Skipping {label} limiter: {e}'))
+                    continue
+
+                self.report(f'GET /api/auth/profile/ (limiter {label})', time_calls(request, iterations, warmup))
+
+        reset_rate_limiter()
@@ -0,0 +1,110 @@
+import uuid
+from django.db import connection, models
+from django.utils import timezone
+
+from apps.core.benchmarks import BenchmarkCommand, time_calls
+from apps.core.ids import uuid7
+
+
+GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+class Command(BenchmarkCommand):
+    help = 'Compare insert throughput of UUIDv4 and UUIDv7 primary keys on a large table'
+    rollback = False
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=5_000_000,
+            help='Rows inserted into each benchmark table'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per INSERT statement (each batch is committed)'
+        )
+
+    def run_benchmark(self, rows, batch_size, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Running on {connection.vendor}; index behaviour differs from PostgreSQL'
+                )
+            )
+
+        batches = max(1, rows // batch_size)
+
+        for name, generate in GENERATORS.items():
+            table = f'bench_pk_{name}'
+            self.create_table(table)
+            try:
+                sql = self.insert_sql(table, batch_size)
+                id_field = models.UUIDField()
+                payload = 'x' * 64
+
+                def insert_batch():
+                    now = timezone.now()
+                    params = []
+                    for _ in range(batch_size):
+                        params.extend([
+                            id_field.get_db_prep_value(generate(), connection),
+                            now,
+                            payload,
+                        ])
+                    with connection.cursor() as cursor:
+                        cursor.execute(sql, params)
+
+                self.stdout.write(f'Inserting {batches * batch_size} rows with {name} keys...')
+                timings = time_calls(insert_batch, batches)
+
+                # Per-row figures; the last tenth shows behaviour once the index is large
+                per_row = [timing / batch_size for timing in timings]
+                self.report(f'{name} all batches', per_row)
+                self.report(f'{name} last 10% of batches', per_row[-max(1, batches // 10):])
+
+                if connection.vendor == 'postgresql':
+                    self.report_index_size(table)
+            finally:
+                self.drop_table(table)
+
+    def create_table(self, table):
+        uuid_type = models.UUIDField().db_type(connection)
+        datetime_type = models.DateTimeField().db_type(connection)
+        quoted = connection.ops.quote_name(table)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {quoted}')
+            cursor.execute(
+                f'CREATE TABLE {quoted} ('
+                f'id {uuid_type} PRIMARY KEY, '
+                f'created_at {datetime_type} NOT NULL, '
+                f'payload varchar(64) NOT NULL)'
+            )
+
+    def drop_table(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {connection.ops.quote_name(table)}')
+
+    def insert_sql(self, table, batch_size):
+        values = ', '.join(['(%s, %s, %s)'] * batch_size)
+        return (
+            f'INSERT INTO {connection.ops.quote_name(table)} '
+            f'(id, created_at, payload) VALUES {values}'
+        )
+
+    def report_index_size(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_size_pretty(pg_relation_size(%s::regclass)), '
+                'pg_size_pretty(pg_relation_size(%s::regclass))',
+                [table, f'{table}_pkey']
+            )
+            table_size, index_size = cursor.fetchone()
+        self.stdout.write(f'  {table}: table {table_size}, primary key index {index_size}')
@@ -0,0 +1,200 @@
+import asyncio
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.test.utils import override_settings
+from django.urls import include, path
+
+from apps.core.benchmarks import BenchmarkCommand, summarize
+
+# Simulated upstream latency, set from --io-delay
+IO_DELAY = {'seconds': 0.05}
+
+
+def sync_io_view(request):
+    """Blocks its thread for the duration of the I/O"""
+    time.sleep(IO_DELAY['seconds'])
+    return JsonResponse({'ok': True})
+
+
+async def async_io_view(request):
+    """Yields to the event loop for the duration of the I/O"""
+    await asyncio.sleep(IO_DELAY['seconds'])
+    return JsonResponse({'ok': True})
+
+
+# Used as ROOT_URLCONF while the load test runs
+urlpatterns = [
+    path('loadtest/io/sync/', sync_io_view),
+    path('loadtest/io/async/', async_io_view),
+    path('', include('config.urls')),
+]
+
+
+def wsgi_environ(url):
+    """Minimal WSGI environ for a GET, as a WSGI server would pass it"""
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': url,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '8000',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+async def asgi_request(handler, url):
+    """Send a GET through an ASGI application as an ASGI server would; returns the status"""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': url,
+        'raw_path': url.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 8000),
+    }
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    status_code = None
+    disconnected = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status_code
+        if message['type'] == 'http.response.start':
+            status_code = message['status']
+        elif message['type'] == 'http.response.body' and not message.get('more_body'):
+            disconnected.set()
+
+    await handler(scope, receive, send)
+    return status_code
+
+
+class Command(BenchmarkCommand):
+    help = (
+        'Compare sync WSGI (thread pool) with ASGI (event loop) under concurrent '
+        'I/O-bound traffic, through the full middleware stack'
+    )
+    # Requests run on several threads, outside any one transaction
+    rollback = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=400,
+            help='Requests per scenario'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=16,
+            help='WSGI threads (gunicorn workers x threads in the Dockerfile)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=64,
+            help='Requests in flight at once for ASGI'
+        )
+        parser.add_argument(
+            '--io-delay',
+            type=float,
+            default=0.05,
+            help='Seconds of simulated I/O per request'
+        )
+
+    def run_benchmark(self, requests, threads, concurrency, io_delay, **options):
+        IO_DELAY['seconds'] = io_delay
+        overrides = {
+            'ROOT_URLCONF': __name__,
+            'RATE_LIMIT': {**settings.RATE_LIMIT, 'ENABLED': False},
+        }
+
+        scenarios = [
+            ('WSGI sync I/O view', 'wsgi', '/loadtest/io/sync/'),
+            ('ASGI sync I/O view', 'asgi', '/loadtest/io/sync/'),
+            ('ASGI async I/O view', 'asgi', '/loadtest/io/async/'),
+            ('WSGI /api/health/', 'wsgi', '/api/health/'),
+            ('ASGI /api/health/', 'asgi', '/api/health/'),
+        ]
+
+        self.stdout.write(
+            f"{requests} requests per scenario, {io_delay * 1000:.0f}ms I/O, "
+            f"{threads} WSGI threads, {concurrency} ASGI in flight"
+        )
+        with override_settings(**overrides):
+            for label, server, url in scenarios:
+                if server == 'wsgi':
+                    timings, elapsed = self.run_wsgi(url, requests, threads)
+                else:
+                    timings, elapsed = asyncio.run(self.run_asgi(url, requests, concurrency))
+                self.report_load(label, timings, elapsed)
+
+    def run_wsgi(self, url, requests, threads):
+        """Like a threaded WSGI worker pool: each request holds a thread until it returns"""
+        handler = WSGIHandler()
+
+        def request(_):
+            statuses = []
+            start = time.perf_counter()
+            body = b''.join(handler(wsgi_environ(url), lambda status, headers: statuses.append(status)))
+            assert statuses[0].startswith('200'), (statuses[0], body)
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            timings = list(pool.map(request, range(requests)))
+        return timings, time.perf_counter() - start
+
+    async def run_asgi(self, url, requests, concurrency):
+        """Like an ASGI worker: requests are tasks on one event loop"""
+        handler = ASGIHandler()
+        in_flight = asyncio.Semaphore(concurrency)
+
+        async def request():
+            async with in_flight:
+                start = time.perf_counter()
+                status_code = await asgi_request(handler, url)
+                assert status_code == 200, status_code
+                return time.perf_counter() - start
+
+        start = time.perf_counter()
+        timings = await asyncio.gather(*(request() for _ in range(requests)))
+        return list(timings), time.perf_counter() - start
+
+    def report_load(self, label, timings, elapsed):
+        # Requests overlap, so throughput comes from wall time, not summed latency
+        stats = summarize(timings)
+        stats['per_second'] = len(timings) / elapsed
+        self.stdout.write(
+            f"{label:<40} "
+            f"{stats['per_second']:>10.1f}/s  "
+            f"mean {stats['mean_ms']:.3f}ms  "
+            f"p50 {stats['p50_ms']:.3f}ms  "
+            f"p99 {stats['p99_ms']:.3f}ms"
+        )
+        return stats
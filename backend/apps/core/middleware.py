@@ -1,46 +1,104 @@
 import logging
 import time
-from threading import local
-from django.utils.deprecation import MiddlewareMixin
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.http import JsonResponse
+from django.utils.functional import empty
 from rest_framework import status
+from . import db_router
 
 logger = logging.getLogger(__name__)
 
-# Thread-local storage for request context
-_thread_locals = local()
+# Request context. Context variables follow the request through threads
+# (WSGI) and tasks (ASGI, including sync_to_async hops), so concurrent
+# requests served by one thread or event loop never see each other's values.
+_current_organization = ContextVar('current_organization', default=None)
+_current_user = ContextVar('current_user', default=None)
 
 
 def get_current_organization():
-    """Get the current organization from thread-local storage"""
-    return getattr(_thread_locals, 'organization', None)
+    """Get the organization of the current request"""
+    return _current_organization.get()
 
 
 def get_current_user():
-    """Get the current user from thread-local storage"""
-    return getattr(_thread_locals, 'user', None)
+    """Get the user of the current request"""
+    return _current_user.get()
 
 
-class TenantContextMiddleware(MiddlewareMixin):
+def set_current_organization(organization):
+    """Set the organization of the current request"""
+    _current_organization.set(organization)
+
+
+class ContextMiddleware:
+    """
+    Base for middleware that runs natively under both WSGI and ASGI.
+    Subclasses implement `handle(request)` and `ahandle(request)`; the
+    async path only falls back to a thread for work that does I/O.
+    """
+    sync_capable = True
+    async_capable = True
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+    
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.ahandle(request)
+        return self.handle(request)
+
+
+class TenantContextMiddleware(ContextMiddleware):
     """
     Middleware to handle multi-tenant context.
     Extracts organization from X-Organization-Id header and validates access.
+    The context is cleared again when the response leaves, so nothing
+    carries over to the next request on the same thread.
     """
     
-    def process_request(self, request):
-        # Clear any existing context
-        _thread_locals.organization = None
-        _thread_locals.user = None
-        
+    def handle(self, request):
+        tokens = self._enter()
+        try:
+            user = getattr(request, 'user', None)
+            response = None
+            if not self._skip(request, user):
+                response = self.process_request(request, user)
+            return response or self.get_response(request)
+        finally:
+            self._exit(tokens)
+    
+    async def ahandle(self, request):
+        tokens = self._enter()
+        try:
+            user = await request.auser() if hasattr(request, 'auser') else None
+            response = None
+            if not self._skip(request, user):
+                # Principal resolution hits the cache and maybe the database
+                response = await sync_to_async(self.process_request)(request, user)
+            return response or await self.get_response(request)
+        finally:
+            self._exit(tokens)
+    
+    def _enter(self):
+        return _current_organization.set(None), _current_user.set(None)
+    
+    def _exit(self, tokens):
+        organization_token, user_token = tokens
+        _current_organization.reset(organization_token)
+        _current_user.reset(user_token)
+    
+    def _skip(self, request, user):
         # Skip for non-authenticated requests and auth endpoints
-        if not hasattr(request, 'user') or not request.user.is_authenticated:
-            return None
-            
-        if request.path.startswith('/api/auth/') or request.path.startswith('/admin/'):
-            return None
-        
-        # Store user in thread local
-        _thread_locals.user = request.user
+        if user is None or not user.is_authenticated:
+            return True
+        return request.path.startswith('/api/auth/') or request.path.startswith('/admin/')
+    
+    def process_request(self, request, user):
+        # Store user in the request context
+        _current_user.set(user)
         
         # Get organization ID from header
         org_id = request.headers.get('X-Organization-Id')
@@ -59,34 +117,29 @@ class TenantContextMiddleware(MiddlewareMixin):
         
         # Validate user has access to this organization
         try:
-            from apps.organizations.models import OrganizationMember
-            membership = OrganizationMember.objects.select_related('organization').get(
-                user=request.user,
-                organization_id=org_id,
-                is_active=True
-            )
+            from .principal import resolve_principal, attach_principal
+            principal = resolve_principal(user, org_id)
+            
+            if principal is None:
+                return JsonResponse(
+                    {'error': 'You do not have access to this organization'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
             
-            if not membership.organization.is_active:
+            if not principal.organization.is_active:
                 return JsonResponse(
                     {'error': 'Organization is inactive'},
                     status=status.HTTP_403_FORBIDDEN
                 )
             
-            # Set organization in thread local and request
-            request.organization = membership.organization
-            request.organization_member = membership
-            _thread_locals.organization = membership.organization
+            # Set organization, membership and role on the request
+            attach_principal(request, principal)
             
             logger.debug(
-                f"Tenant context set: user={request.user.email}, "
-                f"org={membership.organization.name}"
+                f"Tenant context set: user={user.email}, "
+                f"org={principal.organization.name}"
             )
             
-        except OrganizationMember.DoesNotExist:
-            return JsonResponse(
-                {'error': 'You do not have access to this organization'},
-                status=status.HTTP_403_FORBIDDEN
-            )
         except Exception as e:
             logger.error(f"Error in TenantContextMiddleware: {str(e)}")
             return JsonResponse(
@@ -97,29 +150,73 @@ class TenantContextMiddleware(MiddlewareMixin):
         return None
 
 
-class RequestLoggingMiddleware(MiddlewareMixin):
+class ReplicaRoutingMiddleware(ContextMiddleware):
+    """
+    Chooses the database the request reads from (see db_router):
+    a replica for safe methods unless the caller wrote recently or the
+    replicas lag, the primary otherwise. Pins the caller to the primary
+    after a successful write.
+    """
+    
+    def handle(self, request):
+        token = db_router.set_read_database(db_router.choose_read_database(request))
+        try:
+            response = self.get_response(request)
+            db_router.after_response(request, response)
+            return response
+        finally:
+            db_router.reset_read_database(token)
+    
+    async def ahandle(self, request):
+        # The pin lookup goes to the cache, the lag check to the replicas
+        alias = await sync_to_async(db_router.choose_read_database)(request)
+        token = db_router.set_read_database(alias)
+        try:
+            response = await self.get_response(request)
+            await sync_to_async(db_router.after_response)(request, response)
+            return response
+        finally:
+            db_router.reset_read_database(token)
+
+
+class RequestLoggingMiddleware(ContextMiddleware):
     """
     Middleware to log all API requests with timing information.
+    Does no I/O, so the async path never leaves the event loop.
     """
     
-    def process_request(self, request):
-        request.start_time = time.time()
+    def handle(self, request):
+        start_time = time.time()
+        response = self.get_response(request)
+        self.log(request, response, start_time)
+        return response
+    
+    async def ahandle(self, request):
+        start_time = time.time()
+        response = await self.get_response(request)
+        self.log(request, response, start_time)
+        return response
+    
+    def log(self, request, response, start_time):
+        duration = time.time() - start_time
         
-    def process_response(self, request, response):
-        if hasattr(request, 'start_time'):
-            duration = time.time() - request.start_time
+        # Log API requests (skip static files)
+        if request.path.startswith('/api/'):
+            user_email = getattr(_loaded_user(request), 'email', 'anonymous')
+            org_name = getattr(getattr(request, 'organization', None), 'name', 'N/A')
             
-            # Log API requests (skip static files)
-            if request.path.startswith('/api/'):
-                user_email = getattr(request.user, 'email', 'anonymous')
-                org_name = getattr(getattr(request, 'organization', None), 'name', 'N/A')
-                
-                logger.info(
-                    f"{request.method} {request.path} | "
-                    f"User: {user_email} | "
-                    f"Org: {org_name} | "
-                    f"Status: {response.status_code} | "
-                    f"Duration: {duration:.3f}s"
-                )
-        
-        return response
\ No newline at end of file
+            logger.info(
+                f"{request.method} {request.path} | "
+                f"User: {user_email} | "
+                f"Org: {org_name} | "
+                f"Status: {response.status_code} | "
+                f"Duration: {duration:.3f}s"
+            )
+
+
+def _loaded_user(request):
+    """request.user if it has already been loaded (never triggers a session lookup)"""
+    user = request.__dict__.get('user')
+    if getattr(user, '_wrapped', None) is empty:
+        return None
+    return user
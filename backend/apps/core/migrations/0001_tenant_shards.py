@@ -0,0 +1,44 @@
+# Generated by Django 5.0.1 on 2026-10-17 00:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("organizations", "0005_member_last_seen_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TenantShard",
+            fields=[
+                (
+                    "organization",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="shard",
+                        serialize=False,
+                        to="organizations.organization",
+                    ),
+                ),
+                ("database", models.CharField(max_length=100)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("active", "Active"), ("frozen", "Frozen")],
+                        default="active",
+                        max_length=20,
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "tenant_shards",
+            },
+        ),
+    ]
@@ -1,14 +1,14 @@
-import uuid
-from django.db import models
+from django.db import models, router
 from django.utils import timezone
+from .ids import uuid7
 
 
 class BaseModel(models.Model):
     """
     Abstract base model with common fields for all models.
-    Provides UUID primary key, timestamps, and soft delete functionality.
+    Provides time-ordered UUID (v7) primary key, timestamps, and soft delete functionality.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True, db_index=True)
@@ -28,18 +28,59 @@ class BaseModel(models.Model):
         self.save(update_fields=['is_active', 'updated_at'])
 
 
+class TenantQuerySet(models.QuerySet):
+    """
+    QuerySet of tenant-scoped rows.
+    Django picks the database for create() and bulk_create() before it
+    has an instance to hint the router with, so these route by the rows'
+    organization here unless a database was chosen with using().
+    """
+
+    def for_organization(self, organization):
+        """Rows of an organization, read from its shard (outside requests too)"""
+        from .sharding import shard_for
+
+        organization_id = getattr(organization, 'pk', organization)
+        return self.using(shard_for(organization_id)).filter(organization_id=organization_id)
+
+    def create(self, **kwargs):
+        if self._db is not None:
+            return super().create(**kwargs)
+
+        obj = self.model(**kwargs)
+        self._for_write = True
+        obj.save(force_insert=True)
+        return obj
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        organization_ids = {obj.organization_id for obj in objs}
+        if self._db is not None or len(organization_ids) != 1:
+            return super().bulk_create(objs, *args, **kwargs)
+
+        database = router.db_for_write(self.model, instance=objs[0])
+        return self.using(database).bulk_create(objs, *args, **kwargs)
+
+
 class TenantAwareModel(BaseModel):
     """
     Abstract base model for all tenant-scoped models.
     Automatically filters queries by organization context.
+    Rows live on the organization's shard (see sharding), while
+    organizations stay on the control database, so the foreign key has no
+    database constraint. Many-to-many relations between tenant models need
+    an explicit `through` model that is itself tenant-aware.
     """
     organization = models.ForeignKey(
         'organizations.Organization',
         on_delete=models.CASCADE,
         related_name='%(class)s_set',
-        db_index=True
+        db_index=True,
+        db_constraint=False
     )
 
+    objects = TenantQuerySet.as_manager()
+
     class Meta:
         abstract = True
         indexes = [
@@ -54,4 +95,41 @@ class TenantAwareModel(BaseModel):
             org = get_current_organization()
             if org:
                 self.organization = org
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class TenantShard(models.Model):
+    """
+    Shard directory entry: the database alias holding an organization's
+    tenant-scoped rows. Organizations without an entry live on
+    SHARDING['DEFAULT_SHARD']. Stored on the control database.
+    """
+    ACTIVE = 'active'
+    # Writes are refused while move_tenant copies the last changes
+    FROZEN = 'frozen'
+    STATUS_CHOICES = [
+        (ACTIVE, 'Active'),
+        (FROZEN, 'Frozen'),
+    ]
+
+    organization = models.OneToOneField(
+        'organizations.Organization',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='shard'
+    )
+    database = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=ACTIVE)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'tenant_shards'
+
+    def __str__(self):
+        return f"{self.organization_id} -> {self.database} ({self.status})"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        from .sharding import invalidate_shard
+        invalidate_shard(self.organization_id)
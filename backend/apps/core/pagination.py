@@ -0,0 +1,278 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+from uuid import UUID
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination.
+    Pages are selected with a WHERE on the last row's ordering values
+    instead of OFFSET, and no COUNT(*) is run by default, so every page
+    costs the same no matter how deep it is.
+
+    The default key is BaseModel's (-created_at, -id), which matches the
+    (organization, created_at) indexes on TenantAwareModel. Views can pick
+    another key with `pagination_ordering` (the last field must be unique
+    and no field may be NULL) and ask for a total with `pagination_count`.
+    Rows keyed with UUIDv7 can be paged by the key alone, ('-id',), though
+    rows created before the switch to v7 keys sort by their random ids.
+
+    Unlike PageNumberPagination, responses have no `count` unless the view
+    sets `pagination_count`, and the page order is always the view's key:
+    an `?ordering=` parameter is not applied (the cursor would not match),
+    which is why OrderingFilter is not a default filter backend.
+
+    Count modes:
+        None          - no total (default)
+        'approximate' - planner estimate from pg_class statistics
+        'exact'       - COUNT(*)
+    """
+    page_size = api_settings.PAGE_SIZE or 20
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    count_mode = None
+
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering=None, count_mode=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        if count_mode is not None:
+            self.count_mode = count_mode
+        self._explicit_ordering = ordering is not None
+        self._explicit_count_mode = count_mode is not None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        rows = self.set_page(list(page_queryset[:self.page_size + 1]))
+        self.count = self.get_count(queryset)
+        return rows
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views"""
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        rows = self.set_page([row async for row in page_queryset[:self.page_size + 1]])
+        if self.count_mode:
+            self.count = await sync_to_async(self.get_count)(queryset)
+        return rows
+
+    def get_page_queryset(self, queryset, request, view):
+        """The requested page (plus one row, to tell if there is a next page), unevaluated"""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+        self.count_mode = self.get_count_mode(view)
+        self.count = None
+
+        self.cursor_values, self.reverse = self.decode_cursor(request, queryset.model)
+
+        # Walking backwards flips every ordering direction
+        ordering = [_invert(field) for field in self.ordering] if self.reverse else list(self.ordering)
+        page_queryset = queryset.order_by(*ordering)
+        if self.cursor_values is not None:
+            page_queryset = page_queryset.filter(_keyset_filter(ordering, self.cursor_values))
+        return page_queryset
+
+    def set_page(self, rows):
+        """Record the links of the page fetched from get_page_queryset(); returns its rows"""
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if self.reverse:
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = self.cursor_values is not None, has_more
+
+        self.first_values = self.get_row_values(rows[0]) if rows else None
+        self.last_values = self.get_row_values(rows[-1]) if rows else None
+        return rows
+
+    def get_count(self, queryset):
+        if self.count_mode == 'exact':
+            return queryset.count()
+        if self.count_mode == 'approximate':
+            return get_approximate_count(queryset)
+        return None
+
+    def get_paginated_response(self, data):
+        response_data = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+        if self.count_mode:
+            response_data['count'] = self.count
+            response_data['count_is_approximate'] = self.count_mode == 'approximate'
+        response_data['results'] = data
+        return Response(response_data)
+
+    def get_paginated_response_schema(self, schema):
+        properties = {
+            'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+            'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+            'results': schema,
+        }
+        if self.count_mode:
+            properties['count'] = {'type': 'integer', 'nullable': True}
+            properties['count_is_approximate'] = {'type': 'boolean'}
+        return {'type': 'object', 'properties': properties}
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Pagination cursor from a previous response',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Number of results per page (max {self.max_page_size})',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, view):
+        if self._explicit_ordering:
+            return self.ordering
+        return tuple(getattr(view, 'pagination_ordering', self.ordering))
+
+    def get_count_mode(self, view):
+        if self._explicit_count_mode:
+            return self.count_mode
+        return getattr(view, 'pagination_count', self.count_mode)
+
+    def get_row_values(self, row):
+        return [
+            getattr(row, row._meta.get_field(field.lstrip('-')).attname)
+            for field in self.ordering
+        ]
+
+    def get_next_link(self):
+        if not self.has_next or self.last_values is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.last_values, False)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_values is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.first_values, True)
+        )
+
+    def encode_cursor(self, values, reverse):
+        payload = {'v': [_to_json(value) for value in values]}
+        if reverse:
+            payload['r'] = 1
+        encoded = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(encoded).decode().rstrip('=')
+
+    def decode_cursor(self, request, model):
+        """
+        Returns:
+            tuple: (ordering values or None, walking backwards)
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            raw_values = payload['v']
+            if len(raw_values) != len(self.ordering):
+                raise ValueError('Cursor does not match ordering')
+
+            values = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, raw_values)
+            ]
+            return values, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+def get_approximate_count(queryset):
+    """
+    Estimate the number of rows in a queryset from planner statistics.
+    Unfiltered querysets read pg_class.reltuples; filtered ones use the
+    planner's row estimate. Returns None when no estimate is available
+    (e.g., on databases other than PostgreSQL).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 until the table has been vacuumed or analyzed
+            return int(row[0]) if row and row[0] >= 0 else None
+
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _invert(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+def _keyset_filter(ordering, values):
+    """
+    Rows strictly after `values` in `ordering`, e.g. for (-created_at, -id):
+        created_at < v0 OR (created_at = v0 AND id < v1)
+    """
+    condition = Q()
+    for position, field in enumerate(ordering):
+        equal = {
+            previous.lstrip('-'): values[index]
+            for index, previous in enumerate(ordering[:position])
+        }
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= Q(**equal, **{f'{field.lstrip("-")}__{lookup}': values[position]})
+    return condition
+
+
+def _to_json(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
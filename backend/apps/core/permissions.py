@@ -1,7 +1,7 @@
 from functools import wraps
 from rest_framework import permissions
-from django.core.cache import cache
 from .exceptions import PermissionDeniedError
+from .principal import resolve_principal, invalidate_principal
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,17 +28,52 @@ class HasOrganizationPermission(permissions.BasePermission):
             return True  # No specific permission required
         
         # Check permission
-        return check_permission(
-            request.user,
-            request.organization,
-            required_permission
-        )
+        return request_has_permission(request, required_permission)
+
+
+def role_has_permission(role_id, permission_code):
+    """
+    Check a permission against the in-memory role/permission matrix.
+    Pure memory lookup: no cache or database round trip.
+    """
+    from apps.organizations.matrix import get_permission_matrix
+    return get_permission_matrix().has(role_id, permission_code)
+
+
+def get_member_role_id(user, organization):
+    """Role id of a user's active membership (None if not a member)"""
+    principal = resolve_principal(user, organization.id)
+    if principal is None:
+        return None
+    return principal.role.id
+
+
+def get_member_permissions(user, organization):
+    """
+    Get the set of permission codes a user holds in an organization.
+    The member's role comes from the cached request principal and the
+    codes from the in-memory role/permission matrix.
+    
+    Args:
+        user: User instance
+        organization: Organization instance
+    
+    Returns:
+        frozenset: Permission codes (empty if user is not an active member)
+    """
+    from apps.organizations.matrix import get_permission_matrix
+    
+    role_id = get_member_role_id(user, organization)
+    if role_id is None:
+        return frozenset()
+    return get_permission_matrix().codes_for(role_id)
 
 
 def check_permission(user, organization, permission_code):
     """
     Check if user has a specific permission in an organization.
-    Uses Redis cache to avoid repeated database queries.
+    Only the member's role id is looked up (cached); the permission
+    itself is checked against the in-memory role/permission matrix.
     
     Args:
         user: User instance
@@ -48,38 +83,38 @@ def check_permission(user, organization, permission_code):
     Returns:
         bool: True if user has permission, False otherwise
     """
-    # Create cache key
-    cache_key = f"perms:{user.id}:{organization.id}:{permission_code}"
+    role_id = get_member_role_id(user, organization)
+    if role_id is None:
+        return False
+    return role_has_permission(role_id, permission_code)
+
+
+def has_permissions(user, organization, permission_codes):
+    """
+    Check several permissions at once with a single cache read.
     
-    # Try to get from cache
-    cached_result = cache.get(cache_key)
-    if cached_result is not None:
-        return cached_result == 'true'
+    Args:
+        user: User instance
+        organization: Organization instance
+        permission_codes: Iterable of permission codes
     
-    # Query database
-    from apps.organizations.models import OrganizationMember
+    Returns:
+        bool: True if user has every permission, False otherwise
+    """
+    from apps.organizations.matrix import get_permission_matrix
     
-    try:
-        member = OrganizationMember.objects.select_related('role').get(
-            user=user,
-            organization=organization,
-            is_active=True
-        )
-        
-        # Check if role has the permission
-        has_perm = member.role.permissions.filter(
-            code=permission_code,
-            is_active=True
-        ).exists()
-        
-        # Cache result for 5 minutes
-        cache.set(cache_key, 'true' if has_perm else 'false', 300)
-        
-        return has_perm
-        
-    except OrganizationMember.DoesNotExist:
-        cache.set(cache_key, 'false', 300)
+    role_id = get_member_role_id(user, organization)
+    if role_id is None:
         return False
+    return get_permission_matrix().has_all(role_id, permission_codes)
+
+
+def request_has_permission(request, permission_code):
+    """Check a permission for the current request, reusing its principal"""
+    principal = getattr(request, 'principal', None)
+    if principal is not None:
+        return principal.has_permission(permission_code)
+    return check_permission(request.user, request.organization, permission_code)
 
 
 def invalidate_permission_cache(user, organization):
@@ -87,12 +122,7 @@ def invalidate_permission_cache(user, organization):
     Invalidate all cached permissions for a user in an organization.
     Call this when user's role changes or role permissions are modified.
     """
-    # Note: This is a simple implementation. In production, you might want
-    # to maintain a list of cached keys for each user-org pair for efficient invalidation
-    cache_pattern = f"perms:{user.id}:{organization.id}:*"
-    logger.info(f"Invalidating permission cache: {cache_pattern}")
-    # Django cache doesn't support pattern deletion by default
-    # You'd need to maintain a list of keys or use Redis directly
+    invalidate_principal(user.id, organization.id)
 
 
 def require_permission(permission_code):
@@ -110,7 +140,7 @@ def require_permission(permission_code):
             if not hasattr(request, 'organization'):
                 raise PermissionDeniedError("Organization context not set")
             
-            if not check_permission(request.user, request.organization, permission_code):
+            if not request_has_permission(request, permission_code):
                 logger.warning(
                     f"Permission denied: user={request.user.email}, "
                     f"org={request.organization.name}, "
@@ -125,19 +155,34 @@ def require_permission(permission_code):
     return decorator
 
 
+def get_request_role_name(request):
+    """Role name of the caller in the current organization (no queries)"""
+    principal = getattr(request, 'principal', None)
+    if principal is None:
+        return None
+    return principal.role_name
+
+
+class IsUserAccount(permissions.BasePermission):
+    """Reject machine callers (API keys) on endpoints that act on the caller's own account"""
+    
+    def has_permission(self, request, view):
+        return bool(
+            request.user
+            and request.user.is_authenticated
+            and not getattr(request.user, 'is_api_key', False)
+        )
+
+
 class IsOrganizationOwner(permissions.BasePermission):
     """Check if user is owner of the organization"""
     
     def has_permission(self, request, view):
-        if not hasattr(request, 'organization_member'):
-            return False
-        return request.organization_member.role.name == 'Owner'
+        return get_request_role_name(request) == 'Owner'
 
 
 class IsOrganizationAdmin(permissions.BasePermission):
     """Check if user is admin or owner of the organization"""
     
     def has_permission(self, request, view):
-        if not hasattr(request, 'organization_member'):
-            return False
-        return request.organization_member.role.name in ['Owner', 'Admin']
\ No newline at end of file
+        return get_request_role_name(request) in ['Owner', 'Admin']
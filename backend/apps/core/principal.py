@@ -0,0 +1,159 @@
+import pickle
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from .cache import LocalLRUCache, get_versions, bump_version
+from .db_router import use_primary
+from .touch import touch
+
+# Cached marker for "user is not an active member of this organization"
+_NOT_A_MEMBER = b''
+
+# Roles are global, so one version covers every cached principal
+ROLES_VERSION_KEY = 'roles_ver'
+
+_local_principals = LocalLRUCache(
+    maxsize=settings.PRINCIPAL_CACHE['LOCAL_MAXSIZE'],
+    timeout=settings.PRINCIPAL_CACHE['LOCAL_TIMEOUT']
+)
+
+
+class RequestPrincipal:
+    """
+    Everything a tenant request needs to know about its caller:
+    the user, their membership, the organization and the member's role.
+    """
+    __slots__ = ('user', 'membership', 'organization', 'role')
+
+    def __init__(self, user, membership):
+        self.user = user
+        self.membership = membership
+        self.organization = membership.organization
+        self.role = membership.role
+
+    def __repr__(self):
+        return f"<RequestPrincipal user={self.user.pk} org={self.organization.pk} role={self.role.name}>"
+
+    @property
+    def role_name(self):
+        return self.role.name
+    
+    def has_permission(self, permission_code):
+        """Check a permission against the in-memory role/permission matrix"""
+        from apps.organizations.matrix import get_permission_matrix
+        return get_permission_matrix().has(self.role.id, permission_code)
+
+
+def member_version_key(user_id, organization_id):
+    """Version key shared by everything cached for one membership"""
+    return f"member_ver:{user_id}:{organization_id}"
+
+
+def _organization_version_key(organization_id):
+    return f"org_ver:{organization_id}"
+
+
+def resolve_principal(user, organization_id):
+    """
+    Resolve the tenant principal for a user in an organization.
+    Loads membership, organization and role in one joined query and caches
+    the result per (user, organization) in-process and in Redis. Cache keys
+    include membership, organization and role versions, so any change to
+    those rows invalidates the entry everywhere. Misses are filled from the
+    primary, never a replica.
+
+    Args:
+        user: Authenticated User instance
+        organization_id: Organization id (str or UUID)
+
+    Returns:
+        RequestPrincipal: Principal, or None if user is not an active member
+
+    Raises:
+        ValueError: If organization_id is not a valid UUID
+    """
+    organization_id = uuid.UUID(str(organization_id))
+
+    versions = get_versions(
+        member_version_key(user.pk, organization_id),
+        _organization_version_key(organization_id),
+        ROLES_VERSION_KEY,
+    )
+    key = f"principal:{user.pk}:{organization_id}:" + ':'.join(versions)
+
+    payload = _local_principals.get(key)
+    if payload is None:
+        payload = cache.get(key)
+
+        if payload is None:
+            from apps.organizations.models import OrganizationMember
+
+            # Read the primary: a lagging replica could fill the current
+            # versions' key with the row from before the change that bumped them
+            with use_primary():
+                membership = OrganizationMember.objects.select_related(
+                    'organization', 'role'
+                ).filter(
+                    user_id=user.pk,
+                    organization_id=organization_id,
+                    is_active=True
+                ).first()
+
+            payload = pickle.dumps(membership) if membership else _NOT_A_MEMBER
+            cache.set(key, payload, settings.PRINCIPAL_CACHE['TIMEOUT'])
+
+        _local_principals.set(key, payload)
+
+    if payload == _NOT_A_MEMBER:
+        return None
+
+    # Each request gets its own copies so nothing leaks between threads
+    membership = pickle.loads(payload)
+    membership.user = user
+    return RequestPrincipal(user, membership)
+
+
+def attach_principal(request, principal):
+    """
+    Attach a resolved principal to the request.
+    Sets `principal`, `organization` and `organization_member` so middleware,
+    permissions and serializers can all read it without further queries,
+    and buffers the membership's last_seen_at.
+    """
+    from .middleware import set_current_organization
+
+    # DRF's Request proxies attribute reads to the underlying HttpRequest
+    http_request = getattr(request, '_request', request)
+    http_request.principal = principal
+    http_request.organization = principal.organization
+    http_request.organization_member = principal.membership
+    set_current_organization(principal.organization)
+    
+    # API key principals have no membership
+    if principal.membership is not None:
+        touch(type(principal.membership), principal.membership.pk, 'last_seen_at')
+
+
+def invalidate_principal(user_id, organization_id):
+    """Invalidate the cached principal and permissions for one membership"""
+    transaction.on_commit(
+        lambda: bump_version(member_version_key(user_id, organization_id))
+    )
+
+
+def invalidate_organization_principals(organization_id):
+    """Invalidate cached principals of every member of an organization"""
+    transaction.on_commit(
+        lambda: bump_version(_organization_version_key(organization_id))
+    )
+
+
+def invalidate_all_principals():
+    """Invalidate every cached principal (roles are shared by all tenants)"""
+    transaction.on_commit(lambda: bump_version(ROLES_VERSION_KEY))
+
+
+def clear_local_principal_cache():
+    """Drop this process's in-memory principal entries (used by tests)"""
+    _local_principals.clear()
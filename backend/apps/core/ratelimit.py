@@ -0,0 +1,459 @@
+import logging
+import math
+import re
+import threading
+import time
+from collections import namedtuple
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework import status
+from .cache import LocalLRUCache
+
+logger = logging.getLogger(__name__)
+
+# Refills and takes `cost` tokens from every bucket in KEYS, all or nothing.
+# ARGV: cost, then (capacity, refill per second) for each key.
+# Returns (tokens left, seconds until a retry can succeed) per key, as strings
+# so fractions survive the conversion to a Redis reply.
+TOKEN_BUCKET_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local levels = {}
+local allowed = true
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local elapsed = math.max(0, now - (tonumber(state[2]) or now))
+    tokens = math.min(capacity, tokens + elapsed * rate)
+    levels[i] = tokens
+    if tokens < cost then
+        allowed = false
+    end
+end
+
+local result = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local tokens = levels[i]
+    local retry_after = 0
+    if allowed then
+        tokens = tokens - cost
+    elseif tokens < cost then
+        retry_after = (cost - tokens) / rate
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000) + 1000)
+    result[i] = {tostring(tokens), tostring(retry_after)}
+end
+return result
+"""
+
+RATE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_RATE_PATTERN = re.compile(r'^(\d+)/(\d*)([smhd])$')
+
+# Outcome of a check against one bucket
+BucketState = namedtuple('BucketState', ['tokens', 'retry_after'])
+
+RateLimitResult = namedtuple(
+    'RateLimitResult',
+    ['allowed', 'rule', 'limit', 'period', 'remaining', 'reset', 'retry_after']
+)
+
+
+def parse_rate(rate):
+    """
+    Parse a rate such as '5/15m', '100/m' or '1000/h'.
+
+    Returns:
+        tuple: (requests, period in seconds)
+
+    Raises:
+        ValueError: If the rate is malformed
+    """
+    match = _RATE_PATTERN.match(rate)
+    if not match:
+        raise ValueError(f"Invalid rate: {rate!r}")
+
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * RATE_UNITS[unit]
+
+
+# Key functions: return the identity a bucket is kept for, or None if the
+# request doesn't have one (the rule is then skipped)
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR')
+
+
+def request_user_id(request):
+    """
+    Id of the calling user.
+    Rate limits run before DRF authentication, so for bearer tokens this
+    only verifies the JWT signature; DRF still rejects revoked tokens.
+    """
+    if not hasattr(request, '_ratelimit_user_id'):
+        user_id = None
+        user = getattr(request, 'user', None)
+
+        if user is not None and user.is_authenticated:
+            user_id = str(user.pk)
+        else:
+            parts = request.headers.get('Authorization', '').split()
+            if len(parts) == 2 and parts[0].lower() == 'bearer':
+                import jwt
+                from apps.authentication.backends import decode_access_token
+                try:
+                    user_id = decode_access_token(parts[1]).get('user_id')
+                except jwt.InvalidTokenError:
+                    user_id = None
+
+        request._ratelimit_user_id = user_id
+    return request._ratelimit_user_id
+
+
+def request_api_key(request):
+    """Verified API key sent with the request (cached lookup, see api_keys)"""
+    if not hasattr(request, '_ratelimit_api_key'):
+        api_key = None
+        parts = request.headers.get('Authorization', '').split()
+
+        if len(parts) == 2 and parts[0].lower() == 'api-key':
+            from apps.authentication.api_keys import get_api_key
+            api_key = get_api_key(parts[1])
+
+        request._ratelimit_api_key = api_key
+    return request._ratelimit_api_key
+
+
+def request_api_key_prefix(request):
+    api_key = request_api_key(request)
+    return api_key.prefix if api_key else None
+
+
+def request_organization_id(request):
+    """
+    Id of the organization the request acts on.
+    Only organizations the caller is an active member of (or whose API key
+    it holds) count, so nobody can spend another tenant's quota by sending
+    its id.
+    """
+    organization = getattr(request, 'organization', None)
+    if organization is not None:
+        return str(organization.pk)
+
+    api_key = request_api_key(request)
+    if api_key is not None:
+        return str(api_key.organization_id)
+
+    organization_id = request.headers.get('X-Organization-Id')
+    user_id = request_user_id(request)
+    if not organization_id or not user_id:
+        return None
+
+    from apps.authentication.user_cache import get_cached_user
+    from .principal import resolve_principal
+
+    user = get_cached_user(user_id)
+    try:
+        principal = resolve_principal(user, organization_id) if user else None
+    except ValueError:
+        return None
+    return str(principal.organization.pk) if principal else None
+
+
+def request_route(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else request.path
+
+
+KEY_FUNCTIONS = {
+    'ip': client_ip,
+    'user': request_user_id,
+    'organization': request_organization_id,
+    'route': request_route,
+    'api_key': request_api_key_prefix,
+}
+
+
+class RateLimitRule:
+    """
+    One entry of RATE_LIMIT['RULES'].
+
+    Args:
+        name: Bucket namespace, also reported in RateLimit-Policy
+        rate: Default rate, e.g. '5/15m'
+        key: Key function name or list of names combined into one bucket
+        views: URL names the rule applies to (default: all)
+        path: Regex the request path must match (default: all)
+        methods: HTTP methods the rule applies to (default: all)
+        overrides: Rates for specific identities, e.g. {'<organization id>': '5000/m'}
+    """
+
+    def __init__(self, name, rate, key, views=None, path=None, methods=None, overrides=None):
+        self.name = name
+        self.rate = parse_rate(rate)
+        self.key = [key] if isinstance(key, str) else list(key)
+        self.views = set(views) if views else None
+        self.path = re.compile(path) if path else None
+        self.methods = {method.upper() for method in methods} if methods else None
+        self.overrides = {identity: parse_rate(value) for identity, value in (overrides or {}).items()}
+
+        for part in self.key:
+            if part not in KEY_FUNCTIONS:
+                raise ValueError(f"Unknown rate limit key {part!r} in rule {name!r}")
+
+    def matches(self, request):
+        if self.methods and request.method not in self.methods:
+            return False
+        if self.path and not self.path.match(request.path):
+            return False
+        if self.views:
+            match = getattr(request, 'resolver_match', None)
+            if match is None or match.url_name not in self.views:
+                return False
+        return True
+
+    def bucket(self, request):
+        """
+        Returns:
+            tuple: (bucket key, requests, period), or None if the request
+            has no identity for this rule
+        """
+        values = []
+        for part in self.key:
+            value = KEY_FUNCTIONS[part](request)
+            if value is None:
+                return None
+            values.append(str(value))
+
+        identity = ':'.join(values)
+        limit, period = self.overrides.get(identity, self.rate)
+        return f"rl:{self.name}:{identity}", limit, period
+
+
+class LocalTokenBuckets:
+    """
+    In-process token buckets with the same semantics as TOKEN_BUCKET_SCRIPT.
+    Each worker counts on its own, so the effective limit is multiplied by
+    the number of worker processes.
+    """
+
+    def __init__(self, maxsize=10000):
+        self._buckets = LocalLRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def consume(self, buckets, cost=1):
+        """
+        Take `cost` tokens from every bucket, or from none if any is short.
+
+        Args:
+            buckets: List of (key, capacity, refill per second)
+            cost: Tokens per request
+
+        Returns:
+            list: BucketState per bucket
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            levels = []
+            for key, capacity, rate in buckets:
+                tokens, updated = self._buckets.get(key, (capacity, now))
+                levels.append(min(capacity, tokens + max(0, now - updated) * rate))
+
+            allowed = all(tokens >= cost for tokens in levels)
+
+            states = []
+            for (key, capacity, rate), tokens in zip(buckets, levels):
+                retry_after = 0.0
+                if allowed:
+                    tokens -= cost
+                elif tokens < cost:
+                    retry_after = (cost - tokens) / rate
+                self._buckets.set(key, (tokens, now), timeout=capacity / rate + 1)
+                states.append(BucketState(tokens, retry_after))
+            return states
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class RedisTokenBuckets:
+    """
+    Token buckets shared by every worker, checked with one EVALSHA per
+    request. Falls back to in-process buckets while Redis is unreachable,
+    sharing the cache alias' circuit breaker so a stalled Redis isn't
+    waited on for every request.
+    """
+
+    # Seconds between "Redis unavailable" warnings
+    WARNING_INTERVAL = 60
+
+    def __init__(self, alias='default', fallback=None):
+        from django.core.cache import caches
+        from django_redis import get_redis_connection
+
+        self.redis = get_redis_connection(alias)
+        self.breaker = getattr(caches[alias], 'breaker', None)
+        self.prefix = f"{settings.CACHES[alias].get('KEY_PREFIX', '')}:"
+        self.script = self.redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self.fallback = fallback or LocalTokenBuckets()
+        self._warned_at = 0
+
+    def consume(self, buckets, cost=1):
+        from redis.exceptions import RedisError
+
+        args = [cost]
+        for _, capacity, rate in buckets:
+            args += [capacity, rate]
+
+        if self.breaker is not None and not self.breaker.allow_request():
+            return self.fallback.consume(buckets, cost)
+
+        try:
+            reply = self.script(keys=[self.prefix + key for key, _, _ in buckets], args=args)
+        except RedisError as e:
+            if self.breaker is not None:
+                self.breaker.record_failure(e)
+            if time.monotonic() - self._warned_at > self.WARNING_INTERVAL:
+                self._warned_at = time.monotonic()
+                logger.warning(f"Rate limiter falling back to local buckets: {str(e)}")
+            return self.fallback.consume(buckets, cost)
+
+        if self.breaker is not None:
+            self.breaker.record_success()
+        return [BucketState(float(tokens), float(retry_after)) for tokens, retry_after in reply]
+
+    def clear(self):
+        self.fallback.clear()
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the process-wide RateLimiter configured by RATE_LIMIT"""
+    global _limiter
+
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(settings.RATE_LIMIT)
+    return _limiter
+
+
+def reset_rate_limiter():
+    """Drop the limiter and its local buckets (after settings change, in tests)"""
+    global _limiter
+
+    with _limiter_lock:
+        _limiter = None
+
+
+class RateLimiter:
+    """Applies RATE_LIMIT['RULES'] to requests"""
+
+    def __init__(self, config):
+        self.rules = [RateLimitRule(**rule) for rule in config['RULES']]
+        local = LocalTokenBuckets(maxsize=config['LOCAL_MAXSIZE'])
+
+        if config['BACKEND'] == 'redis':
+            self.buckets = RedisTokenBuckets(config['CACHE_ALIAS'], fallback=local)
+        else:
+            self.buckets = local
+
+    def check(self, request):
+        """
+        Count a request against every rule that applies to it.
+
+        Returns:
+            RateLimitResult: For the most constrained bucket, or None if no
+            rule applies
+        """
+        checks = []
+        for rule in self.rules:
+            if rule.matches(request):
+                bucket = rule.bucket(request)
+                if bucket is not None:
+                    checks.append((rule, *bucket))
+
+        if not checks:
+            return None
+
+        states = self.buckets.consume([
+            (key, limit, limit / period) for _, key, limit, period in checks
+        ])
+
+        # Only buckets that were short when the request was denied have a retry delay
+        allowed = all(state.retry_after == 0 for state in states)
+        results = []
+        for (rule, _, limit, period), state in zip(checks, states):
+            rate = limit / period
+            results.append(RateLimitResult(
+                allowed=allowed,
+                rule=rule.name,
+                limit=limit,
+                period=period,
+                remaining=max(0, math.floor(state.tokens)),
+                reset=math.ceil((limit - state.tokens) / rate),
+                retry_after=math.ceil(state.retry_after),
+            ))
+
+        if allowed:
+            return min(results, key=lambda result: result.remaining / result.limit)
+        return max(results, key=lambda result: result.retry_after)
+
+
+class RateLimitMiddleware(MiddlewareMixin):
+    """
+    Token-bucket rate limiting for every request, configured by
+    RATE_LIMIT['RULES'] (IP, user, organization, route and API key keys).
+    Runs in process_view so URL names are known, and adds RateLimit-*
+    headers describing the most constrained bucket to the response.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not settings.RATE_LIMIT['ENABLED']:
+            return None
+
+        result = get_rate_limiter().check(request)
+        if result is None:
+            return None
+
+        request.rate_limit = result
+
+        if not result.allowed:
+            logger.warning(f"Rate limit '{result.rule}' exceeded: {request.method} {request.path}")
+            response = JsonResponse(
+                {
+                    'error': {
+                        'message': 'Too many requests. Please try again later.',
+                        'code': 'rate_limit_exceeded',
+                        'status_code': status.HTTP_429_TOO_MANY_REQUESTS,
+                    }
+                },
+                status=status.HTTP_429_TOO_MANY_REQUESTS
+            )
+            response['Retry-After'] = str(result.retry_after)
+            return response
+
+        return None
+
+    def process_response(self, request, response):
+        result = getattr(request, 'rate_limit', None)
+
+        if result is not None:
+            response['RateLimit-Limit'] = str(result.limit)
+            response['RateLimit-Remaining'] = str(result.remaining)
+            response['RateLimit-Reset'] = str(result.retry_after or result.reset)
+            response['RateLimit-Policy'] = f'{result.limit};w={result.period};name="{result.rule}"'
+
+        return response
@@ -0,0 +1,198 @@
+import logging
+from collections import namedtuple
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from .cache import LocalLRUCache, get_version, bump_version
+from .exceptions import ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+ShardEntry = namedtuple('ShardEntry', ['database', 'status'])
+
+# In-process directory. Entries are not versioned (routing a query must not
+# cost a round trip): other processes pick up a change within LOCAL_TIMEOUT,
+# which is why move_tenant waits that long after each directory change.
+# Shared entries are keyed by a per-organization version, bumped on commit.
+_local_shards = LocalLRUCache(
+    maxsize=settings.SHARDING['LOCAL_MAXSIZE'],
+    timeout=settings.SHARDING['LOCAL_TIMEOUT']
+)
+
+
+class TenantMovingError(ServiceUnavailableError):
+    """Raised on writes to an organization while move_tenant switches its shard"""
+    default_detail = 'This organization is being moved. Please try again shortly.'
+    default_code = 'tenant_moving'
+
+
+def control_database():
+    return settings.SHARDING['CONTROL_DATABASE']
+
+
+def shard_aliases():
+    return settings.SHARDING['SHARDS']
+
+
+def is_tenant_model(model):
+    from .models import TenantAwareModel
+
+    return issubclass(model, TenantAwareModel)
+
+
+def tenant_models():
+    """
+    Concrete tenant-scoped models, parents before children, so rows can
+    be inserted in this order and deleted in reverse.
+    """
+    models = [
+        model for model in apps.get_models()
+        if is_tenant_model(model) and not model._meta.proxy
+    ]
+    ordered = []
+
+    def visit(model, path):
+        if model in ordered:
+            return
+        if model in path:
+            raise ValueError(f"Circular foreign keys between tenant models at {model.__name__}")
+        for field in model._meta.concrete_fields:
+            related = field.related_model
+            if field.is_relation and related in models and related is not model:
+                visit(related, path | {model})
+        ordered.append(model)
+
+    for model in models:
+        visit(model, frozenset())
+    return ordered
+
+
+def _local_key(organization_id):
+    return f"tenant_shard:{organization_id}"
+
+
+def _version_key(organization_id):
+    return f"tenant_shard_ver:{organization_id}"
+
+
+def get_shard(organization_id):
+    """
+    Directory entry of an organization, through the in-process and shared
+    caches. The version is read before the row, so a reader that loaded the
+    row before a change committed can only store it under the old version.
+
+    Returns:
+        ShardEntry: (database alias, status)
+    """
+    local_key = _local_key(organization_id)
+
+    entry = _local_shards.get(local_key)
+    if entry is None:
+        version = get_version(_version_key(organization_id))
+        key = f"tenant_shard:{organization_id}:{version}"
+        entry = cache.get(key)
+
+        if entry is None:
+            from .models import TenantShard
+
+            row = TenantShard.objects.using(control_database()).filter(
+                organization_id=organization_id
+            ).values_list('database', 'status').first()
+            entry = ShardEntry(*row) if row else ShardEntry(settings.SHARDING['DEFAULT_SHARD'], TenantShard.ACTIVE)
+            cache.set(key, tuple(entry), settings.SHARDING['TIMEOUT'])
+
+        entry = ShardEntry(*entry)
+        _local_shards.set(local_key, entry)
+
+    return entry
+
+
+def shard_for(organization_id):
+    """Database alias holding an organization's tenant rows"""
+    return get_shard(organization_id).database
+
+
+def invalidate_shard(organization_id):
+    """Invalidate cached directory entries once the current transaction commits"""
+
+    def invalidate():
+        bump_version(_version_key(organization_id))
+        _local_shards.delete(_local_key(organization_id))
+
+    transaction.on_commit(invalidate, using=control_database())
+
+
+def clear_local_shard_cache():
+    """Drop this process's directory entries (used by tests)"""
+    _local_shards.clear()
+
+
+def _organization_id(hints):
+    """Organization a tenant query is for: the instance's, else the request's"""
+    instance = hints.get('instance')
+    organization_id = getattr(instance, 'organization_id', None)
+    if organization_id is not None:
+        return organization_id
+
+    from .middleware import get_current_organization
+
+    organization = get_current_organization()
+    return organization.pk if organization is not None else None
+
+
+class ShardRouter:
+    """
+    Sends TenantAwareModel queries to the organization's shard: the
+    organization of the instance involved, else that of the current
+    request, else DEFAULT_SHARD. Other models are left to the next router
+    (control database, replicas). Writes are refused while the
+    organization is frozen for a move.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not is_tenant_model(model):
+            return None
+
+        organization_id = _organization_id(hints)
+        if organization_id is None:
+            return settings.SHARDING['DEFAULT_SHARD']
+        return get_shard(organization_id).database
+
+    def db_for_write(self, model, **hints):
+        if not is_tenant_model(model):
+            return None
+
+        organization_id = _organization_id(hints)
+        if organization_id is None:
+            return settings.SHARDING['DEFAULT_SHARD']
+
+        from .models import TenantShard
+
+        entry = get_shard(organization_id)
+        if entry.status != TenantShard.ACTIVE:
+            logger.warning(f"Write to {model._meta.label} refused, organization {organization_id} is moving")
+            raise TenantMovingError(wait=settings.SHARDING['LOCAL_TIMEOUT'])
+        return entry.database
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Tenant rows point at organizations and users on the control database
+        if is_tenant_model(type(obj1)) or is_tenant_model(type(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db not in shard_aliases() or db == control_database():
+            return None
+
+        # Migrations pass historical models, which lose their abstract
+        # bases, so look the model up in the app registry
+        if model_name is None:
+            return None
+        try:
+            model = apps.get_model(app_label, model_name)
+        except LookupError:
+            return None
+
+        # Shards hold only tenant tables
+        return is_tenant_model(model)
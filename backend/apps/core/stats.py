@@ -0,0 +1,5 @@
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list of numbers"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
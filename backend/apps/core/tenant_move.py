@@ -0,0 +1,254 @@
+import hashlib
+import logging
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import TenantShard
+from .sharding import control_database, get_shard, shard_aliases, tenant_models
+
+logger = logging.getLogger(__name__)
+
+
+class TenantMoveError(Exception):
+    """Raised when a move can't start or its verification fails"""
+
+
+def move_tenant(organization, target, batch_size=None, catch_up_passes=3, keep_source=False, progress=None):
+    """
+    Move an organization's tenant rows to another shard while it stays online.
+
+    1. Copy: rows are streamed from the source shard in primary key order,
+       `batch_size` at a time, and upserted on the target. Reads and writes
+       continue on the source.
+    2. Catch up: rows changed since the previous pass started (by
+       updated_at, with CLOCK_SKEW of slack) are copied again, up to
+       `catch_up_passes` times or until a pass finds nothing.
+    3. Freeze: the directory entry is marked frozen, so writes are refused
+       with a 503, and the move waits LOCAL_TIMEOUT for every process to
+       see it. Then the last changes are copied and rows deleted on the
+       source are deleted on the target.
+    4. Verify: row count and a checksum of every column must match for
+       each model. On mismatch the freeze is lifted on the source and the
+       move fails; copied rows stay on the target and are reconciled by
+       the next attempt.
+    5. Switch: the directory points at the target. After another
+       LOCAL_TIMEOUT no process reads the source any more and its rows are
+       deleted in batches (unless `keep_source`).
+
+    Args:
+        organization: Organization to move
+        target: Database alias of the destination shard
+        batch_size: Rows per batch (default SHARDING['MOVE_BATCH_SIZE'])
+        catch_up_passes: Maximum online catch-up passes
+        keep_source: Leave the rows on the source shard
+        progress: Optional callable(phase, model label, rows so far)
+
+    Returns:
+        dict: Per model {'copied', 'deleted_on_target', 'rows', 'removed_from_source'}
+        plus 'frozen_seconds' and 'seconds'
+
+    Raises:
+        TenantMoveError: Unknown or same shard, or verification failed
+    """
+    batch_size = batch_size or settings.SHARDING['MOVE_BATCH_SIZE']
+    source = get_shard(organization.pk).database
+
+    if target not in shard_aliases():
+        raise TenantMoveError(f"Unknown shard '{target}' (configured: {', '.join(shard_aliases())})")
+    if target == source:
+        raise TenantMoveError(f"Organization {organization.pk} is already on '{target}'")
+
+    models = tenant_models()
+    metrics = {model._meta.label: {'copied': 0, 'deleted_on_target': 0} for model in models}
+    started = time.monotonic()
+    logger.info(f"Moving organization {organization.pk} from {source} to {target}")
+
+    with preserved_timestamps(models):
+        # 1-2. Online copy and catch-up
+        since = None
+        for _ in range(1 + catch_up_passes):
+            pass_started = timezone.now()
+            copied = _copy_pass(models, organization, source, target, since, batch_size, metrics, progress)
+            since = pass_started - settings.SHARDING['CLOCK_SKEW']
+            if not copied:
+                break
+
+        # 3. Freeze and final catch-up
+        _set_directory(organization, source, TenantShard.FROZEN)
+        frozen_at = time.monotonic()
+        try:
+            _wait_for_directory()
+            _copy_pass(models, organization, source, target, since, batch_size, metrics, progress)
+            for model in reversed(models):
+                metrics[model._meta.label]['deleted_on_target'] += _delete_missing(
+                    model, organization, source, target, batch_size
+                )
+
+            # 4. Verify
+            for model in models:
+                source_rows = checksum(model, organization, source, batch_size)
+                target_rows = checksum(model, organization, target, batch_size)
+                if source_rows != target_rows:
+                    raise TenantMoveError(
+                        f"Verification failed for {model._meta.label}: "
+                        f"source {source_rows[0]} row(s), target {target_rows[0]} row(s)"
+                    )
+                metrics[model._meta.label]['rows'] = source_rows[0]
+        except Exception:
+            _set_directory(organization, source, TenantShard.ACTIVE)
+            raise
+
+        # 5. Switch
+        _set_directory(organization, target, TenantShard.ACTIVE)
+    frozen_seconds = time.monotonic() - frozen_at
+    logger.info(f"Organization {organization.pk} now on {target} (writes frozen {frozen_seconds:.2f}s)")
+
+    if not keep_source:
+        _wait_for_directory()
+        for model in reversed(models):
+            metrics[model._meta.label]['removed_from_source'] = _delete_rows(
+                model, organization, source, batch_size, progress
+            )
+
+    metrics['frozen_seconds'] = frozen_seconds
+    metrics['seconds'] = time.monotonic() - started
+    return metrics
+
+
+@contextmanager
+def preserved_timestamps(models):
+    """Copy auto_now/auto_now_add values as they are instead of stamping the copy time"""
+    flags = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                flags.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def stream_rows(model, organization, database, batch_size, since=None):
+    """Yield batches of an organization's rows in primary key order (keyset, no OFFSET)"""
+    queryset = model._base_manager.using(database).filter(organization_id=organization.pk)
+    if since is not None and any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+        queryset = queryset.filter(updated_at__gte=since)
+
+    last_pk = None
+    while True:
+        batch = queryset.order_by('pk')
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        rows = list(batch[:batch_size])
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1].pk
+
+
+def _copy_pass(models, organization, source, target, since, batch_size, metrics, progress):
+    copied = 0
+    for model in models:
+        label = model._meta.label
+        update_fields = [field.name for field in model._meta.concrete_fields if not field.primary_key]
+
+        for rows in stream_rows(model, organization, source, batch_size, since):
+            with transaction.atomic(using=target):
+                model._base_manager.using(target).bulk_create(
+                    rows,
+                    update_conflicts=True,
+                    unique_fields=[model._meta.pk.name],
+                    update_fields=update_fields
+                )
+            copied += len(rows)
+            metrics[label]['copied'] += len(rows)
+            if progress:
+                progress('copy', label, metrics[label]['copied'])
+    return copied
+
+
+def _ids(model, organization, database, batch_size):
+    queryset = model._base_manager.using(database).filter(organization_id=organization.pk)
+    return queryset.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size)
+
+
+def _delete_missing(model, organization, source, target, batch_size):
+    """Delete target rows whose source row is gone (merge of both id streams)"""
+    source_ids = _ids(model, organization, source, batch_size)
+    missing = []
+    deleted = 0
+
+    source_id = next(source_ids, None)
+    for target_id in _ids(model, organization, target, batch_size):
+        while source_id is not None and source_id < target_id:
+            source_id = next(source_ids, None)
+        if source_id != target_id:
+            missing.append(target_id)
+        if len(missing) >= batch_size:
+            deleted += _delete_ids(model, target, missing)
+            missing = []
+    if missing:
+        deleted += _delete_ids(model, target, missing)
+    return deleted
+
+
+def _delete_ids(model, database, ids):
+    count, _ = model._base_manager.using(database).filter(pk__in=ids).delete()
+    return count
+
+
+def _delete_rows(model, organization, database, batch_size, progress=None):
+    deleted = 0
+    while True:
+        ids = list(
+            model._base_manager.using(database)
+            .filter(organization_id=organization.pk)
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += _delete_ids(model, database, ids)
+        if progress:
+            progress('cleanup', model._meta.label, deleted)
+
+
+def checksum(model, organization, database, batch_size):
+    """
+    Row count and SHA-256 over every column of an organization's rows in
+    primary key order.
+
+    Returns:
+        tuple: (row count, hex digest)
+    """
+    digest = hashlib.sha256()
+    count = 0
+    columns = [field.attname for field in model._meta.concrete_fields]
+    rows = (
+        model._base_manager.using(database)
+        .filter(organization_id=organization.pk)
+        .order_by('pk')
+        .values_list(*columns)
+        .iterator(chunk_size=batch_size)
+    )
+    for row in rows:
+        digest.update(repr(row).encode())
+        count += 1
+    return count, digest.hexdigest()
+
+
+def _set_directory(organization, database, status):
+    with transaction.atomic(using=control_database()):
+        TenantShard.objects.using(control_database()).update_or_create(
+            organization_id=organization.pk,
+            defaults={'database': database, 'status': status}
+        )
+
+
+def _wait_for_directory():
+    """Give every process time to drop its cached directory entry"""
+    time.sleep(settings.SHARDING['LOCAL_TIMEOUT'] + settings.SHARDING['MOVE_GRACE'])
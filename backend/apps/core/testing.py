@@ -0,0 +1,39 @@
+from contextlib import ExitStack, contextmanager
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Statements that change data or schema (first keyword of the SQL)
+WRITE_STATEMENTS = frozenset({
+    'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'MERGE', 'TRUNCATE',
+    'CREATE', 'ALTER', 'DROP',
+})
+
+
+@contextmanager
+def assert_no_writes(using=DEFAULT_DB_ALIAS):
+    """
+    Fail if any statement run inside the block writes to the database.
+    Writes are recorded rather than blocked, so a view that swallows
+    errors can't hide them; the assertion lists every write at the end.
+
+    Args:
+        using: Database alias, or a list of aliases, to watch
+
+    Example:
+        with assert_no_writes():
+            response = client.get(url)
+    """
+    aliases = [using] if isinstance(using, str) else list(using)
+    writes = []
+
+    def record(execute, sql, params, many, context):
+        keyword = sql.lstrip(' (').split(None, 1)[0].upper() if sql.strip() else ''
+        if keyword in WRITE_STATEMENTS:
+            writes.append(sql)
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(record))
+        yield writes
+
+    assert not writes, f"{len(writes)} write(s) in a block expected to be read-only:\n" + '\n'.join(writes)
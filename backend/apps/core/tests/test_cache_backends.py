@@ -0,0 +1,179 @@
+import itertools
+import pytest
+from apps.core import cache as versioned_cache
+from apps.core.cache_backends import CircuitBreaker, CircuitBreakerRedisCache, CLOSED, OPEN, HALF_OPEN
+
+# Each test gets its own breaker: they are shared per server location
+_databases = itertools.count(1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def unreachable_cache(**breaker_options):
+    """Cache pointing at a port nothing listens on, so every call is refused"""
+    return CircuitBreakerRedisCache(f'redis://127.0.0.1:1/{next(_databases)}', {
+        'OPTIONS': {
+            'SOCKET_CONNECT_TIMEOUT': 0.1,
+            'SOCKET_TIMEOUT': 0.1,
+            'CIRCUIT_BREAKER': {'FAILURE_THRESHOLD': 2, 'RESET_TIMEOUT': 60, **breaker_options},
+        },
+    })
+
+
+def reachable_cache(**breaker_options):
+    """Cache on an in-memory Redis server"""
+    fakeredis = pytest.importorskip('fakeredis')
+    return CircuitBreakerRedisCache(f'redis://fake-{next(_databases)}:6379/0', {
+        'OPTIONS': {
+            'CONNECTION_POOL_KWARGS': {
+                'connection_class': fakeredis.FakeConnection,
+                'server': fakeredis.FakeServer(),
+            },
+            'CIRCUIT_BREAKER': {'FAILURE_THRESHOLD': 1, 'RESET_TIMEOUT': 10, **breaker_options},
+        },
+    })
+
+
+class TestCircuitBreaker:
+    
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=10, clock=FakeClock())
+        
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow_request()
+        assert breaker.metrics()['short_circuited'] == 1
+    
+    def test_half_open_lets_one_probe_through(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        
+        clock.now = 10
+        assert breaker.allow_request()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow_request()
+        
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.metrics()['retry_in'] == 10
+        
+        clock.now = 20
+        assert breaker.allow_request()
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.allow_request()
+
+
+class TestCircuitBreakerRedisCache:
+    
+    def test_serves_locally_while_open(self):
+        cache = unreachable_cache()
+        
+        cache.set('greeting', 'hello')
+        assert cache.get('greeting') == 'hello'
+        assert cache.breaker.state == OPEN
+        
+        # No more connection attempts while the circuit is open
+        failures = cache.breaker.metrics()['failures']
+        assert cache.get_many(['greeting', 'missing']) == {'greeting': 'hello'}
+        assert cache.add('lock', 1) is True
+        assert cache.add('lock', 1) is False
+        assert cache.incr('lock') == 2
+        cache.delete('greeting')
+        assert cache.get('greeting', 'gone') == 'gone'
+        assert cache.breaker.metrics()['failures'] == failures
+        
+        with pytest.raises(ValueError):
+            cache.incr('missing')
+    
+    def test_values_from_redis_are_not_mirrored(self):
+        cache = reachable_cache()
+        
+        cache.set('user', 'active')
+        cache.set_many({'a': 1, 'b': 2})
+        cache.add('lock', 1)
+        cache.incr('lock')
+        assert cache.get('user') == 'active'
+        assert cache.get_many(['a', 'b']) == {'a': 1, 'b': 2}
+        
+        # An outage can't serve any of these (e.g. a since-revoked user) stale
+        assert len(cache.local) == 0
+        cache.breaker.record_failure()
+        assert cache.get('user') is None
+    
+    def test_probe_ending_in_other_error_is_released(self):
+        cache = reachable_cache()
+        clock = FakeClock()
+        cache.breaker.clock = clock
+        cache.breaker.record_failure()
+        assert cache.breaker.state == OPEN
+        
+        # The half-open probe hits a missing key: Redis answered, but not
+        # with a value the caller can use
+        clock.now = 10
+        with pytest.raises(ValueError):
+            cache.incr('missing')
+        
+        cache.set('key', 'value')
+        assert cache.breaker.state == CLOSED
+        assert cache.get('key') == 'value'
+    
+    def test_local_values_dropped_when_circuit_closes(self):
+        cache = unreachable_cache()
+        cache.set('key', 'value')
+        cache.get('key')
+        assert cache.breaker.state == OPEN
+        
+        cache.breaker.record_success()
+        
+        assert cache.breaker.state == CLOSED
+        assert len(cache.local) == 0
+    
+    def test_version_bumped_during_outage_survives_recovery(self, monkeypatch):
+        cache = reachable_cache()
+        clock = FakeClock()
+        cache.breaker.clock = clock
+        monkeypatch.setattr(versioned_cache, 'cache', cache)
+        before = versioned_cache.get_version('user_ver:1')
+        cache.set(f'user:1:{before}', 'active')
+        
+        # Redis is down when the user is deactivated: the bump only reaches the LRU
+        cache.breaker.record_failure()
+        versioned_cache.bump_version('user_ver:1')
+        assert versioned_cache.get_version('user_ver:1') != before
+        
+        # Back up: the pre-outage version (and entry) are still in Redis,
+        # but must not be used again
+        clock.now = 10
+        after = versioned_cache.get_version('user_ver:1')
+        
+        assert cache.breaker.state == CLOSED
+        assert after != before
+        assert cache.get(f'user:1:{after}') is None
+        assert versioned_cache.get_version('user_ver:1') == after
+    
+    def test_epoch_kept_when_no_writes_were_lost(self, monkeypatch):
+        cache = reachable_cache()
+        clock = FakeClock()
+        cache.breaker.clock = clock
+        monkeypatch.setattr(versioned_cache, 'cache', cache)
+        before = versioned_cache.get_version('user_ver:1')
+        
+        cache.breaker.record_failure()
+        cache.get('user')
+        clock.now = 10
+        
+        assert versioned_cache.get_version('user_ver:1') == before
+        assert cache.breaker.state == CLOSED
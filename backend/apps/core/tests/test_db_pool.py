@@ -0,0 +1,182 @@
+import itertools
+import threading
+import time
+import pytest
+from apps.core.db.pool import ConnectionPool, PoolTimeout, get_pool, pool_stats
+
+_ids = itertools.count(1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class FakeConnection:
+    def __init__(self):
+        self.id = next(_ids)
+        self.closed = False
+    
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**options):
+    connections = []
+    
+    def connect():
+        connection = FakeConnection()
+        connections.append(connection)
+        return connection
+    
+    pool = ConnectionPool(connect, name='test', **options)
+    return pool, connections
+
+
+class TestConnectionPool:
+    
+    def test_reuses_most_recently_returned_connection(self):
+        pool, connections = make_pool(clock=FakeClock())
+        
+        first = pool.getconn()
+        second = pool.getconn()
+        pool.putconn(first)
+        pool.putconn(second)
+        
+        assert pool.getconn() is second
+        assert len(connections) == 2
+        stats = pool.stats()
+        assert stats['checkouts'] == 3
+        assert stats['in_use'] == 1
+        assert stats['idle'] == 1
+        assert stats['utilization'] == 0.25
+    
+    def test_times_out_when_exhausted(self):
+        pool, connections = make_pool(max_size=1, timeout=0.05)
+        pool.getconn()
+        
+        with pytest.raises(PoolTimeout):
+            pool.getconn()
+        
+        assert len(connections) == 1
+        assert pool.stats()['timeouts'] == 1
+    
+    def test_waiting_client_gets_returned_connection(self):
+        pool, _ = make_pool(max_size=1, timeout=5)
+        connection = pool.getconn()
+        result = {}
+        
+        waiter = threading.Thread(target=lambda: result.update(connection=pool.getconn()))
+        waiter.start()
+        deadline = time.monotonic() + 5
+        while pool.stats()['waiting'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        assert pool.stats()['waiting'] == 1
+        
+        pool.putconn(connection)
+        waiter.join(5)
+        
+        assert result['connection'] is connection
+        stats = pool.stats()
+        assert stats['waiting'] == 0
+        assert stats['checkout_ms']['max'] > 0
+    
+    def test_replaces_connections_past_max_lifetime(self):
+        clock = FakeClock()
+        pool, connections = make_pool(clock=clock, max_lifetime=100)
+        
+        connection = pool.getconn()
+        clock.now = 100
+        pool.putconn(connection)
+        
+        assert connection.closed
+        assert pool.getconn() is not connection
+        assert len(connections) == 2
+    
+    def test_closes_idle_connections_above_min_size(self):
+        clock = FakeClock()
+        pool, connections = make_pool(clock=clock, min_size=1, max_idle=60, check=None)
+        first, second = pool.getconn(), pool.getconn()
+        pool.putconn(first)
+        pool.putconn(second)
+        
+        clock.now = 60
+        pool.getconn()
+        
+        assert first.closed
+        assert not second.closed
+        assert pool.stats()['size'] == 1
+    
+    def test_checks_connections_idle_past_check_interval(self):
+        clock = FakeClock()
+        checked = []
+        
+        def check(connection):
+            checked.append(connection)
+            return False
+        
+        pool, connections = make_pool(clock=clock, check=check, check_interval=30)
+        connection = pool.getconn()
+        pool.putconn(connection)
+        
+        assert pool.getconn() is connection
+        assert checked == []
+        
+        pool.putconn(connection)
+        clock.now = 30
+        replacement = pool.getconn()
+        
+        assert checked == [connection]
+        assert connection.closed
+        assert replacement is connections[-1]
+        assert pool.stats()['failed_checks'] == 1
+    
+    def test_discarded_and_failed_connections_free_their_slot(self):
+        attempts = []
+        
+        def connect():
+            attempts.append(1)
+            if len(attempts) == 2:
+                raise ConnectionError('refused')
+            return FakeConnection()
+        
+        pool = ConnectionPool(connect, max_size=1, timeout=0.05)
+        connection = pool.getconn()
+        pool.putconn(connection, discard=True)
+        assert connection.closed
+        
+        with pytest.raises(ConnectionError):
+            pool.getconn()
+        
+        assert pool.getconn() is not None
+        assert pool.stats()['size'] == 1
+    
+    def test_fill_opens_min_size(self):
+        pool, connections = make_pool(min_size=2, max_size=4)
+        
+        pool.fill()
+        
+        assert len(connections) == 2
+        assert pool.stats()['idle'] == 2
+    
+    def test_rejects_foreign_connections(self):
+        pool, _ = make_pool()
+        
+        with pytest.raises(ValueError):
+            pool.putconn(FakeConnection())
+
+
+def test_get_pool_replaces_pool_when_settings_change():
+    first = get_pool('pool-test', lambda: make_pool()[0], signature=['a'])
+    connection = first.getconn()
+    
+    assert get_pool('pool-test', lambda: make_pool()[0], signature=['a']) is first
+    second = get_pool('pool-test', lambda: make_pool()[0], signature=['b'])
+    
+    assert second is not first
+    first.putconn(connection)
+    assert connection.closed
+    assert 'pool-test' in pool_stats()
@@ -0,0 +1,148 @@
+from contextlib import contextmanager
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.authentication.api_keys import create_api_key, get_api_key
+from apps.authentication.backends import generate_access_token
+from apps.authentication.user_cache import get_cached_user
+from apps.core import db_router
+from apps.core.principal import resolve_principal
+from apps.organizations.models import Role
+
+
+@pytest.fixture
+def replicas(settings):
+    """Route reads to the 'replica' test alias (a mirror of the primary)"""
+    settings.DATABASE_REPLICAS = {**settings.DATABASE_REPLICAS, 'ALIASES': ['replica']}
+    db_router.reset_replica_lag()
+    yield
+    db_router.reset_replica_lag()
+
+
+@pytest.fixture
+def client(make_member):
+    member = make_member()
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(member.user)}')
+    return client
+
+
+def replica_queries(client, url):
+    with CaptureQueriesContext(connections['replica']) as queries:
+        response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    return len(queries)
+
+
+# The replica is a second connection, so it only sees committed rows
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+@pytest.mark.usefixtures('replicas')
+class TestReplicaRouter:
+    
+    def test_reads_outside_requests_use_primary(self):
+        assert db_router.ReplicaRouter().db_for_read(Role) == 'default'
+        assert db_router.ReplicaRouter().db_for_write(Role) == 'default'
+    
+    def test_safe_requests_read_from_replica(self, client):
+        assert replica_queries(client, reverse('role-list')) > 0
+    
+    def test_writer_is_pinned_to_primary(self, client):
+        response = client.patch(reverse('user-profile'), {'first_name': 'Pinned'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        
+        assert replica_queries(client, reverse('role-list')) == 0
+        assert client.get(reverse('user-profile')).data['first_name'] == 'Pinned'
+    
+    def test_pins_are_per_caller(self, client, make_member):
+        client.patch(reverse('user-profile'), {'first_name': 'Pinned'}, format='json')
+        other = APIClient()
+        other.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(make_member().user)}')
+        
+        assert replica_queries(other, reverse('role-list')) > 0
+    
+    @pytest.mark.parametrize('lag', [60.0, None])
+    def test_lagging_or_unreachable_replica_falls_back_to_primary(self, client, monkeypatch, lag):
+        monkeypatch.setattr(db_router, 'measure_lag', lambda alias: lag)
+        
+        assert replica_queries(client, reverse('role-list')) == 0
+    
+    def test_health_reports_lagging_replica(self, monkeypatch, make_member):
+        monkeypatch.setattr(db_router, 'measure_lag', lambda alias: 60.0)
+        staff = make_member().user
+        staff.is_staff = True
+        staff.save()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(staff)}')
+        
+        assert APIClient().get(reverse('health')).json() == {'status': 'degraded'}
+        data = client.get(reverse('health-details')).json()
+        
+        assert data['status'] == 'degraded'
+        assert data['replicas'] == {'replica': {'lag': 60.0, 'in_use': False}}
+
+
+def replay(*instances):
+    """Copy rows to the lagging replica, as if it had replayed them"""
+    for instance in instances:
+        type(instance).objects.using('lagging_replica').bulk_create([instance])
+
+
+@pytest.fixture
+def lagging_replica(settings):
+    settings.DATABASE_REPLICAS = {**settings.DATABASE_REPLICAS, 'ALIASES': ['lagging_replica']}
+
+
+@contextmanager
+def reading_from_replica():
+    """Route reads to the lagging replica, as ReplicaRoutingMiddleware would"""
+    token = db_router.set_read_database('lagging_replica')
+    try:
+        yield
+    finally:
+        db_router.reset_read_database(token)
+
+
+# Changes reach the lagging replica only through replay(); their version
+# bumps (on commit) are visible at once, as with real replication lag
+@pytest.mark.django_db(transaction=True, databases=['default', 'lagging_replica'])
+@pytest.mark.usefixtures('lagging_replica')
+class TestLaggingReplicaCannotRefillCaches:
+    
+    def test_principal(self, make_member, roles):
+        member = make_member(role='Viewer')
+        replay(member.user, member.organization, member.role, member)
+        with reading_from_replica():
+            assert resolve_principal(member.user, member.organization_id).role_name == 'Viewer'
+        
+        member.role = roles['Admin']
+        member.save()
+        
+        with reading_from_replica():
+            assert resolve_principal(member.user, member.organization_id).role_name == 'Admin'
+    
+    def test_user(self, make_member):
+        user = make_member().user
+        replay(user)
+        with reading_from_replica():
+            assert get_cached_user(user.pk) is not None
+        
+        user.is_active = False
+        user.save()
+        
+        with reading_from_replica():
+            assert get_cached_user(user.pk) is None
+    
+    def test_api_key(self, make_member):
+        organization = make_member().organization
+        key, raw_key = create_api_key(organization, 'ERP sync', ['products.view'])
+        replay(organization, key)
+        with reading_from_replica():
+            assert get_api_key(raw_key) == key
+        
+        key.revoke()
+        
+        with reading_from_replica():
+            assert get_api_key(raw_key) is None
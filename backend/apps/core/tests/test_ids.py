@@ -0,0 +1,27 @@
+import uuid
+from datetime import datetime, timezone
+from apps.core.ids import uuid7, uuid7_timestamp, uuid7_lower_bound
+
+
+class TestUUID7:
+    
+    def test_version_and_variant(self):
+        value = uuid7()
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+    
+    def test_strictly_increasing(self):
+        values = [uuid7() for _ in range(10000)]
+        assert values == sorted(values)
+        assert len(set(values)) == len(values)
+        
+        # String form sorts the same way, which is how sqlite stores them
+        assert [v.hex for v in values] == sorted(v.hex for v in values)
+    
+    def test_timestamp(self):
+        moment = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        bound = uuid7_lower_bound(moment)
+        
+        assert uuid7_timestamp(bound) == moment.timestamp()
+        assert uuid7_timestamp(uuid.uuid4()) is None
+        assert bound < uuid7()
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.authentication.backends import generate_access_token
+from apps.core.middleware import TenantContextMiddleware, get_current_organization, get_current_user
+
+
+def make_request(member):
+    request = RequestFactory().get(
+        '/api/organizations/current/',
+        HTTP_X_ORGANIZATION_ID=str(member.organization_id)
+    )
+    
+    async def auser():
+        return member.user
+    
+    request.auser = auser
+    return request
+
+
+@pytest.mark.django_db
+class TestTenantContext:
+    
+    def test_context_is_cleared_after_request(self, make_member):
+        member = make_member()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(member.user)}')
+        
+        response = client.get(
+            reverse('organization-detail', args=[member.organization_id]),
+            HTTP_X_ORGANIZATION_ID=str(member.organization_id)
+        )
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert get_current_organization() is None
+        assert get_current_user() is None
+    
+    def test_concurrent_async_requests_keep_their_own_context(self, make_member):
+        members = [make_member(), make_member()]
+        seen = {}
+        
+        async def view(request):
+            # Interleave the two requests on the event loop
+            for _ in range(3):
+                await asyncio.sleep(0)
+            seen[request.organization.id] = (get_current_organization(), get_current_user())
+            return None
+        
+        middleware = TenantContextMiddleware(view)
+        
+        async def run():
+            await asyncio.gather(*(middleware(make_request(member)) for member in members))
+        
+        async_to_sync(run)()
+        
+        for member in members:
+            assert seen[member.organization_id] == (member.organization, member.user)
+        assert get_current_organization() is None
+    
+    def test_async_request_without_membership_is_rejected(self, make_member):
+        member = make_member()
+        request = make_request(member)
+        outsider = make_member().user
+        
+        async def auser():
+            return outsider
+        
+        request.auser = auser
+        
+        async def view(request):
+            raise AssertionError('view should not be called')
+        
+        response = async_to_sync(TenantContextMiddleware(view))(request)
+        
+        assert response.status_code == status.HTTP_403_FORBIDDEN
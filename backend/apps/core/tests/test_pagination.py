@@ -0,0 +1,67 @@
+import pytest
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from apps.core.pagination import KeysetPagination
+from apps.organizations.models import Organization
+
+factory = APIRequestFactory()
+
+
+def paginate(url, **kwargs):
+    paginator = KeysetPagination(**kwargs)
+    request = Request(factory.get(url))
+    rows = paginator.paginate_queryset(Organization.objects.all(), request)
+    return paginator, rows
+
+
+@pytest.fixture
+def organizations(db):
+    return [
+        Organization.objects.create(name=f'Org {i:02d}', slug=f'org-{i:02d}')
+        for i in range(7)
+    ]
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    
+    def test_walks_forward_and_backward(self, organizations):
+        paginator, first = paginate('/items/?page_size=3')
+        assert paginator.get_previous_link() is None
+        
+        paginator, second = paginate(paginator.get_next_link())
+        paginator, third = paginate(paginator.get_next_link())
+        assert paginator.get_next_link() is None
+        
+        newest_first = sorted(organizations, key=lambda o: (o.created_at, o.id), reverse=True)
+        assert first + second + third == newest_first
+        
+        paginator, back = paginate(paginator.get_previous_link())
+        assert back == second
+    
+    def test_custom_ordering(self, organizations):
+        paginator, first = paginate('/items/?page_size=4', ordering=('name', 'id'))
+        paginator, rest = paginate(paginator.get_next_link(), ordering=('name', 'id'))
+        
+        assert [o.name for o in first + rest] == [f'Org {i:02d}' for i in range(7)]
+    
+    def test_primary_key_ordering(self, organizations):
+        # UUIDv7 keys are time-ordered, so the key alone is a valid cursor
+        paginator, first = paginate('/items/?page_size=4', ordering=('-id',))
+        paginator, rest = paginate(paginator.get_next_link(), ordering=('-id',))
+        
+        assert first + rest == organizations[::-1]
+    
+    def test_counts(self, organizations):
+        paginator, _ = paginate('/items/', count_mode='exact')
+        assert paginator.count == 7
+        
+        # Planner statistics are only available on PostgreSQL
+        paginator, _ = paginate('/items/', count_mode='approximate')
+        assert paginator.count is None
+        assert paginator.get_paginated_response([]).data['count_is_approximate'] is True
+    
+    def test_invalid_cursor(self, organizations):
+        with pytest.raises(NotFound):
+            paginate('/items/?cursor=not-a-cursor')
@@ -0,0 +1,99 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from apps.core.permissions import (
+    check_permission,
+    has_permissions,
+    role_has_permission,
+    get_member_permissions,
+    invalidate_permission_cache
+)
+from apps.core.principal import clear_local_principal_cache
+from apps.organizations.matrix import get_permission_matrix
+from apps.organizations.models import RolePermission
+
+
+@pytest.mark.django_db
+class TestMemberPermissions:
+    
+    def test_check_permission_follows_role(self, make_member):
+        member = make_member(role='Viewer')
+        
+        assert check_permission(member.user, member.organization, 'invoices.view')
+        assert not check_permission(member.user, member.organization, 'invoices.create')
+    
+    def test_permission_set_served_from_cache(self, make_member, django_assert_num_queries):
+        member = make_member(role='Staff')
+        
+        get_member_permissions(member.user, member.organization)
+        
+        clear_local_principal_cache()
+        with django_assert_num_queries(0):
+            assert check_permission(member.user, member.organization, 'invoices.create')
+            assert not check_permission(member.user, member.organization, 'invoices.delete')
+    
+    def test_has_permissions_batch(self, make_member):
+        member = make_member(role='Accountant')
+        
+        assert has_permissions(member.user, member.organization, ['invoices.view', 'payments.create'])
+        assert not has_permissions(member.user, member.organization, ['invoices.view', 'users.manage'])
+    
+    def test_non_member_has_no_permissions(self, make_member):
+        member = make_member()
+        outsider = make_member().user
+        
+        assert get_member_permissions(outsider, member.organization) == frozenset()
+    
+    def test_role_change_invalidates_permissions(self, make_member, roles, django_capture_on_commit_callbacks):
+        member = make_member(role='Viewer')
+        assert not check_permission(member.user, member.organization, 'users.manage')
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            member.role = roles['Admin']
+            member.save()
+            invalidate_permission_cache(member.user, member.organization)
+        
+        assert check_permission(member.user, member.organization, 'users.manage')
+    
+    def test_role_permission_change_invalidates_permissions(
+        self, make_member, roles, django_capture_on_commit_callbacks
+    ):
+        member = make_member(role='Viewer')
+        assert check_permission(member.user, member.organization, 'reports.view')
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            RolePermission.objects.filter(
+                role=roles['Viewer'],
+                permission__code='reports.view'
+            ).delete()
+        
+        assert not check_permission(member.user, member.organization, 'reports.view')
+
+
+@pytest.mark.django_db
+class TestPermissionMatrix:
+    
+    def test_bitset_lookup(self, roles):
+        matrix = get_permission_matrix()
+        
+        assert matrix.has(roles['Owner'].id, 'settings.manage')
+        assert not matrix.has(roles['Viewer'].id, 'settings.manage')
+        assert not matrix.has(roles['Owner'].id, 'unknown.permission')
+        assert matrix.has_all(roles['Manager'].id, ['invoices.approve', 'reports.export'])
+        assert matrix.permission_count(roles['Owner'].id) == len(matrix.codes)
+    
+    def test_check_with_principal_needs_no_queries(self, make_member, django_assert_num_queries):
+        member = make_member(role='Staff')
+        check_permission(member.user, member.organization, 'invoices.view')
+        
+        with django_assert_num_queries(0):
+            assert role_has_permission(member.role_id, 'invoices.create')
+            assert check_permission(member.user, member.organization, 'inventory.update')
+    
+    def test_seed_roles_publishes_reload(self, roles, django_capture_on_commit_callbacks):
+        matrix = get_permission_matrix()
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command('seed_roles', stdout=StringIO())
+        
+        assert get_permission_matrix() is not matrix
@@ -0,0 +1,76 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.authentication.backends import generate_access_token
+from apps.core.principal import resolve_principal, clear_local_principal_cache
+
+
+@pytest.mark.django_db
+class TestRequestPrincipal:
+    
+    def test_resolves_membership_organization_and_role(self, make_member, django_assert_num_queries):
+        member = make_member(role='Admin')
+        
+        with django_assert_num_queries(1):
+            principal = resolve_principal(member.user, member.organization_id)
+        
+        assert principal.membership == member
+        assert principal.organization == member.organization
+        assert principal.role_name == 'Admin'
+    
+    def test_warm_cache_needs_no_queries(self, make_member, django_assert_num_queries):
+        member = make_member()
+        resolve_principal(member.user, member.organization_id)
+        clear_local_principal_cache()
+        
+        with django_assert_num_queries(0):
+            principal = resolve_principal(member.user, member.organization_id)
+            assert principal.role_name == 'Owner'
+            assert principal.organization.name == member.organization.name
+    
+    def test_non_member_resolves_to_none(self, make_member):
+        member = make_member()
+        outsider = make_member().user
+        
+        assert resolve_principal(outsider, member.organization_id) is None
+    
+    def test_role_change_invalidates_cache(self, make_member, roles, django_capture_on_commit_callbacks):
+        member = make_member(role='Staff')
+        resolve_principal(member.user, member.organization_id)
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            member.role = roles['Admin']
+            member.save()
+        
+        assert resolve_principal(member.user, member.organization_id).role_name == 'Admin'
+    
+    def test_removed_member_loses_access(self, make_member, django_capture_on_commit_callbacks):
+        member = make_member(role='Staff')
+        resolve_principal(member.user, member.organization_id)
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            member.soft_delete()
+        
+        assert resolve_principal(member.user, member.organization_id) is None
+    
+    def test_admin_permission_uses_principal(self, make_member):
+        member = make_member(role='Admin')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(member.user)}')
+        
+        url = reverse('organization-detail', args=[member.organization_id])
+        response = client.patch(url, {'description': 'Updated'}, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['user_role'] == 'Admin'
+    
+    def test_staff_cannot_update_organization(self, make_member):
+        member = make_member(role='Staff')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(member.user)}')
+        
+        url = reverse('organization-detail', args=[member.organization_id])
+        response = client.patch(url, {'description': 'Updated'}, format='json')
+        
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,114 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.authentication.backends import generate_access_token
+from apps.core.ratelimit import LocalTokenBuckets, parse_rate
+
+
+@pytest.fixture
+def rate_limit(settings):
+    def configure(*rules):
+        settings.RATE_LIMIT = {**settings.RATE_LIMIT, 'ENABLED': True, 'RULES': list(rules)}
+    return configure
+
+
+def client_for(member):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {generate_access_token(member.user)}',
+        HTTP_X_ORGANIZATION_ID=str(member.organization_id)
+    )
+    return client
+
+
+def test_parse_rate():
+    assert parse_rate('5/15m') == (5, 900)
+    assert parse_rate('100/m') == (100, 60)
+    assert parse_rate('3/h') == (3, 3600)
+    
+    with pytest.raises(ValueError):
+        parse_rate('5 per minute')
+
+
+def test_buckets_are_all_or_nothing():
+    buckets = LocalTokenBuckets()
+    pair = [('a', 1, 0.001), ('b', 2, 0.001)]
+    
+    assert all(state.retry_after == 0 for state in buckets.consume(pair))
+    
+    # 'a' is empty, so 'b' must not be charged for the denied request
+    denied = buckets.consume(pair)
+    assert denied[0].retry_after > 0
+    assert denied[1].retry_after == 0
+    assert round(buckets.consume([('b', 2, 0.001)])[0].tokens) == 0
+
+
+@pytest.mark.django_db
+class TestRateLimitMiddleware:
+    
+    def test_login_limited_per_ip(self, rate_limit):
+        rate_limit({'name': 'login', 'rate': '2/m', 'key': 'ip', 'views': ['login'], 'methods': ['POST']})
+        url = reverse('login')
+        payload = {'email': 'nobody@example.com', 'password': 'wrong'}
+        
+        for _ in range(2):
+            response = APIClient().post(url, payload, format='json', REMOTE_ADDR='10.0.0.1')
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+        
+        response = APIClient().post(url, payload, format='json', REMOTE_ADDR='10.0.0.1')
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.json()['error']['code'] == 'rate_limit_exceeded'
+        assert 0 < int(response['Retry-After']) <= 30
+        assert response['RateLimit-Remaining'] == '0'
+        
+        response = APIClient().post(url, payload, format='json', REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_headers_report_tightest_bucket(self, rate_limit, make_member):
+        rate_limit(
+            {'name': 'user', 'rate': '100/m', 'key': 'user', 'path': r'^/api/'},
+            {'name': 'organization', 'rate': '10/m', 'key': 'organization', 'path': r'^/api/'},
+        )
+        member = make_member()
+        
+        response = client_for(member).get(reverse('organization-detail', args=[member.organization_id]))
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response['RateLimit-Limit'] == '10'
+        assert response['RateLimit-Remaining'] == '9'
+        assert response['RateLimit-Policy'] == '10;w=60;name="organization"'
+    
+    def test_organization_quota_and_overrides(self, rate_limit, make_member):
+        member = make_member()
+        other = make_member()
+        rate_limit({
+            'name': 'organization',
+            'rate': '1/m',
+            'key': 'organization',
+            'path': r'^/api/',
+            'overrides': {str(other.organization_id): '5/m'},
+        })
+        
+        client = client_for(member)
+        url = reverse('organization-detail', args=[member.organization_id])
+        assert client.get(url).status_code == status.HTTP_200_OK
+        assert client.get(url).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        
+        response = client_for(other).get(reverse('organization-detail', args=[other.organization_id]))
+        assert response['RateLimit-Limit'] == '5'
+    
+    def test_non_member_cannot_spend_organization_quota(self, rate_limit, make_member):
+        member = make_member()
+        outsider = make_member()
+        rate_limit({'name': 'organization', 'rate': '1/m', 'key': 'organization', 'path': r'^/api/'})
+        
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {generate_access_token(outsider.user)}',
+            HTTP_X_ORGANIZATION_ID=str(member.organization_id)
+        )
+        client.get(reverse('organization-detail', args=[member.organization_id]))
+        
+        response = client_for(member).get(reverse('organization-detail', args=[member.organization_id]))
+        assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,161 @@
+import contextvars
+import pytest
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import models
+from apps.core import sharding, tenant_move
+from apps.core.middleware import set_current_organization
+from apps.core.models import TenantAwareModel, TenantShard
+from apps.core.sharding import ShardRouter, TenantMovingError, clear_local_shard_cache, get_shard
+from apps.core.tenant_move import TenantMoveError, move_tenant
+from apps.organizations.models import Organization, Role
+
+
+class ShardedNote(TenantAwareModel):
+    """Tenant-scoped model for these tests only"""
+    body = models.CharField(max_length=100)
+    
+    class Meta(TenantAwareModel.Meta):
+        app_label = 'core'
+        db_table = 'test_sharded_notes'
+
+
+def make_organization(name):
+    return Organization.objects.create(name=name, slug=name.lower())
+
+
+def notes(organization, database):
+    return list(
+        ShardedNote.objects.using(database)
+        .filter(organization=organization)
+        .order_by('pk')
+        .values_list('id', 'body', 'created_at', 'updated_at')
+    )
+
+
+# Each shard is its own in-memory database, so rows must be committed
+pytestmark = pytest.mark.django_db(transaction=True, databases=['default', 'shard_2'])
+
+
+class TestShardRouter:
+    
+    def test_tenant_rows_follow_the_directory(self):
+        acme = make_organization('Acme')
+        TenantShard.objects.create(organization=acme, database='shard_2')
+        
+        note = ShardedNote.objects.create(organization=acme, body='hello')
+        
+        assert note._state.db == 'shard_2'
+        assert not ShardedNote.objects.using('default').exists()
+        assert ShardedNote.objects.using('shard_2').get().body == 'hello'
+        assert list(ShardedNote.objects.for_organization(acme).values_list('body', flat=True)) == ['hello']
+    
+    def test_queries_use_the_request_organization(self):
+        acme = make_organization('Acme')
+        TenantShard.objects.create(organization=acme, database='shard_2')
+        ShardedNote.objects.create(organization=acme, body='hello')
+        
+        def read():
+            set_current_organization(acme)
+            return list(ShardedNote.objects.values_list('body', flat=True))
+        
+        assert contextvars.copy_context().run(read) == ['hello']
+    
+    def test_organizations_without_entry_use_default_shard(self):
+        acme = make_organization('Acme')
+        
+        assert get_shard(acme.pk).database == 'default'
+        assert ShardedNote.objects.create(organization=acme, body='x')._state.db == 'default'
+    
+    def test_reader_racing_a_change_cannot_cache_the_old_entry(self, monkeypatch):
+        acme = make_organization('Acme')
+        held = []
+        
+        class HeldWrites:
+            """The shared cache, with writes held back"""
+            def __getattr__(self, name):
+                return getattr(cache, name)
+            
+            def set(self, *args, **kwargs):
+                held.append((args, kwargs))
+        
+        # A reader loads the entry before the change commits...
+        monkeypatch.setattr(sharding, 'cache', HeldWrites())
+        assert get_shard(acme.pk).database == 'default'
+        monkeypatch.setattr(sharding, 'cache', cache)
+        TenantShard.objects.create(organization=acme, database='shard_2')
+        
+        # ...and stores it after the entries were invalidated
+        for args, kwargs in held:
+            cache.set(*args, **kwargs)
+        clear_local_shard_cache()
+        
+        assert get_shard(acme.pk).database == 'shard_2'
+    
+    def test_global_tables_are_left_to_the_control_database(self):
+        router = ShardRouter()
+        
+        assert router.db_for_read(Role) is None
+        assert router.allow_migrate('shard_2', 'organizations', 'role') is False
+        assert router.allow_migrate('shard_2', 'core', 'shardednote') is True
+    
+    def test_frozen_tenant_refuses_writes(self):
+        acme = make_organization('Acme')
+        TenantShard.objects.create(organization=acme, database='default', status=TenantShard.FROZEN)
+        
+        with pytest.raises(TenantMovingError):
+            ShardedNote.objects.create(organization=acme, body='x')
+
+
+class TestMoveTenant:
+    
+    def test_moves_rows_and_switches_directory(self):
+        acme = make_organization('Acme')
+        other = make_organization('Other')
+        for index in range(5):
+            ShardedNote.objects.create(organization=acme, body=f'note {index}')
+        ShardedNote.objects.create(organization=other, body='stays')
+        before = notes(acme, 'default')
+        
+        metrics = move_tenant(acme, 'shard_2', batch_size=2)
+        
+        assert notes(acme, 'shard_2') == before
+        assert notes(acme, 'default') == []
+        assert get_shard(acme.pk) == ('shard_2', TenantShard.ACTIVE)
+        assert metrics['core.ShardedNote']['rows'] == 5
+        assert ShardedNote.objects.using('default').filter(organization=other).count() == 1
+    
+    def test_rows_deleted_during_copy_are_reconciled(self):
+        acme = make_organization('Acme')
+        created = [ShardedNote.objects.create(organization=acme, body=f'note {index}') for index in range(4)]
+        
+        def delete_after_first_batch(phase, label, rows):
+            if phase == 'copy' and rows == 2:
+                ShardedNote.objects.using('default').filter(pk=created[0].pk).delete()
+        
+        metrics = move_tenant(acme, 'shard_2', batch_size=2, progress=delete_after_first_batch)
+        
+        assert metrics['core.ShardedNote']['deleted_on_target'] == 1
+        assert [row[1] for row in notes(acme, 'shard_2')] == ['note 1', 'note 2', 'note 3']
+    
+    def test_failed_verification_keeps_tenant_on_source(self, monkeypatch):
+        acme = make_organization('Acme')
+        ShardedNote.objects.create(organization=acme, body='x')
+        monkeypatch.setattr(tenant_move, 'checksum', lambda model, org, database, batch_size: (0, database))
+        
+        with pytest.raises(TenantMoveError):
+            move_tenant(acme, 'shard_2')
+        
+        assert get_shard(acme.pk) == ('default', TenantShard.ACTIVE)
+        assert len(notes(acme, 'default')) == 1
+    
+    def test_command(self):
+        acme = make_organization('Acme')
+        ShardedNote.objects.create(organization=acme, body='x')
+        out = StringIO()
+        
+        call_command('move_tenant', 'acme', 'shard_2', stdout=out)
+        
+        assert 'Moved Acme from default to shard_2' in out.getvalue()
+        assert len(notes(acme, 'shard_2')) == 1
@@ -0,0 +1,99 @@
+import threading
+import pytest
+from datetime import timedelta
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.authentication.backends import generate_access_token
+from apps.authentication.models import User
+from apps.core.touch import TouchBuffer, touch, flush_touches, touch_buffer
+from apps.organizations.models import OrganizationMember
+
+
+@pytest.mark.django_db
+class TestTouchBuffer:
+    
+    def test_flush_writes_one_update_per_table(self, make_member, django_assert_num_queries):
+        members = [make_member() for _ in range(5)]
+        now = timezone.now()
+        
+        for member in members:
+            touch(OrganizationMember, member.pk, 'last_seen_at', now)
+            touch(User, member.user_id, 'last_login_at', now)
+        assert len(touch_buffer) == 10
+        
+        with django_assert_num_queries(2):
+            assert flush_touches() == 10
+        
+        assert not OrganizationMember.objects.filter(last_seen_at__isnull=True).exists()
+        assert len(touch_buffer) == 0
+    
+    def test_keeps_newest_value(self, make_member):
+        member = make_member()
+        now = timezone.now()
+        
+        touch(OrganizationMember, member.pk, 'last_seen_at', now)
+        touch(OrganizationMember, member.pk, 'last_seen_at', now - timedelta(minutes=1))
+        flush_touches()
+        
+        member.refresh_from_db()
+        assert member.last_seen_at == now
+    
+    def test_tenant_requests_touch_membership(self, make_member):
+        member = make_member()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(member.user)}')
+        
+        client.get(reverse('organization-detail', args=[member.organization_id]))
+        
+        member.refresh_from_db()
+        assert member.last_seen_at is None
+        
+        flush_touches()
+        member.refresh_from_db()
+        assert member.last_seen_at is not None
+    
+    def test_max_pending_flushes_after_commit(self, make_member, settings, django_capture_on_commit_callbacks):
+        settings.TOUCH_BUFFER = {**settings.TOUCH_BUFFER, 'MAX_PENDING': 2}
+        first, second = make_member(), make_member()
+        
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            touch(OrganizationMember, first.pk, 'last_seen_at')
+            touch(OrganizationMember, second.pk, 'last_seen_at')
+            touch(OrganizationMember, second.pk, 'last_seen_at')
+            
+            # Not inside the caller's transaction
+            assert len(touch_buffer) == 2
+        
+        assert len(callbacks) == 1
+        assert len(touch_buffer) == 0
+        assert OrganizationMember.objects.filter(last_seen_at__isnull=False).count() == 2
+    
+    def test_rolled_back_caller_keeps_pending_values(self, make_member, settings):
+        settings.TOUCH_BUFFER = {**settings.TOUCH_BUFFER, 'MAX_PENDING': 2}
+        first, second = make_member(), make_member()
+        touch(OrganizationMember, first.pk, 'last_seen_at')
+        
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                touch(OrganizationMember, second.pk, 'last_seen_at')
+                raise RuntimeError('request failed')
+        
+        assert len(touch_buffer) == 2
+        flush_touches()
+        assert OrganizationMember.objects.filter(last_seen_at__isnull=False).count() == 2
+
+
+def test_max_pending_wakes_flusher(settings):
+    settings.TOUCH_BUFFER = {**settings.TOUCH_BUFFER, 'FLUSH_INTERVAL': 3600, 'MAX_PENDING': 2}
+    buffer = TouchBuffer()
+    flushed = threading.Event()
+    buffer.flush = flushed.set
+    
+    buffer.touch(OrganizationMember, 1, 'last_seen_at')
+    buffer.touch(OrganizationMember, 2, 'last_seen_at')
+    
+    # Written by the flusher thread, not the caller
+    assert flushed.wait(5)
+    assert len(buffer) == 2
@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+from apps.authentication.backends import generate_access_token
+from apps.core.testing import assert_no_writes
+from apps.core.transactions import TransactionPolicyMixin, READ_ONLY
+from apps.organizations.models import Role
+
+
+class PolicyView(TransactionPolicyMixin, APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    transaction_policy = {'GET': READ_ONLY, 'HEAD': 'autocommit'}
+    
+    def get(self, request):
+        return Response({'depth': len(connection.atomic_blocks)})
+    
+    def head(self, request):
+        return Response({'depth': len(connection.atomic_blocks)})
+    
+    def post(self, request):
+        Role.objects.create(name='Temporary', level=1)
+        if request.data.get('fail'):
+            raise RuntimeError('handler failed')
+        return Response({'depth': len(connection.atomic_blocks)})
+
+
+@pytest.mark.django_db
+class TestTransactionPolicy:
+    
+    def call(self, method, data=None):
+        request = getattr(APIRequestFactory(), method)('/policy/', data, format='json')
+        return PolicyView.as_view()(request)
+    
+    def test_policies_open_transactions_per_method(self):
+        # The test itself runs in one atomic block
+        depth = len(connection.atomic_blocks)
+        
+        assert self.call('head').data['depth'] == depth
+        assert self.call('get').data['depth'] == depth + 1
+        assert self.call('post').data['depth'] == depth + 1
+    
+    def test_view_is_excluded_from_atomic_requests(self):
+        assert PolicyView.as_view()._non_atomic_requests == {'default'}
+    
+    def test_failed_write_is_rolled_back(self):
+        with pytest.raises(RuntimeError):
+            self.call('post', {'fail': True})
+        
+        assert not Role.objects.filter(name='Temporary').exists()
+        assert len(connection.atomic_blocks) == 1
+
+
+@pytest.mark.django_db
+class TestReadEndpointsDoNotWrite:
+    
+    @pytest.fixture
+    def client(self, make_member):
+        member = make_member()
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {generate_access_token(member.user)}',
+            HTTP_X_ORGANIZATION_ID=str(member.organization_id)
+        )
+        client.member = member
+        return client
+    
+    @pytest.mark.parametrize('name, detail', [
+        ('role-list', False),
+        ('permission-list', False),
+        ('organization-list', False),
+        ('organization-detail', True),
+        ('organization-members', True),
+        ('user-profile', False),
+    ])
+    def test_get_does_not_write(self, client, name, detail):
+        args = [client.member.organization_id] if detail else []
+        
+        with assert_no_writes():
+            response = client.get(reverse(name, args=args))
+        
+        assert response.status_code == status.HTTP_200_OK
+    
+    def test_assert_no_writes_reports_writes(self, client):
+        with pytest.raises(AssertionError, match='1 write'):
+            with assert_no_writes():
+                client.patch(reverse('user-profile'), {'first_name': 'Changed'}, format='json')
@@ -0,0 +1,114 @@
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.db import connections
+from django.test import AsyncClient
+from django.urls import resolve, reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.authentication.backends import generate_access_token
+
+
+@pytest.fixture
+def atomic_requests(monkeypatch):
+    """ATOMIC_REQUESTS on, as in the base settings (the test settings leave it off)"""
+    monkeypatch.setitem(connections['default'].settings_dict, 'ATOMIC_REQUESTS', True)
+
+
+def auth_headers(member):
+    # AsyncClient only sends headers given per request
+    return {'Authorization': f'Bearer {generate_access_token(member.user)}'}
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('atomic_requests')
+class TestAsyncDispatch:
+    
+    @pytest.fixture
+    def member(self, make_member):
+        return make_member()
+    
+    def get(self, member, url):
+        """GET through the ASGI request path, as an ASGI server would"""
+        return async_to_sync(AsyncClient().get)(url, headers=auth_headers(member))
+    
+    @pytest.mark.parametrize('name, detail', [
+        ('user-profile', False),
+        ('organization-list', False),
+        ('organization-detail', True),
+        ('role-list', False),
+        ('permission-list', False),
+    ])
+    def test_hot_reads_are_async_views(self, member, name, detail):
+        url = reverse(name, args=[member.organization_id] if detail else [])
+        
+        assert iscoroutinefunction(resolve(url).func)
+        assert self.get(member, url).status_code == status.HTTP_200_OK
+    
+    def test_async_reads_return_serialized_data(self, member):
+        profile = self.get(member, reverse('user-profile')).json()
+        organizations = self.get(member, reverse('organization-list')).json()
+        organization = self.get(member, reverse('organization-detail', args=[member.organization_id])).json()
+        
+        assert profile['email'] == member.user.email
+        assert [row['id'] for row in organizations['results']] == [str(member.organization_id)]
+        assert organization['member_count'] == 1
+        assert organization['user_role'] == 'Owner'
+    
+    def test_async_reads_report_errors(self, member, make_member):
+        other = make_member()
+        anonymous = async_to_sync(AsyncClient().get)(reverse('user-profile'))
+        
+        assert anonymous.status_code == status.HTTP_401_UNAUTHORIZED
+        response = self.get(member, reverse('organization-detail', args=[other.organization_id]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = self.get(member, reverse('organization-detail', args=['not-a-uuid']))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    
+    def test_writes_keep_the_sync_path(self, member):
+        response = async_to_sync(AsyncClient().patch)(
+            reverse('user-profile'),
+            {'first_name': 'Changed'},
+            content_type='application/json',
+            headers=auth_headers(member)
+        )
+        
+        assert response.status_code == status.HTTP_200_OK
+        member.user.refresh_from_db()
+        assert member.user.first_name == 'Changed'
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('atomic_requests')
+class TestHealth:
+    
+    def test_health_endpoint(self):
+        response = APIClient().get(reverse('health'))
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'status': 'ok'}
+    
+    def test_health_probe_over_asgi(self):
+        response = async_to_sync(AsyncClient().get)(reverse('health'))
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'status': 'ok'}
+    
+    def test_health_details_are_for_staff(self, make_member):
+        member, staff = make_member().user, make_member().user
+        staff.is_staff = True
+        staff.save()
+        
+        def get_details(user=None):
+            client = APIClient()
+            if user is not None:
+                client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(user)}')
+            return client.get(reverse('health-details'))
+        
+        assert get_details().status_code == status.HTTP_401_UNAUTHORIZED
+        assert get_details(member).status_code == status.HTTP_403_FORBIDDEN
+        response = get_details(staff)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['status'] == 'ok'
+        assert response.json()['database'] == 'ok'
+        assert 'pools' in response.json()
@@ -0,0 +1,266 @@
+import atexit
+import logging
+import threading
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Rows per UPDATE statement
+FLUSH_CHUNK_SIZE = 1000
+
+
+class TouchBuffer:
+    """
+    Write-behind buffer for high-frequency timestamp columns
+    (last_login_at, last_seen_at, ...) and usage counters.
+    touch() only records the newest value per row in memory and increment()
+    sums deltas per row; flush() writes everything pending with one bulk
+    UPDATE per (table, column). Pending values are flushed at least every
+    FLUSH_INTERVAL seconds by a daemon thread, when MAX_PENDING rows are
+    waiting, and at process exit. Flushes never run inside the caller's
+    transaction: a request that rolls back can't take other requests'
+    values with it, and a failed UPDATE can't abort the request.
+
+    On PostgreSQL values are applied only if newer than what the row holds,
+    so flushes from several workers can land in any order. Readers going through a
+    cache may see the previous value until their entry expires.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._increments = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._wake = threading.Event()
+        self._flush_scheduled = False
+
+    def touch(self, model, pk, field, value=None):
+        """
+        Record that `model.field` of row `pk` should become `value` (default now).
+
+        Args:
+            model: Model class
+            pk: Primary key of the row
+            field: Name of a DateTimeField on the model
+            value: Timestamp to write (defaults to timezone.now())
+        """
+        value = value or timezone.now()
+
+        if not settings.TOUCH_BUFFER['ENABLED']:
+            model._default_manager.filter(pk=pk).update(**{field: value})
+            return
+
+        with self._lock:
+            rows = self._pending.setdefault((model, field), {})
+            if pk not in rows or rows[pk] < value:
+                rows[pk] = value
+            pending = self._count_pending()
+
+        self._after_write(pending)
+
+    def increment(self, model, pk, field, delta=1):
+        """
+        Record that `model.field` of row `pk` should grow by `delta`.
+
+        Args:
+            model: Model class
+            pk: Primary key of the row
+            field: Name of an integer field on the model
+            delta: Amount to add
+        """
+        if not settings.TOUCH_BUFFER['ENABLED']:
+            model._default_manager.filter(pk=pk).update(**{field: F(field) + delta})
+            return
+
+        with self._lock:
+            rows = self._increments.setdefault((model, field), {})
+            rows[pk] = rows.get(pk, 0) + delta
+            pending = self._count_pending()
+
+        self._after_write(pending)
+
+    def _count_pending(self):
+        return sum(len(rows) for buffer in (self._pending, self._increments) for rows in buffer.values())
+
+    def _after_write(self, pending):
+        self._ensure_flusher()
+
+        if pending < settings.TOUCH_BUFFER['MAX_PENDING']:
+            return
+
+        if self._flusher is not None and self._flusher.is_alive():
+            # The flusher writes on its own connection
+            self._wake.set()
+            return
+
+        # No flusher thread: flush once the caller's transaction commits
+        # (right away outside one); after a rollback values stay pending
+        with self._lock:
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        transaction.on_commit(self.flush)
+
+    def flush(self):
+        """
+        Write every pending value to the database.
+
+        Returns:
+            int: Number of rows written
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            increments, self._increments = self._increments, {}
+            self._flush_scheduled = False
+
+        written = 0
+        for writer, buffer in ((bulk_touch, pending), (bulk_increment, increments)):
+            for (model, field), rows in buffer.items():
+                items = list(rows.items())
+                try:
+                    for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+                        written += writer(model, field, items[start:start + FLUSH_CHUNK_SIZE])
+                except Exception as e:
+                    logger.error(f"Touch flush failed for {model._meta.db_table}.{field}: {str(e)}")
+        return written
+
+    def clear(self):
+        """Drop pending values without writing them (used by tests)"""
+        with self._lock:
+            self._pending = {}
+            self._increments = {}
+            self._flush_scheduled = False
+
+    def __len__(self):
+        with self._lock:
+            return self._count_pending()
+
+    def _ensure_flusher(self):
+        interval = settings.TOUCH_BUFFER['FLUSH_INTERVAL']
+        if not interval or (self._flusher is not None and self._flusher.is_alive()):
+            return
+
+        with self._lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(
+                    target=self._flush_periodically,
+                    args=(interval,),
+                    name='touch-buffer-flusher',
+                    daemon=True
+                )
+                self._flusher.start()
+
+    def _flush_periodically(self, interval):
+        while True:
+            # Woken early when MAX_PENDING rows are waiting
+            self._wake.wait(interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            finally:
+                # This thread's connections would otherwise stay open forever
+                connections.close_all()
+
+
+def bulk_touch(model, field, items):
+    """
+    Set `field` on many rows of one table with a single UPDATE.
+    On PostgreSQL this is UPDATE ... FROM (VALUES ...) and rows that already
+    hold a newer value are left alone; other databases get a CASE expression.
+
+    Args:
+        model: Model class
+        field: Name of the timestamp field
+        items: List of (pk, value) pairs
+
+    Returns:
+        int: Number of rows updated
+    """
+    return _bulk_update(model, field, items, increment=False)
+
+
+def bulk_increment(model, field, items):
+    """
+    Add per-row deltas to an integer `field` with a single UPDATE.
+
+    Args:
+        model: Model class
+        field: Name of the counter field
+        items: List of (pk, delta) pairs
+
+    Returns:
+        int: Number of rows updated
+    """
+    return _bulk_update(model, field, items, increment=True)
+
+
+def _bulk_update(model, field, items, increment):
+    if not items:
+        return 0
+
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    pk_field = model._meta.pk
+    value_field = model._meta.get_field(field)
+    pk_column = quote(pk_field.column)
+    value_column = quote(value_field.column)
+
+    params = []
+    for pk, value in items:
+        params.append(pk_field.get_db_prep_value(pk, connection))
+        params.append(value if increment else value_field.get_db_prep_value(value, connection))
+
+    if connection.vendor == 'postgresql':
+        pk_type = pk_field.db_type(connection)
+        value_type = value_field.db_type(connection)
+        values = ', '.join([f'(%s::{pk_type}, %s::{value_type})'] * len(items))
+        if increment:
+            assignment, condition = f't.{value_column} + v.value', ''
+        else:
+            assignment = 'v.value'
+            condition = f' AND (t.{value_column} IS NULL OR t.{value_column} < v.value)'
+        sql = (
+            f'UPDATE {table} AS t SET {value_column} = {assignment} '
+            f'FROM (VALUES {values}) AS v(pk, value) '
+            f'WHERE t.{pk_column} = v.pk{condition}'
+        )
+    else:
+        case = ' '.join(['WHEN %s THEN %s'] * len(items))
+        placeholders = ', '.join(['%s'] * len(items))
+        expression = f'CASE {pk_column} {case} END'
+        if increment:
+            expression = f'{value_column} + {expression}'
+        sql = (
+            f'UPDATE {table} SET {value_column} = {expression} '
+            f'WHERE {pk_column} IN ({placeholders})'
+        )
+        params += [pk_field.get_db_prep_value(pk, connection) for pk, _ in items]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+touch_buffer = TouchBuffer()
+
+
+def touch(model, pk, field, value=None):
+    """Buffer a timestamp update (see TouchBuffer.touch)"""
+    touch_buffer.touch(model, pk, field, value)
+
+
+def increment(model, pk, field, delta=1):
+    """Buffer a counter increment (see TouchBuffer.increment)"""
+    touch_buffer.increment(model, pk, field, delta)
+
+
+def flush_touches():
+    """Write all buffered timestamp updates now"""
+    return touch_buffer.flush()
+
+
+atexit.register(flush_touches)
@@ -0,0 +1,94 @@
+from contextlib import ExitStack, contextmanager
+from django.db import DEFAULT_DB_ALIAS, transaction
+from .db_router import get_read_database
+
+AUTOCOMMIT = 'autocommit'
+READ_ONLY = 'read_only'
+ATOMIC = 'atomic'
+
+POLICIES = (AUTOCOMMIT, READ_ONLY, ATOMIC)
+
+
+@contextmanager
+def read_only_transaction(using=None):
+    """
+    Transaction that sees one snapshot and may not write.
+    On PostgreSQL the outermost block runs as REPEATABLE READ READ ONLY, so
+    every statement reads the same snapshot and any write fails. Nested in
+    an existing transaction (or on other databases) it is a plain atomic
+    block, since the mode can only be set before the first statement.
+
+    Args:
+        using: Database alias (default database if None)
+    """
+    connection = transaction.get_connection(using)
+    outermost = not connection.in_atomic_block
+
+    with transaction.atomic(using=using):
+        if outermost and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+        yield
+
+
+class TransactionPolicyMixin:
+    """
+    Per-method transaction handling for API views, replacing
+    ATOMIC_REQUESTS (which wraps every request, GETs included, in
+    BEGIN/COMMIT and holds the connection for the whole request).
+
+    `transaction_policy` maps HTTP methods to a policy; methods not listed
+    use `default_transaction_policy`:
+        'autocommit' - no transaction, each statement commits on its own
+        'read_only'  - one read-only snapshot for the handler
+                       (see read_only_transaction)
+        'atomic'     - the whole request in one transaction, rolled back
+                       on errors, as with ATOMIC_REQUESTS
+
+    Safe methods default to autocommit. The read-only transaction starts
+    after authentication and permission checks, whose bookkeeping writes
+    (API key usage, touches) must not run in it, and is opened on the
+    database the request reads from (a replica, see db_router).
+    """
+    transaction_policy = {
+        'GET': AUTOCOMMIT,
+        'HEAD': AUTOCOMMIT,
+        'OPTIONS': AUTOCOMMIT,
+    }
+    default_transaction_policy = ATOMIC
+    transaction_using = DEFAULT_DB_ALIAS
+    # Set per request by dispatch() (AsyncDispatchMixin's coroutine handlers skip it)
+    _read_only_context = None
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        view = super().as_view(*args, **kwargs)
+        return transaction.non_atomic_requests(using=cls.transaction_using)(view)
+
+    def get_transaction_policy(self, request):
+        """Policy for this request (override for per-action policies)"""
+        policy = self.transaction_policy.get(request.method, self.default_transaction_policy)
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown transaction policy '{policy}' on {type(self).__name__}")
+        return policy
+
+    def dispatch(self, request, *args, **kwargs):
+        self._read_only_context = None
+        policy = self.get_transaction_policy(request)
+
+        if policy == ATOMIC:
+            with transaction.atomic(using=self.transaction_using):
+                return super().dispatch(request, *args, **kwargs)
+
+        if policy == READ_ONLY:
+            # Entered in initial(), closed (rolled back on error) on the way out
+            with ExitStack() as self._read_only_context:
+                return super().dispatch(request, *args, **kwargs)
+
+        return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        if self._read_only_context is not None:
+            self._read_only_context.enter_context(read_only_transaction(get_read_database()))
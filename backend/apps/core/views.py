@@ -0,0 +1,166 @@
+import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.http import Http404, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .db.pool import pool_stats
+from .db_router import replica_aliases, replica_lag
+from .transactions import TransactionPolicyMixin
+
+logger = logging.getLogger(__name__)
+
+
+def _ping_database():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def _replica_lags():
+    return {alias: replica_lag(alias) for alias in replica_aliases()}
+
+
+class AsyncDispatchMixin:
+    """
+    Lets DRF views (and viewsets) define coroutine handlers, e.g.
+    `async def get` or `async def list`, served without a worker thread
+    under ASGI.
+    
+    For a coroutine handler, authentication, permission and throttle
+    checks (which read caches and the database) run in one sync_to_async
+    call, then the handler runs on the event loop; it must do its own I/O
+    with the async ORM or sync_to_async. Coroutine handlers run in
+    autocommit whatever the view's transaction policy, since a transaction
+    belongs to the thread that opened it, so keep them to reads.
+    
+    Requests for sync handlers (writes) go through the view's usual
+    dispatch, transaction policy included, in a worker thread, as Django
+    does for sync views.
+    """
+    view_is_async = True
+    
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        # ViewSets build their own view function, which Django would call as sync
+        return markcoroutinefunction(super().as_view(*args, **kwargs))
+    
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        handler = getattr(self, method, None) if method in self.http_method_names else None
+        if not iscoroutinefunction(handler):
+            return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+        
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+    
+    async def aget_object(self):
+        """get_object() for coroutine handlers of generic views"""
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+
+
+async def run_health_checks():
+    """
+    Database, shared cache, replica and connection pool checks.
+    Only an unreachable database makes the instance unhealthy: with the
+    cache's circuit open or a replica lagging the API still works
+    (degraded), so the instance stays up.
+
+    Returns:
+        dict: Check results, with the overall `status`
+    """
+    checks = {'database': 'ok', 'caches': {}, 'replicas': {}}
+    degraded = False
+    
+    try:
+        await sync_to_async(_ping_database)()
+    except Exception as e:
+        logger.error(f"Health check database error: {str(e)}")
+        checks['database'] = 'unavailable'
+    
+    for alias in settings.CACHES:
+        breaker = getattr(caches[alias], 'breaker', None)
+        if breaker is not None:
+            metrics = breaker.metrics()
+            checks['caches'][alias] = metrics
+            degraded = degraded or metrics['state'] != 'closed'
+    
+    max_lag = settings.DATABASE_REPLICAS['MAX_LAG_SECONDS']
+    for alias, lag in (await sync_to_async(_replica_lags)()).items():
+        in_use = lag is not None and lag <= max_lag
+        checks['replicas'][alias] = {'lag': lag, 'in_use': in_use}
+        degraded = degraded or not in_use
+    
+    # This worker's connection pools (production backend only)
+    checks['pools'] = pool_stats()
+    
+    if checks['database'] != 'ok':
+        checks['status'] = 'unavailable'
+    else:
+        checks['status'] = 'degraded' if degraded else 'ok'
+    return checks
+
+
+def _health_http_status(checks):
+    return status.HTTP_503_SERVICE_UNAVAILABLE if checks['status'] == 'unavailable' else status.HTTP_200_OK
+
+
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
+class HealthView(View):
+    """
+    Liveness/readiness probe used by the container healthcheck: 'ok',
+    'degraded' or 'unavailable' (503), see run_health_checks.
+    It is public, so it reports the status only; the checks behind it
+    (pids, pool sizes, breaker counters, replica lag) are served to staff
+    by HealthDetailView.
+    
+    A plain async Django view (it needs none of DRF's request handling):
+    under ASGI only the database ping leaves the event loop. Exempt from
+    ATOMIC_REQUESTS, which Django refuses for async views.
+    """
+    http_method_names = ['get', 'head', 'options']
+    
+    async def get(self, request):
+        checks = await run_health_checks()
+        return JsonResponse({'status': checks['status']}, status=_health_http_status(checks))
+
+
+class HealthDetailView(AsyncDispatchMixin, TransactionPolicyMixin, APIView):
+    """Every health check with its metrics, for staff (autocommit, like all reads)"""
+    permission_classes = [IsAdminUser]
+    
+    @extend_schema(
+        responses={200: OpenApiTypes.OBJECT, 503: OpenApiTypes.OBJECT},
+        description='Health checks with cache, replica and connection pool metrics (staff only)'
+    )
+    async def get(self, request):
+        checks = await run_health_checks()
+        return Response(checks, status=_health_http_status(checks))
@@ -0,0 +1,88 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.benchmarks import BenchmarkCommand, time_calls
+from apps.authentication.models import User
+from apps.authentication.backends import generate_access_token
+from apps.organizations.models import Organization, OrganizationMember, Role
+
+
+class Command(BenchmarkCommand):
+    help = 'Benchmark the paginated member listing of a large organization'
+    default_iterations = 200
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--members',
+            type=int,
+            default=10000,
+            help='Number of members in the benchmark organization'
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=50,
+            help='Members per page'
+        )
+
+    def run_benchmark(self, iterations, warmup, members, page_size, **options):
+        if not Role.objects.exists():
+            call_command('seed_roles', stdout=StringIO())
+        roles = list(Role.objects.exclude(name='Owner'))
+
+        organization = Organization.objects.create(name='Bench Members', slug='bench-members')
+        owner = User.objects.create_user(email='bench-owner@example.com', password='BenchPass123!')
+        OrganizationMember.objects.create(
+            organization=organization,
+            user=owner,
+            role=Role.objects.get(name='Owner')
+        )
+
+        self.stdout.write(f'Creating {members} members...')
+        users = User.objects.bulk_create(
+            User(email=f'bench-member-{i}@example.com', password='!')
+            for i in range(members - 1)
+        )
+        OrganizationMember.objects.bulk_create(
+            OrganizationMember(
+                organization=organization,
+                user=user,
+                role=roles[i % len(roles)],
+                invited_by=owner
+            )
+            for i, user in enumerate(users)
+        )
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(owner)}')
+        url = reverse('organization-members', args=[organization.id])
+        params = {'page_size': page_size}
+
+        with CaptureQueriesContext(connection) as queries:
+            first_page = client.get(url, params)
+        self.stdout.write(f'Queries for first page: {len(queries)}')
+
+        self.report(
+            f'GET members first page ({page_size})',
+            time_calls(lambda: client.get(url, params), iterations, warmup)
+        )
+
+        # Walk the whole list once, following cursors
+        pages = []
+
+        def walk():
+            response = first_page
+            while response.data['next']:
+                response = client.get(response.data['next'])
+                pages.append(len(response.data['results']))
+
+        timings = time_calls(walk, 1)
+        self.stdout.write(
+            f'Walked {sum(pages) + len(first_page.data["results"])} members '
+            f'in {len(pages) + 1} pages: {timings[0]:.2f}s'
+        )
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from apps.organizations.models import Role, Permission, RolePermission
+from apps.organizations.matrix import publish_matrix_reload
 
 
 class Command(BaseCommand):
@@ -159,4 +160,8 @@ class Command(BaseCommand):
             perm_count = role.permissions.count()
             self.stdout.write(f'    → Assigned {perm_count} permissions')
         
+        # Rebuild the in-memory permission matrix in every worker
+        publish_matrix_reload()
+        self.stdout.write('  ✓ Published permission matrix reload')
+        
         self.stdout.write(self.style.SUCCESS('\n✓ Successfully seeded roles and permissions!'))
\ No newline at end of file
@@ -0,0 +1,136 @@
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import transaction
+from apps.core.cache import get_version, bump_version
+from apps.core.db_router import use_primary
+
+logger = logging.getLogger(__name__)
+
+MATRIX_VERSION_KEY = 'role_matrix_ver'
+
+_matrix = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+class PermissionMatrix:
+    """
+    Immutable in-memory role -> permission matrix.
+    Each role's permissions are stored as one integer bitset indexed by
+    permission code, so a check is a dict lookup and a bit test.
+    """
+
+    def __init__(self, codes, grants, version=None):
+        """
+        Args:
+            codes: Iterable of active permission codes
+            grants: Iterable of (role_id, permission_code) pairs
+            version: Version token this matrix was built for
+        """
+        self.codes = tuple(sorted(codes))
+        self.index = {code: bit for bit, code in enumerate(self.codes)}
+        self.version = version
+
+        self.role_bits = {}
+        for role_id, code in grants:
+            bit = self.index.get(code)
+            if bit is not None:
+                self.role_bits[role_id] = self.role_bits.get(role_id, 0) | (1 << bit)
+
+    @classmethod
+    def load(cls, version=None):
+        """
+        Build the matrix from the primary (two queries): from a lagging
+        replica this worker would keep a stale matrix under the new version.
+        """
+        from .models import Permission, RolePermission
+
+        with use_primary():
+            codes = list(Permission.objects.filter(is_active=True).values_list('code', flat=True))
+            grants = list(RolePermission.objects.filter(
+                permission__is_active=True
+            ).values_list('role_id', 'permission__code'))
+
+        return cls(codes, grants, version)
+
+    def mask(self, codes):
+        """Bitset for a collection of codes (None if any code is unknown)"""
+        bits = 0
+        for code in codes:
+            bit = self.index.get(code)
+            if bit is None:
+                return None
+            bits |= 1 << bit
+        return bits
+
+    def has(self, role_id, code):
+        bit = self.index.get(code)
+        if bit is None:
+            return False
+        return bool(self.role_bits.get(role_id, 0) >> bit & 1)
+
+    def has_all(self, role_id, codes):
+        mask = self.mask(codes)
+        if mask is None:
+            return False
+        return self.role_bits.get(role_id, 0) & mask == mask
+
+    def codes_for(self, role_id):
+        bits = self.role_bits.get(role_id, 0)
+        return frozenset(code for bit, code in enumerate(self.codes) if bits >> bit & 1)
+
+    def permission_count(self, role_id):
+        return self.role_bits.get(role_id, 0).bit_count()
+
+
+def get_permission_matrix():
+    """
+    Get this worker's permission matrix, reloading it when stale.
+    The shared version key is checked at most once per CHECK_INTERVAL
+    seconds, so nearly every call is a pure memory lookup.
+
+    Returns:
+        PermissionMatrix: Current matrix
+    """
+    global _matrix, _checked_at
+
+    matrix = _matrix
+    now = time.monotonic()
+
+    if matrix is not None and now - _checked_at < settings.PERMISSION_MATRIX['CHECK_INTERVAL']:
+        return matrix
+
+    with _lock:
+        if _matrix is not None and now - _checked_at < settings.PERMISSION_MATRIX['CHECK_INTERVAL']:
+            return _matrix
+
+        # Read the version before loading so a concurrent change triggers another reload
+        version = get_version(MATRIX_VERSION_KEY)
+        if _matrix is None or _matrix.version != version:
+            _matrix = PermissionMatrix.load(version)
+            logger.info(
+                f"Loaded permission matrix: {len(_matrix.codes)} permissions, "
+                f"{len(_matrix.role_bits)} roles"
+            )
+
+        _checked_at = now
+        return _matrix
+
+
+def publish_matrix_reload():
+    """
+    Tell every worker to rebuild its matrix.
+    Call this when roles, permissions or role-permission rows change.
+    """
+    transaction.on_commit(lambda: bump_version(MATRIX_VERSION_KEY))
+
+
+def reset_permission_matrix():
+    """Drop this process's matrix so the next check rebuilds it (used by tests)"""
+    global _matrix, _checked_at
+
+    with _lock:
+        _matrix = None
+        _checked_at = 0.0
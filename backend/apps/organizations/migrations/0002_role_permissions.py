@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organizations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="role",
+            name="permissions",
+            field=models.ManyToManyField(
+                related_name="roles",
+                through="organizations.RolePermission",
+                to="organizations.permission",
+            ),
+        ),
+    ]
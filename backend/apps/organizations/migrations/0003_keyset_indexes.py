@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organizations", "0002_role_permissions"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="organizationinvitation",
+            index=models.Index(
+                fields=["organization", "created_at"],
+                name="organizatio_organiz_061087_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="organizationmember",
+            index=models.Index(
+                fields=["organization", "created_at"],
+                name="organizatio_organiz_402ef8_idx",
+            ),
+        ),
+    ]
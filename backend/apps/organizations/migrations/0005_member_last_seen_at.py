@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-16 23:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organizations", "0004_uuid7_primary_keys"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organizationmember",
+            name="last_seen_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
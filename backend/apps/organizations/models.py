@@ -95,11 +95,11 @@ class RolePermission(BaseModel):
 
 
 # Add ManyToMany relationship through RolePermission
-Role.permissions = models.ManyToManyField(
+Role.add_to_class('permissions', models.ManyToManyField(
     Permission,
     through=RolePermission,
     related_name='roles'
-)
+))
 
 
 class OrganizationMember(BaseModel):
@@ -131,12 +131,16 @@ class OrganizationMember(BaseModel):
     )
     invited_at = models.DateTimeField(auto_now_add=True)
     
+    # Written through the touch buffer (apps.core.touch), not on every request
+    last_seen_at = models.DateTimeField(null=True, blank=True)
+    
     class Meta:
         db_table = 'organization_members'
         unique_together = ['organization', 'user']
         indexes = [
             models.Index(fields=['organization', 'user']),
             models.Index(fields=['user', 'is_active']),
+            models.Index(fields=['organization', 'created_at']),
         ]
     
     def __str__(self):
@@ -175,6 +179,7 @@ class OrganizationInvitation(BaseModel):
         indexes = [
             models.Index(fields=['email', 'is_active']),
             models.Index(fields=['token', 'expires_at']),
+            models.Index(fields=['organization', 'created_at']),
         ]
     
     def __str__(self):
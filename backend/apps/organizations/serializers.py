@@ -12,6 +12,7 @@ from .models import (
     Permission
 )
 from apps.authentication.serializers import UserSerializer
+from .matrix import get_permission_matrix
 
 
 class OrganizationSerializer(serializers.ModelSerializer):
@@ -34,11 +35,23 @@ class OrganizationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'slug', 'created_at', 'updated_at']
     
     def get_member_count(self, obj):
+        # Annotated by OrganizationViewSet.get_queryset
+        if hasattr(obj, 'member_count'):
+            return obj.member_count
         return obj.members.filter(is_active=True).count()
     
     def get_user_role(self, obj):
+        # Annotated by OrganizationViewSet.get_queryset
+        if hasattr(obj, 'user_role'):
+            return obj.user_role
+        
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            # Reuse the principal resolved for this request when it matches
+            principal = getattr(request, 'principal', None)
+            if principal is not None and principal.organization.id == obj.id:
+                return principal.role_name
+            
             try:
                 member = OrganizationMember.objects.get(
                     organization=obj,
@@ -86,7 +99,8 @@ class RoleSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
     
     def get_permission_count(self, obj):
-        return obj.permissions.filter(is_active=True).count()
+        # Served from the in-memory role/permission matrix (no query per role)
+        return get_permission_matrix().permission_count(obj.id)
 
 
 class PermissionSerializer(serializers.ModelSerializer):
@@ -109,9 +123,9 @@ class OrganizationMemberSerializer(serializers.ModelSerializer):
         model = OrganizationMember
         fields = [
             'id', 'user', 'role', 'invited_by',
-            'invited_at', 'is_active', 'created_at'
+            'invited_at', 'last_seen_at', 'is_active', 'created_at'
         ]
-        read_only_fields = ['id', 'invited_at', 'created_at']
+        read_only_fields = ['id', 'invited_at', 'last_seen_at', 'created_at']
 
 
 class UpdateMemberRoleSerializer(serializers.Serializer):
@@ -227,6 +241,46 @@ class OrganizationInvitationSerializer(serializers.ModelSerializer):
         return obj.is_valid()
 
 
+class OrganizationSummarySerializer(serializers.ModelSerializer):
+    """Minimal organization reference for nested list representations"""
+    
+    class Meta:
+        model = Organization
+        fields = ['id', 'name']
+        read_only_fields = fields
+
+
+class RoleSummarySerializer(serializers.ModelSerializer):
+    """Minimal role reference for nested list representations"""
+    
+    class Meta:
+        model = Role
+        fields = ['id', 'name']
+        read_only_fields = fields
+
+
+class OrganizationInvitationListSerializer(serializers.ModelSerializer):
+    """
+    Compact invitation representation for list views.
+    Expects `is_valid` to be annotated on the queryset and organization,
+    role and invited_by to be selected, so a page is a single query.
+    """
+    
+    organization = OrganizationSummarySerializer(read_only=True)
+    role = RoleSummarySerializer(read_only=True)
+    invited_by = UserSerializer(read_only=True)
+    is_valid = serializers.BooleanField(read_only=True)
+    
+    class Meta:
+        model = OrganizationInvitation
+        fields = [
+            'id', 'organization', 'email', 'role',
+            'invited_by', 'expires_at', 'accepted_at',
+            'is_valid', 'created_at'
+        ]
+        read_only_fields = fields
+
+
 class AcceptInvitationSerializer(serializers.Serializer):
     """Serializer for accepting organization invitation"""
     
@@ -0,0 +1,44 @@
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from apps.core.principal import (
+    invalidate_principal,
+    invalidate_organization_principals,
+    invalidate_all_principals
+)
+from .matrix import publish_matrix_reload
+from .models import Organization, OrganizationMember, Role, Permission, RolePermission
+
+
+@receiver([post_save, post_delete], sender=OrganizationMember)
+def membership_changed(sender, instance, **kwargs):
+    """Membership added, removed or given a new role"""
+    invalidate_principal(instance.user_id, instance.organization_id)
+
+
+@receiver([post_save, post_delete], sender=Organization)
+def organization_changed(sender, instance, **kwargs):
+    """Organization details changed or organization deactivated"""
+    invalidate_organization_principals(instance.id)
+
+
+@receiver([post_save, pre_delete], sender=Organization)
+def organization_api_keys_changed(sender, instance, **kwargs):
+    """Cached API keys carry their organization (before delete, while the keys still exist)"""
+    from apps.authentication.api_keys import invalidate_organization_api_keys
+    
+    invalidate_organization_api_keys(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Role)
+def role_changed(sender, instance, **kwargs):
+    """Role definitions are shared by every organization"""
+    invalidate_all_principals()
+    publish_matrix_reload()
+
+
+@receiver([post_save, post_delete], sender=RolePermission)
+@receiver([post_save, post_delete], sender=Permission)
+def role_permissions_changed(sender, instance, **kwargs):
+    """Permission granted to or removed from a role, or permission toggled"""
+    publish_matrix_reload()
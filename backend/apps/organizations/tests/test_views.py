@@ -0,0 +1,139 @@
+import pytest
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.authentication.backends import generate_access_token
+from apps.organizations.models import Organization, OrganizationInvitation
+
+
+@pytest.fixture
+def member_client():
+    def make(member):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {generate_access_token(member.user)}')
+        return client
+    return make
+
+
+@pytest.mark.django_db
+class TestOrganizationList:
+    
+    def test_list_annotates_member_count_and_role(self, make_member, member_client):
+        owner = make_member()
+        make_member(organization=owner.organization, role='Staff')
+        make_member(organization=owner.organization, role='Viewer').soft_delete()
+        
+        response = member_client(owner).get(reverse('organization-list'))
+        
+        assert response.status_code == status.HTTP_200_OK
+        org = response.data['results'][0]
+        assert org['member_count'] == 2
+        assert org['user_role'] == 'Owner'
+    
+    def test_list_excludes_other_organizations(self, make_member, member_client):
+        member = make_member(role='Staff')
+        make_member()
+        
+        response = member_client(member).get(reverse('organization-list'))
+        
+        assert [org['id'] for org in response.data['results']] == [str(member.organization_id)]
+    
+    def test_list_is_ordered_by_name(self, make_member, member_client):
+        first = make_member(organization=Organization.objects.create(name='Zeta', slug='zeta'))
+        for name in ['Alpha', 'Mu']:
+            make_member(organization=Organization.objects.create(name=name, slug=name.lower()), user=first.user)
+        
+        response = member_client(first).get(reverse('organization-list'))
+        
+        assert [org['name'] for org in response.data['results']] == ['Alpha', 'Mu', 'Zeta']
+    
+    @pytest.mark.parametrize('organization_count', [1, 10])
+    def test_list_query_count_is_constant(
+        self, make_member, member_client, organization_count, django_assert_num_queries
+    ):
+        first = make_member(role='Staff')
+        for _ in range(organization_count - 1):
+            member = make_member(user=first.user, role='Accountant')
+            make_member(organization=member.organization)
+        
+        client = member_client(first)
+        url = reverse('organization-list')
+        client.get(url)  # warm the user cache
+        
+        # One annotated keyset page query, no COUNT
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        
+        assert len(response.data['results']) == organization_count
+
+
+@pytest.mark.django_db
+class TestMemberList:
+    
+    @pytest.mark.parametrize('member_count', [1, 20])
+    def test_member_page_query_count_is_constant(
+        self, make_member, member_client, member_count, django_assert_num_queries
+    ):
+        owner = make_member()
+        for _ in range(member_count - 1):
+            make_member(organization=owner.organization, role='Staff')
+        
+        client = member_client(owner)
+        url = reverse('organization-members', args=[owner.organization_id])
+        client.get(url)  # warm the user cache and permission matrix
+        
+        # Organization lookup and one joined page query
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == member_count
+        assert response.data['results'][0]['role']['permission_count'] > 0
+    
+    def test_members_are_cursor_paginated(self, make_member, member_client):
+        owner = make_member()
+        for _ in range(4):
+            make_member(organization=owner.organization, role='Viewer')
+        
+        client = member_client(owner)
+        url = reverse('organization-members', args=[owner.organization_id])
+        
+        first = client.get(url, {'page_size': 3})
+        second = client.get(first.data['next'])
+        
+        ids = [m['id'] for m in first.data['results'] + second.data['results']]
+        assert len(ids) == len(set(ids)) == 5
+        assert second.data['next'] is None
+
+
+@pytest.mark.django_db
+class TestInvitationList:
+    
+    def test_invitation_list_takes_two_queries(self, make_member, member_client, roles, django_assert_num_queries):
+        owner = make_member()
+        for i in range(5):
+            OrganizationInvitation.objects.create(
+                organization=owner.organization,
+                email=f'invitee{i}@example.com',
+                role=roles['Staff'],
+                token=f'token-{i}',
+                invited_by=owner.user,
+                expires_at=timezone.now() + timedelta(days=7 if i else -1)
+            )
+        
+        client = member_client(owner)
+        url = reverse('organization-invitations', args=[owner.organization_id])
+        client.get(url)  # warm the user cache and principal
+        
+        # Organization lookup, then one joined, annotated page query: the
+        # nested organization, role and invited_by cost nothing more
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert len(results) == 5
+        assert results[0]['organization'] == {'id': str(owner.organization_id), 'name': owner.organization.name}
+        assert sorted(r['is_valid'] for r in results) == [False, True, True, True, True]
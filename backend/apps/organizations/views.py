@@ -1,10 +1,17 @@
+from django.db.models import BooleanField, CharField, Count, Exists, ExpressionWrapper, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Now
 from rest_framework import status, generics, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from asgiref.sync import sync_to_async
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 
-from apps.core.permissions import IsOrganizationAdmin, IsOrganizationOwner
+from apps.core.pagination import KeysetPagination
+from apps.core.permissions import IsOrganizationAdmin, IsOrganizationOwner, IsUserAccount
+from apps.core.principal import resolve_principal, attach_principal
+from apps.core.transactions import TransactionPolicyMixin
+from apps.core.views import AsyncDispatchMixin
 from .models import (
     Organization,
     OrganizationMember,
@@ -18,30 +25,74 @@ from .serializers import (
     UpdateMemberRoleSerializer,
     InviteMemberSerializer,
     OrganizationInvitationSerializer,
+    OrganizationInvitationListSerializer,
     AcceptInvitationSerializer,
     RoleSerializer,
     PermissionSerializer
 )
 
 
-class OrganizationViewSet(viewsets.ModelViewSet):
+class OrganizationViewSet(AsyncDispatchMixin, TransactionPolicyMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing organizations.
     List: Get all organizations user belongs to
     Create: Create new organization (user becomes owner)
     Retrieve/Update: Get/Update organization details
     Delete: Soft delete organization (owner only)
+    Reads run in autocommit, writes in one transaction.
     """
     serializer_class = OrganizationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_ordering = ('name', 'id')
     
     def get_queryset(self):
-        """Return only organizations the user belongs to"""
+        """
+        Return only organizations the user belongs to (an API key only
+        sees its own organization).
+        Member count and the caller's role are annotated in the same
+        statement so serializing N organizations doesn't cost N queries.
+        """
+        active_members = OrganizationMember.objects.filter(
+            organization=OuterRef('pk'),
+            is_active=True
+        )
+        member_count = active_members.order_by().values('organization').annotate(
+            count=Count('pk')
+        ).values('count')
+        
+        if getattr(self.request.user, 'is_api_key', False):
+            return Organization.objects.filter(
+                pk=self.request.user.api_key.organization_id,
+                is_active=True
+            ).annotate(
+                member_count=Coalesce(Subquery(member_count), 0),
+                user_role=Value(None, output_field=CharField())
+            )
+        
+        user_membership = active_members.filter(user=self.request.user)
+        
         return Organization.objects.filter(
-            members__user=self.request.user,
-            members__is_active=True,
+            Exists(user_membership),
             is_active=True
-        ).distinct()
+        ).annotate(
+            member_count=Coalesce(Subquery(member_count), 0),
+            user_role=Subquery(user_membership.values('role__name')[:1])
+        )
+    
+    def check_permissions(self, request):
+        """Attach the caller's principal for this organization before checking roles"""
+        organization_id = self.kwargs.get('pk')
+        
+        if organization_id and request.user.is_authenticated and not hasattr(request, 'principal'):
+            try:
+                principal = resolve_principal(request.user, organization_id)
+            except ValueError:
+                principal = None
+            
+            if principal is not None:
+                attach_principal(request, principal)
+        
+        super().check_permissions(request)
     
     def get_permissions(self):
         """Set permissions based on action"""
@@ -49,14 +100,19 @@ class OrganizationViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated(), IsOrganizationAdmin()]
         elif self.action == 'destroy':
             return [IsAuthenticated(), IsOrganizationOwner()]
+        elif self.action == 'create':
+            return [IsUserAccount()]
         return [IsAuthenticated()]
     
     @extend_schema(
         responses={200: OrganizationSerializer(many=True)},
         description='List all organizations user belongs to'
     )
-    def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+    async def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @extend_schema(
         request=OrganizationSerializer,
@@ -70,8 +126,10 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         responses={200: OrganizationSerializer},
         description='Get organization details'
     )
-    def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+    async def retrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
     
     @extend_schema(
         request=OrganizationSerializer,
@@ -92,7 +150,7 @@ class OrganizationViewSet(viewsets.ModelViewSet):
     
     @extend_schema(
         responses={200: OrganizationMemberSerializer(many=True)},
-        description='List organization members'
+        description='List organization members (cursor paginated)'
     )
     @action(detail=True, methods=['get'])
     def members(self, request, pk=None):
@@ -103,8 +161,10 @@ class OrganizationViewSet(viewsets.ModelViewSet):
             is_active=True
         ).select_related('user', 'role', 'invited_by')
         
-        serializer = OrganizationMemberSerializer(members, many=True)
-        return Response(serializer.data)
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        page = paginator.paginate_queryset(members, request, view=self)
+        serializer = OrganizationMemberSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     @extend_schema(
         request=InviteMemberSerializer,
@@ -136,8 +196,8 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         )
     
     @extend_schema(
-        responses={200: OrganizationInvitationSerializer(many=True)},
-        description='List pending invitations (admin only)'
+        responses={200: OrganizationInvitationListSerializer(many=True)},
+        description='List pending invitations (admin only, cursor paginated)'
     )
     @action(
         detail=True,
@@ -146,15 +206,27 @@ class OrganizationViewSet(viewsets.ModelViewSet):
     )
     def invitations(self, request, pk=None):
         """List all pending invitations"""
+        # Two queries: the organization (404 unless the caller is a member)
+        # and the page, with the relations the serializer reads joined in
         organization = self.get_object()
         invitations = OrganizationInvitation.objects.filter(
             organization=organization,
             is_active=True,
             accepted_at__isnull=True
-        ).select_related('role', 'invited_by')
+        ).select_related(
+            'organization', 'role', 'invited_by'
+        ).annotate(
+            # Same rules as OrganizationInvitation.is_valid(), evaluated in SQL
+            is_valid=ExpressionWrapper(
+                Q(accepted_at__isnull=True, is_active=True, expires_at__gt=Now()),
+                output_field=BooleanField()
+            )
+        )
         
-        serializer = OrganizationInvitationSerializer(invitations, many=True)
-        return Response(serializer.data)
+        paginator = KeysetPagination(ordering=('-created_at', '-id'))
+        page = paginator.paginate_queryset(invitations, request, view=self)
+        serializer = OrganizationInvitationListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
     
     @extend_schema(
         request=UpdateMemberRoleSerializer,
@@ -202,13 +274,10 @@ class OrganizationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Saving bumps the member's principal version (membership_changed signal)
         member.role = new_role
         member.save()
         
-        # Invalidate permission cache
-        from apps.core.permissions import invalidate_permission_cache
-        invalidate_permission_cache(member.user, organization)
-        
         return Response(OrganizationMemberSerializer(member).data)
     
     @extend_schema(
@@ -258,7 +327,7 @@ class OrganizationViewSet(viewsets.ModelViewSet):
 class AcceptInvitationView(generics.CreateAPIView):
     """Accept organization invitation"""
     serializer_class = AcceptInvitationSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsUserAccount]
     
     @extend_schema(
         request=AcceptInvitationSerializer,
@@ -276,29 +345,38 @@ class AcceptInvitationView(generics.CreateAPIView):
         )
 
 
-class RoleListView(generics.ListAPIView):
+class RoleListView(AsyncDispatchMixin, TransactionPolicyMixin, generics.ListAPIView):
     """List all available roles"""
     serializer_class = RoleSerializer
     permission_classes = [IsAuthenticated]
     queryset = Role.objects.filter(is_active=True)
+    pagination_ordering = ('-level', 'name')
     
     @extend_schema(
         responses={200: RoleSerializer(many=True)},
         description='List all available roles'
     )
-    def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        # Permission counts come from the matrix, which may need reloading
+        data = await sync_to_async(lambda: self.get_serializer(page, many=True).data)()
+        return self.get_paginated_response(data)
 
 
-class PermissionListView(generics.ListAPIView):
+class PermissionListView(AsyncDispatchMixin, TransactionPolicyMixin, generics.ListAPIView):
     """List all available permissions"""
     serializer_class = PermissionSerializer
     permission_classes = [IsAuthenticated]
     queryset = Permission.objects.filter(is_active=True)
+    pagination_ordering = ('category', 'name', 'id')
     
     @extend_schema(
         responses={200: PermissionSerializer(many=True)},
         description='List all available permissions'
     )
-    def get(self, request, *args, **kwargs):
-        return super().get(request, *args, **kwargs)
\ No newline at end of file
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,34 @@
+# Gunicorn server hooks (used with --config python:config.gunicorn)
+
+
+def post_worker_init(worker):
+    """Build per-worker in-memory state before the worker takes requests"""
+    from apps.organizations.matrix import get_permission_matrix
+    
+    try:
+        get_permission_matrix()
+    except Exception as e:
+        # Matrix is built lazily on first permission check instead
+        worker.log.warning(f"Could not preload permission matrix: {str(e)}")
+    
+    from django.db import connections
+    
+    for connection in connections.all():
+        fill_pool = getattr(connection, 'fill_pool', None)
+        if fill_pool is None:
+            continue
+        try:
+            fill_pool()
+        except Exception as e:
+            # Connections are opened on first use instead
+            worker.log.warning(f"Could not open connection pool for {connection.alias}: {str(e)}")
+
+
+def worker_exit(server, worker):
+    """Write buffered last-seen timestamps before the worker goes away"""
+    from apps.core.touch import flush_touches
+    
+    try:
+        flush_touches()
+    except Exception as e:
+        worker.log.warning(f"Could not flush touch buffer: {str(e)}")
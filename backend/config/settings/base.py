@@ -40,7 +40,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     
     # Custom middleware
+    'apps.core.middleware.ReplicaRoutingMiddleware',
     'apps.core.middleware.TenantContextMiddleware',
+    'apps.core.ratelimit.RateLimitMiddleware',
     'apps.core.middleware.RequestLoggingMiddleware',
 ]
 
@@ -78,6 +80,64 @@ DATABASES = {
     }
 }
 
+# Read replicas (apps.core.db_router): safe-method reads go to a replica
+# unless the caller wrote in the last PIN_SECONDS or the replica is more than
+# MAX_LAG_SECONDS behind. POSTGRES_REPLICA_HOSTS is a comma-separated list;
+# pointing it at the primary's own host gives a local two-alias setup.
+DATABASE_REPLICAS = {
+    'ALIASES': [],
+    'PIN_SECONDS': int(os.getenv('DATABASE_REPLICA_PIN_SECONDS', 10)),
+    'MAX_LAG_SECONDS': float(os.getenv('DATABASE_REPLICA_MAX_LAG_SECONDS', 5)),
+    'LAG_CHECK_INTERVAL': 5,
+}
+
+for index, host in enumerate(filter(None, os.getenv('POSTGRES_REPLICA_HOSTS', '').split(',')), start=1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host.strip(),
+        'ATOMIC_REQUESTS': False,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS['ALIASES'].append(alias)
+
+# Tenant sharding (apps.core.sharding): TenantAwareModel rows live on their
+# organization's shard (TenantShard directory, default DEFAULT_SHARD); all
+# other tables on CONTROL_DATABASE. POSTGRES_SHARDS is a comma-separated list
+# of name=host[/database], e.g. 'eu1=db-eu1,local2=postgres/inventory_shard2'.
+SHARDING = {
+    'CONTROL_DATABASE': 'default',
+    'DEFAULT_SHARD': 'default',
+    'SHARDS': ['default'],
+    'TIMEOUT': 3600,
+    'LOCAL_MAXSIZE': 10000,
+    # Longest a process may route with a stale directory entry
+    'LOCAL_TIMEOUT': 5,
+    # move_tenant: rows per batch, slack on updated_at between catch-up
+    # passes, extra seconds to wait for in-flight requests after a switch
+    'MOVE_BATCH_SIZE': 1000,
+    'CLOCK_SKEW': timedelta(seconds=5),
+    'MOVE_GRACE': 2,
+}
+
+for entry in filter(None, os.getenv('POSTGRES_SHARDS', '').split(',')):
+    name, _, location = entry.strip().partition('=')
+    host, _, database = location.partition('/')
+    alias = f'shard_{name}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host or DATABASES['default']['HOST'],
+        'NAME': database or DATABASES['default']['NAME'],
+        # Views open shard transactions explicitly (transaction.atomic(using=shard_for(...)))
+        'ATOMIC_REQUESTS': False,
+    }
+    SHARDING['SHARDS'].append(alias)
+
+DATABASE_ROUTERS = [
+    'apps.core.sharding.ShardRouter',
+    'apps.core.db_router.ReplicaRouter',
+]
+
 # Custom User Model
 AUTH_USER_MODEL = 'authentication.User'
 
@@ -98,6 +158,35 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# Argon2 costs come from PASSWORD_HASHING; older hashes are upgraded on login
+PASSWORD_HASHERS = [
+    'apps.authentication.hashing.CalibratedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+PASSWORD_HASHING = {
+    # Hashes running at once per process, and how many more may wait
+    'CONCURRENCY': int(os.getenv('PASSWORD_HASHING_CONCURRENCY', 2)),
+    'QUEUE_DEPTH': int(os.getenv('PASSWORD_HASHING_QUEUE_DEPTH', 8)),
+    'RETRY_AFTER': 1,
+    # Pick these with `manage.py calibrate_password_hasher`
+    'ARGON2_TIME_COST': int(os.getenv('ARGON2_TIME_COST', 2)),
+    'ARGON2_MEMORY_COST': int(os.getenv('ARGON2_MEMORY_COST', 102400)),
+    'ARGON2_PARALLELISM': int(os.getenv('ARGON2_PARALLELISM', 8)),
+}
+
+# Failed login tracking (sliding windows in the cache)
+LOGIN_LOCKOUT = {
+    'WINDOW': 900,
+    'ACCOUNT_LIMIT': 10,
+    'IP_LIMIT': 100,
+    'LOCK_DURATION': 1800,
+}
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -118,15 +207,17 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'apps.authentication.backends.JWTAuthentication',
+        'apps.authentication.backends.APIKeyAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Cursor pages in a fixed order per view: no `count` unless the view
+    # sets pagination_count, and no ?ordering= (see KeysetPagination)
+    'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.KeysetPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
         'rest_framework.filters.SearchFilter',
-        'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_RENDERER_CLASSES': [
@@ -147,6 +238,13 @@ JWT_SETTINGS = {
     'REFRESH_TOKEN_LIFETIME': timedelta(minutes=int(os.getenv('JWT_REFRESH_TOKEN_LIFETIME', 10080))),
     'SECRET_KEY': os.getenv('JWT_SECRET_KEY', SECRET_KEY),
     'ALGORITHM': 'HS256',
+    # 'apps.authentication.token_store.RedisRefreshTokenStore' rotates in Redis
+    # Parallel refreshes of one token within this window share one new pair
+    'REFRESH_GRACE_SECONDS': int(os.getenv('JWT_REFRESH_GRACE_SECONDS', 10)),
+    'REFRESH_TOKEN_STORE': os.getenv(
+        'JWT_REFRESH_TOKEN_STORE',
+        'apps.authentication.token_store.DatabaseRefreshTokenStore'
+    ),
 }
 
 # Redis Configuration
@@ -158,19 +256,76 @@ REDIS_URL = f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}'
 # Cache Configuration
 CACHES = {
     'default': {
-        'BACKEND': 'django_redis.cache.RedisCache',
+        # django-redis with a circuit breaker and in-process fallback (apps.core.cache_backends)
+        'BACKEND': 'apps.core.cache_backends.CircuitBreakerRedisCache',
         'LOCATION': REDIS_URL,
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
             'CONNECTION_POOL_KWARGS': {'max_connections': 50},
-            'SOCKET_CONNECT_TIMEOUT': 5,
-            'SOCKET_TIMEOUT': 5,
+            'SOCKET_CONNECT_TIMEOUT': float(os.getenv('REDIS_CONNECT_TIMEOUT', 1)),
+            'SOCKET_TIMEOUT': float(os.getenv('REDIS_SOCKET_TIMEOUT', 1)),
+            'CIRCUIT_BREAKER': {
+                'FAILURE_THRESHOLD': 3,  # consecutive failures before failing fast
+                'RESET_TIMEOUT': 10,  # seconds before probing Redis again
+                'LOCAL_MAXSIZE': 10000,
+                'LOCAL_TIMEOUT': 60,  # seconds a value is kept in-process
+            },
         },
         'KEY_PREFIX': 'inventory_saas',
         'TIMEOUT': 300,
     }
 }
 
+# User cache for JWT authentication (in-process LRU in front of Redis)
+USER_CACHE = {
+    'ENABLED': os.getenv('USER_CACHE_ENABLED', 'True') == 'True',
+    'LOCAL_MAXSIZE': int(os.getenv('USER_CACHE_LOCAL_MAXSIZE', 2048)),
+    'LOCAL_TIMEOUT': 60,  # seconds
+    'TIMEOUT': 900,  # seconds, matches access token lifetime
+}
+
+# Request principal cache (membership, organization and role per user/org)
+PRINCIPAL_CACHE = {
+    'LOCAL_MAXSIZE': int(os.getenv('PRINCIPAL_CACHE_LOCAL_MAXSIZE', 4096)),
+    'LOCAL_TIMEOUT': 60,  # seconds
+    'TIMEOUT': 900,  # seconds
+}
+
+# In-memory role/permission matrix (reloaded when the shared version changes)
+PERMISSION_MATRIX = {
+    'CHECK_INTERVAL': int(os.getenv('PERMISSION_MATRIX_CHECK_INTERVAL', 5)),  # seconds
+}
+
+# Organization API keys (apps.authentication.api_keys)
+API_KEYS = {
+    'TIMEOUT': 300,  # seconds in Redis
+    'LOCAL_MAXSIZE': 1000,
+    'LOCAL_TIMEOUT': 30,  # seconds in-process
+}
+
+# Email verification / password reset tokens
+# 'signed' tokens need no table rows; 'database' keeps one row per token for auditing
+EMAIL_TOKENS = {
+    'MODE': os.getenv('EMAIL_TOKEN_MODE', 'signed'),
+    'VERIFICATION_MAX_AGE': 24 * 60 * 60,
+    'PASSWORD_RESET_MAX_AGE': 60 * 60,
+}
+
+# Write-behind buffer for last_login_at / last_seen_at (apps.core.touch)
+TOUCH_BUFFER = {
+    'ENABLED': True,
+    'FLUSH_INTERVAL': int(os.getenv('TOUCH_FLUSH_INTERVAL', 30)),
+    'MAX_PENDING': 5000,
+}
+
+# Expired token purge (apps.authentication.purge)
+TOKEN_PURGE = {
+    'BATCH_SIZE': int(os.getenv('TOKEN_PURGE_BATCH_SIZE', 5000)),
+    'SLEEP': float(os.getenv('TOKEN_PURGE_SLEEP', 0.1)),  # seconds between batches
+    'REFRESH_TOKEN_RETENTION': timedelta(days=int(os.getenv('REFRESH_TOKEN_RETENTION_DAYS', 30))),
+    'PARTITION_MONTHS_AHEAD': 3,
+}
+
 # Celery Configuration
 # CELERY_BROKER_URL = REDIS_URL
 # CELERY_RESULT_BACKEND = REDIS_URL
@@ -211,6 +366,26 @@ SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
 X_FRAME_OPTIONS = 'DENY'
 
-# Rate Limiting
-RATELIMIT_ENABLE = True
-RATELIMIT_USE_CACHE = 'default'
\ No newline at end of file
+# Rate Limiting (apps.core.ratelimit)
+# Rules take a rate ('100/m', '5/15m'), a key ('ip', 'user', 'organization',
+# 'route', 'api_key' or a list of them) and optionally views (URL names), path, methods
+# and per-identity overrides, e.g. {'<organization id>': '6000/m'}
+RATE_LIMIT = {
+    'ENABLED': os.getenv('RATE_LIMIT_ENABLED', 'True') == 'True',
+    'BACKEND': 'redis',  # 'redis' or 'local' (per process)
+    'CACHE_ALIAS': 'default',
+    'LOCAL_MAXSIZE': 10000,
+    'RULES': [
+        {'name': 'login', 'rate': '5/15m', 'key': 'ip', 'views': ['login'], 'methods': ['POST']},
+        {'name': 'register', 'rate': '5/15m', 'key': 'ip', 'views': ['register'], 'methods': ['POST']},
+        {'name': 'forgot-password', 'rate': '3/h', 'key': 'ip', 'views': ['forgot-password'], 'methods': ['POST']},
+        {'name': 'user', 'rate': os.getenv('RATE_LIMIT_USER', '600/m'), 'key': 'user', 'path': r'^/api/'},
+        {
+            'name': 'organization',
+            'rate': os.getenv('RATE_LIMIT_ORGANIZATION', '3000/m'),
+            'key': 'organization',
+            'path': r'^/api/',
+        },
+        {'name': 'api-key', 'rate': os.getenv('RATE_LIMIT_API_KEY', '3000/m'), 'key': 'api_key', 'path': r'^/api/'},
+    ],
+}
\ No newline at end of file
@@ -27,12 +27,28 @@ STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.ManifestStaticFilesSto
 DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
 # For S3: DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 
-# Database connection pooling
-DATABASES['default']['CONN_MAX_AGE'] = 600
-DATABASES['default']['OPTIONS'] = {
-    'connect_timeout': 10,
+# Database connection pooling (apps.core.db.backends.postgresql_pool): each
+# worker process keeps one pool per database and requests hand their
+# connection back when they finish (CONN_MAX_AGE 0), instead of every
+# thread holding one for CONN_MAX_AGE. Connections per database are bounded
+# by workers x MAX_SIZE; pool stats are reported (to staff) by /api/health/details/.
+DATABASE_POOL = {
+    'MIN_SIZE': int(os.getenv('DATABASE_POOL_MIN_SIZE', 1)),
+    'MAX_SIZE': int(os.getenv('DATABASE_POOL_MAX_SIZE', 4)),
+    'TIMEOUT': float(os.getenv('DATABASE_POOL_TIMEOUT', 10)),
+    'MAX_LIFETIME': int(os.getenv('DATABASE_POOL_MAX_LIFETIME', 1800)),
+    'MAX_IDLE': 300,
+    'CHECK_INTERVAL': 30,
 }
 
+for database in DATABASES.values():
+    database['ENGINE'] = 'apps.core.db.backends.postgresql_pool'
+    database['CONN_MAX_AGE'] = 0
+    database['POOL'] = DATABASE_POOL
+    database['OPTIONS'] = {
+        'connect_timeout': 10,
+    }
+
 # Cache with Redis
 CACHES['default']['OPTIONS']['CONNECTION_POOL_KWARGS'] = {
     'max_connections': 50,
@@ -7,7 +7,31 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': ':memory:',
-    }
+    },
+    # Same database under a second alias, for replica router tests
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+        'TEST': {'MIRROR': 'default'},
+    },
+    # Second tenant shard, for sharding tests
+    'shard_2': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+    # Separate database standing in for a replica that stopped replaying
+    # the primary's writes, for replica lag tests
+    'lagging_replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+
+SHARDING = {
+    **SHARDING,
+    'SHARDS': ['default', 'shard_2'],
+    'LOCAL_TIMEOUT': 0,
+    'MOVE_GRACE': 0,
 }
 
 # Faster password hashing for tests
@@ -31,6 +55,24 @@ CACHES = {
     }
 }
 
+# Pick up role/permission changes immediately
+PERMISSION_MATRIX = {
+    'CHECK_INTERVAL': 0,
+}
+
+# Flush touches explicitly; a flusher thread can't see the in-memory database
+TOUCH_BUFFER = {
+    'ENABLED': True,
+    'FLUSH_INTERVAL': None,
+    'MAX_PENDING': 5000,
+}
+
+# Per-process rate limit buckets (cleared between tests)
+RATE_LIMIT = {
+    **RATE_LIMIT,
+    'BACKEND': 'local',
+}
+
 # Console email backend
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
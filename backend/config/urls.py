@@ -7,6 +7,7 @@ from drf_spectacular.views import (
     SpectacularRedocView,
     SpectacularSwaggerView,
 )
+from apps.core.views import HealthDetailView, HealthView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -16,6 +17,10 @@ urlpatterns = [
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
     
+    # Health check
+    path('api/health/', HealthView.as_view(), name='health'),
+    path('api/health/details/', HealthDetailView.as_view(), name='health-details'),
+    
     # API endpoints
     path('api/auth/', include('apps.authentication.urls')),
     path('api/organizations/', include('apps.organizations.urls')),
@@ -0,0 +1,57 @@
+import pytest
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty shared and in-process caches"""
+    from apps.authentication.api_keys import clear_local_api_key_cache
+    from apps.authentication.user_cache import clear_local_user_cache
+    from apps.core.principal import clear_local_principal_cache
+    from apps.core.ratelimit import reset_rate_limiter
+    from apps.core.sharding import clear_local_shard_cache
+    from apps.core.touch import touch_buffer
+    from apps.organizations.matrix import reset_permission_matrix
+    
+    cache.clear()
+    clear_local_user_cache()
+    clear_local_api_key_cache()
+    clear_local_principal_cache()
+    clear_local_shard_cache()
+    reset_permission_matrix()
+    touch_buffer.clear()
+    reset_rate_limiter()
+    yield
+
+
+@pytest.fixture
+def roles(db):
+    """Seed the default roles and permissions"""
+    from apps.organizations.models import Role
+    
+    call_command('seed_roles', stdout=StringIO())
+    return {role.name: role for role in Role.objects.all()}
+
+
+@pytest.fixture
+def make_member(roles):
+    """Create an organization membership with the given role name"""
+    from apps.authentication.models import User
+    from apps.organizations.models import Organization, OrganizationMember
+    
+    def make(organization=None, user=None, role='Owner'):
+        if organization is None:
+            count = Organization.objects.count()
+            organization = Organization.objects.create(name=f'Org {count}', slug=f'org-{count}')
+        if user is None:
+            count = User.objects.count()
+            user = User.objects.create_user(email=f'member{count}@example.com', password='TestPass123!')
+        return OrganizationMember.objects.create(
+            organization=organization,
+            user=user,
+            role=roles[role]
+        )
+    
+    return make